@@ -0,0 +1,254 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Generate many workbooks from lightweight specs, optionally in a pool of
+worker processes that parse the templates once when they start.
+
+A spec is a dict (it must be picklable when workers are used)::
+
+    {'filename': 'customer_1.ods',
+     'sheets': [{'name':'Alt_Data', 'rows':list_of_rows},
+                {'name':'Big_Data', 'labelL':labelL, 'unitsL':unitsL, 'arrayL':arrayL}],
+     'plots':  [{'name':'Alt_Plot', 'data_sheet':'Alt_Data', 'ycolL':[2,3],
+                 'title':'Pressure', 'yrange':(0, 15),
+                 'curves':[{'data_sheet':'Big_Data', 'ycolL':[2]}]}],
+     'sheet_order': ['Alt_Plot', 'Alt_Data']}
+
+    * sheets: "rows" goes to add_sheet (with optional "stream"),
+      "labelL", "unitsL" and "arrayL" go to add_sheet_columns.
+    * plots: any other key is an add_scatter keyword. "xrange", "yrange" and
+      "y2range" are (min, max) tuples. "curves" are add_curve keywords.
+    * sheet_order: optional, see SpreadSheet.set_sheet_order
+
+Usage::
+
+    report = generate_many( specL, workers=4, output_dir='reports' )
+    print( report.summary() )
+"""
+
+import os
+import io
+import time
+import traceback
+
+from odscharts.spreadsheet import SpreadSheet, warm_template_cache, process_pool_is_available
+
+# keys of a plot spec that are not add_scatter keywords
+PLOT_SPEC_KEYS = ('name', 'data_sheet', 'xrange', 'yrange', 'y2range', 'curves')
+
+
+class BatchResult(object):
+    """The outcome of one workbook of generate_many.
+
+    Attributes::
+
+        index: position of the spec in specs
+        filename: name of the ods file written (or that failed)
+        ok: True if the file was written
+        error: traceback text of the failure (None if ok)
+        seconds: wall time to build and save the workbook
+        num_bytes: size of the ods file (0 if it failed)
+    """
+
+    def __init__(self, index, filename, ok=True, error=None, seconds=0.0, num_bytes=0):
+        self.index = index
+        self.filename = filename
+        self.ok = ok
+        self.error = error
+        self.seconds = seconds
+        self.num_bytes = num_bytes
+
+
+class BatchReport(object):
+    """The result of generate_many.
+
+    Attributes::
+
+        resultL: list of BatchResult in the order of specs
+        total_time: wall time (sec) of the whole batch
+        workers: number of worker processes (None==generated in this process)
+    """
+
+    def __init__(self, resultL, total_time, workers=None):
+        self.resultL = resultL
+        self.total_time = total_time
+        self.workers = workers
+
+    @property
+    def failureL(self):
+        """list of BatchResult of the workbooks that failed"""
+        return [result for result in self.resultL if not result.ok]
+
+    @property
+    def num_ok(self):
+        return len( self.resultL ) - len( self.failureL )
+
+    @property
+    def throughput(self):
+        """workbooks written per second"""
+        if self.total_time <= 0.0:
+            return 0.0
+        return self.num_ok / self.total_time
+
+    def summary(self):
+        """Return a multi-line text report of throughput and failures."""
+        lineL = ['%i workbooks written, %i failed in %.2f sec (%.1f workbooks/sec, workers=%s)'%(
+                 self.num_ok, len(self.failureL), self.total_time, self.throughput, self.workers)]
+        for result in self.failureL:
+            lineL.append( 'FAILED %i "%s":'%(result.index, result.filename) )
+            lineL.append( result.error.rstrip() )
+        return '\n'.join( lineL )
+
+
+def build_spreadsheet( spec ):
+    """Return a SpreadSheet built from spec (see module docstring)."""
+    mySprSht = SpreadSheet()
+
+    for sheet in spec.get('sheets', []):
+        if 'rows' in sheet:
+            mySprSht.add_sheet( sheet['name'], sheet['rows'], stream=sheet.get('stream', False) )
+        else:
+            mySprSht.add_sheet_columns( sheet['name'], sheet['labelL'], sheet['unitsL'], sheet['arrayL'] )
+
+    for plot in spec.get('plots', []):
+        kwargs = dict( (k, v) for k, v in plot.items() if k not in PLOT_SPEC_KEYS )
+        mySprSht.add_scatter( plot['name'], plot['data_sheet'], **kwargs )
+
+        for curve in plot.get('curves', []):
+            kwargs = dict( (k, v) for k, v in curve.items() if k != 'data_sheet' )
+            mySprSht.add_curve( plot['name'], curve['data_sheet'], **kwargs )
+
+        if 'xrange' in plot:
+            mySprSht.setXrange( *plot['xrange'], plot_sheetname=plot['name'] )
+        if 'yrange' in plot:
+            mySprSht.setYrange( *plot['yrange'], plot_sheetname=plot['name'] )
+        if 'y2range' in plot:
+            mySprSht.setY2range( *plot['y2range'], plot_sheetname=plot['name'] )
+
+    if spec.get('sheet_order'):
+        mySprSht.set_sheet_order( spec['sheet_order'] )
+
+    return mySprSht
+
+
+def get_spec_filename( spec, index, output_dir=None ):
+    """Return the output file name of spec (ending with ".ods"), placed in output_dir if given."""
+    filename = spec.get( 'filename', 'workbook_%i.ods'%index )
+    if not filename.lower().endswith('.ods'):
+        filename = filename + '.ods'
+    if output_dir:
+        filename = os.path.join( output_dir, filename )
+    return filename
+
+
+def replace_file( src, dst ):
+    """Rename file src to dst, replacing dst if it exists. (Not called by User)"""
+    if hasattr(os, 'replace'):
+        os.replace( src, dst )
+    else:
+        # before python 3.3 (os.rename fails on Windows if dst exists)
+        if os.path.exists( dst ):
+            os.remove( dst )
+        os.rename( src, dst )
+
+
+def generate_one( index, spec, output_dir=None, save_optD=None ):
+    """
+    Build and save one workbook. Return its BatchResult (failures are caught). (Not called by User)
+
+    The workbook is written to a ".part" file that is renamed when the save is done,
+    so a failed save leaves no partial ods file (and an older file of that name is kept).
+    """
+    t_start = time.time()
+    filename = None
+    part_filename = None
+    try:
+        filename = get_spec_filename( spec, index, output_dir=output_dir )
+        mySprSht = build_spreadsheet( spec )
+        part_filename = filename + '.part'
+        with io.open( part_filename, 'wb' ) as fOut:
+            mySprSht.save_to( fOut, **(save_optD or {}) )
+        replace_file( part_filename, filename )
+        return BatchResult( index, filename, seconds=time.time() - t_start,
+                            num_bytes=os.path.getsize( filename ) )
+    except Exception:
+        error = traceback.format_exc()
+        if part_filename and os.path.exists( part_filename ):
+            os.remove( part_filename )
+        return BatchResult( index, filename, ok=False, error=error,
+                            seconds=time.time() - t_start )
+
+
+# options of generate_many held by each worker process
+_worker_optD = {}
+
+def init_batch_worker( output_dir, save_optD ):
+    """Parse all templates once when a generate_many worker process starts. (Not called by User)"""
+    _worker_optD['output_dir'] = output_dir
+    _worker_optD['save_optD'] = save_optD
+    warm_template_cache()
+
+def generate_in_worker( index_spec ):
+    """Build and save one workbook in a worker process. (Not called by User)"""
+    index, spec = index_spec
+    return generate_one( index, spec, **_worker_optD )
+
+
+def generate_many( specs, workers=None, output_dir=None,
+                   compression='deflate', compresslevel=None, store_below=0):
+    """
+    Build and save one ods file for each spec in specs (see module docstring).
+
+    If workers is greater than 1, workbooks are generated by a pool of that many
+    worker processes. Each worker parses the templates once when it starts.
+    Before python 3.7 workers is ignored (see report.workers).
+    A workbook that fails does not stop the others; its traceback is in the report.
+
+    :param specs: iterable of workbook specs (dicts)
+    :keyword workers: Number of worker processes (default==None, generate in this process)
+    :type  workers: None or int
+    :keyword output_dir: Directory of the ods files (default==None, the filename of each spec)
+    :type  output_dir: None or str
+    :keyword compression: "deflate" or "stored" (default=="deflate", see SpreadSheet.save)
+    :type  compression: str
+    :keyword compresslevel: zlib compression level 0-9 for "deflate" (default==None, zlib default, needs python 3.7+)
+    :type  compresslevel: None or int
+    :keyword int store_below: Store files smaller than this many bytes (default==0)
+    :return: throughput and the result of each workbook
+    :rtype: BatchReport
+    """
+    save_optD = dict( compression=compression, compresslevel=compresslevel, store_below=store_below )
+    if output_dir and not os.path.isdir( output_dir ):
+        os.makedirs( output_dir )
+
+    t_start = time.time()
+
+    if not workers or workers <= 1 or not process_pool_is_available():
+        warm_template_cache()
+        resultL = [generate_one( index, spec, output_dir=output_dir, save_optD=save_optD )
+                   for index, spec in enumerate( specs )]
+        return BatchReport( resultL, time.time() - t_start, workers=None )
+
+    import concurrent.futures
+
+    specL = list( specs )
+    resultL = []
+    chunksize = max(1, len(specL) // (4*workers))
+    executor = concurrent.futures.ProcessPoolExecutor( max_workers=workers,
+                                                       initializer=init_batch_worker,
+                                                       initargs=(output_dir, save_optD) )
+    with executor:
+        result_iter = executor.map( generate_in_worker, enumerate( specL ), chunksize=chunksize )
+        try:
+            for result in result_iter:
+                resultL.append( result )
+        except Exception:
+            # e.g. a worker process died or a spec could not be pickled
+            error = traceback.format_exc()
+            for index in range( len(resultL), len(specL) ):
+                filename = get_spec_filename( specL[index], index, output_dir=output_dir )
+                resultL.append( BatchResult( index, filename, ok=False, error=error ) )
+
+    return BatchReport( resultL, time.time() - t_start, workers=workers )
@@ -0,0 +1,11 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Benchmarks for ODSCharts. They run offline on the bundled examples and generated data.
+
+    * bench_spreadsheet: asv style benchmarks, run and compared by run_benchmarks
+    * bench_xml_backend: standalone script comparing the xml backends
+    * bench_compression: standalone script comparing the compression policies
+"""
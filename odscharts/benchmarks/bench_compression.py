@@ -0,0 +1,98 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Report the file size and save time of each compression policy on the bundled examples.
+
+This is a standalone script, not run by run_benchmarks, because its main result
+is the file size of each policy. It only prints its report, which is not stored
+or compared with earlier runs.
+
+Run with:  python -m odscharts.benchmarks.bench_compression
+"""
+
+import os
+import sys
+import glob
+import time
+import shutil
+import tempfile
+import runpy
+
+from odscharts.spreadsheet import SpreadSheet
+
+here = os.path.abspath(os.path.dirname(__file__))
+EXAMPLE_DIR = os.path.join( os.path.split( here )[0], 'examples' )
+
+# label, save keywords
+POLICY_LIST = [('deflate (default)', {}),
+               ('stored', {'compression':'stored'}),
+               ('deflate level 1', {'compresslevel':1}),
+               ('deflate level 9', {'compresslevel':9}),
+               ('store below 4096', {'store_below':4096})]
+
+NUM_REPEAT = 5
+
+
+def get_example_spreadsheets():
+    """Run each examples/*.py script and return list of (name, SpreadSheet) it saved."""
+    spreadsheetL = []
+    real_save = SpreadSheet.save
+
+    def capture_save(self, filename='my_chart.ods', launch=False, **kwargs):
+        name = os.path.basename( filename )
+        if not name.lower().endswith('.ods'):
+            name = name + '.ods'
+        spreadsheetL.append( (name, self) )
+
+    SpreadSheet.save = capture_save
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w') # some examples print or launch the application
+    try:
+        for script in sorted( glob.glob( os.path.join(EXAMPLE_DIR, '*.py') ) ):
+            runpy.run_path( script, run_name='__main__' )
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        SpreadSheet.save = real_save
+
+    return spreadsheetL
+
+
+def time_save( mySprSht, fname, save_kwargs ):
+    """Return best save time (sec) of NUM_REPEAT saves."""
+    best = None
+    stdout = sys.stdout
+    for _ in range( NUM_REPEAT ):
+        sys.stdout = open(os.devnull, 'w') # save prints the file name
+        try:
+            t_start = time.time()
+            mySprSht.save( filename=fname, **save_kwargs )
+            t_save = time.time() - t_start
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        if best is None or t_save < best:
+            best = t_save
+    return best
+
+
+def run_benchmark():
+    """Print size and time of each compression policy for each example."""
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        print( '%-20s %-18s %10s %10s'%('Example', 'Policy', 'Size (kB)', 'Save (ms)') )
+        for name, mySprSht in get_example_spreadsheets():
+            for label, save_kwargs in POLICY_LIST:
+                fname = os.path.join( tmp_dir, name )
+                t_save = time_save( mySprSht, fname, save_kwargs )
+                size = os.path.getsize( mySprSht.filename )
+                print( '%-20s %-18s %10.1f %10.2f'%(name, label, size/1024.0, t_save*1000.0) )
+            print()
+    finally:
+        shutil.rmtree( tmp_dir )
+
+
+if __name__ == '__main__':
+    run_benchmark()
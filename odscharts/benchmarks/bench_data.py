@@ -0,0 +1,16 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Generated data shared by the benchmark modules.
+"""
+
+
+def make_rows( num_rows, num_cols=4 ):
+    """Return list_of_rows with labels, units and num_rows rows of floats."""
+    list_of_rows = [['Col_%i'%icol for icol in range(num_cols)],
+                    ['unit%i'%icol for icol in range(num_cols)]]
+    for irow in range( num_rows ):
+        list_of_rows.append( [float(irow + icol) for icol in range(num_cols)] )
+    return list_of_rows
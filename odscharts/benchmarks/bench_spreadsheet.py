@@ -0,0 +1,121 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Benchmarks of building and saving spreadsheets.
+
+The classes follow the airspeed velocity (asv) layout: "params" lists the
+parameter values, "setup" is called before each timed call and each "time_"
+method is one benchmark. Run them with:  python -m odscharts.benchmarks.run_benchmarks
+"""
+
+import os
+import glob
+import shutil
+import tempfile
+import runpy
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.benchmarks.bench_data import make_rows
+
+here = os.path.abspath(os.path.dirname(__file__))
+EXAMPLE_DIR = os.path.join( os.path.split( here )[0], 'examples' )
+
+
+class SpreadSheetInit(object):
+    """Construct an empty SpreadSheet (copies the cached templates)."""
+
+    def time_init(self):
+        SpreadSheet()
+
+
+class AddSheet(object):
+    """add_sheet of a 4 column data sheet as Element objects or streamed."""
+    params = [[1000, 100000, 1000000], [False, True]]
+    param_names = ['num_rows', 'stream']
+
+    def setup(self, num_rows, stream):
+        self.list_of_rows = make_rows( num_rows )
+        self.mySprSht = SpreadSheet()
+
+    def time_add_sheet(self, num_rows, stream):
+        self.mySprSht.add_sheet( 'Data', self.list_of_rows, stream=stream )
+
+
+class AddSheetsKeepRows(object):
+    """add_sheet of 4 data sheets made one at a time, with and without keeping their rows.
+    (with keep_rows=False, the rows of a sheet are freed before the next one is made)"""
+    params = [[2000, 20000], [True, False]]
+    param_names = ['num_rows', 'keep_rows']
+
+    def setup(self, num_rows, keep_rows):
+        self.mySprSht = SpreadSheet( keep_rows=keep_rows )
+
+    def time_add_sheets(self, num_rows, keep_rows):
+        for isheet in range( 4 ):
+            self.mySprSht.add_sheet( 'Data_%i'%isheet, make_rows( num_rows ) )
+
+
+class AddScatter(object):
+    """add_scatter of num_series curves, and building its chart object."""
+    params = [[1, 10, 100, 500]]
+    param_names = ['num_series']
+
+    def setup(self, num_series):
+        self.mySprSht = SpreadSheet()
+        self.mySprSht.add_sheet( 'Data', make_rows( 20, num_cols=num_series+1 ) )
+
+    def time_add_scatter(self, num_series):
+        self.mySprSht.add_scatter( 'Plot', 'Data', xcol=1, ycolL=list(range(2, num_series+2)) )
+
+    def time_build_chart(self, num_series):
+        self.mySprSht.add_scatter( 'Plot', 'Data', xcol=1, ycolL=list(range(2, num_series+2)) )
+        self.mySprSht.build_chart_xml( 'Plot' )
+
+
+class SavePlots(object):
+    """save of a spreadsheet with num_plots plots (2 curves each) of a 100 row sheet."""
+    params = [[1, 10, 100, 500]]
+    param_names = ['num_plots']
+
+    def setup(self, num_plots):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.mySprSht = SpreadSheet()
+        self.mySprSht.add_sheet( 'Data', make_rows( 100 ) )
+        for iplot in range( num_plots ):
+            self.mySprSht.add_scatter( 'Plot_%i'%iplot, 'Data', xcol=1, ycolL=[2,3] )
+
+    def teardown(self, num_plots):
+        shutil.rmtree( self.tmp_dir )
+
+    def time_save(self, num_plots):
+        self.mySprSht.save( filename=os.path.join(self.tmp_dir, 'plots.ods') )
+
+
+class Examples(object):
+    """Run each examples/*.py script, saving into a temporary directory."""
+    params = [[os.path.basename(script) for script in sorted( glob.glob( os.path.join(EXAMPLE_DIR, '*.py') ) )]]
+    param_names = ['script']
+
+    def setup(self, script):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.real_save = SpreadSheet.save
+        tmp_dir = self.tmp_dir
+        real_save = self.real_save
+
+        def tmp_save(self, filename='my_chart.ods', launch=False, **kwargs):
+            real_save(self, filename=os.path.join(tmp_dir, os.path.basename(filename)), **kwargs)
+
+        # never launch an application or write into examples
+        self.real_launch = SpreadSheet.launch_application
+        SpreadSheet.save = tmp_save
+        SpreadSheet.launch_application = lambda self: None
+
+    def teardown(self, script):
+        SpreadSheet.save = self.real_save
+        SpreadSheet.launch_application = self.real_launch
+        shutil.rmtree( self.tmp_dir )
+
+    def time_run_example(self, script):
+        runpy.run_path( os.path.join(EXAMPLE_DIR, script), run_name='__main__' )
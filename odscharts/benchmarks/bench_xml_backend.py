@@ -0,0 +1,132 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Compare the xml backends (see odscharts.xml_backend) on parsing the templates,
+building sheets and charts, and SpreadSheet.save.
+
+The backend is chosen when odscharts is imported, so each backend runs in its
+own python process (with ODSCHARTS_XML_BACKEND set). That is why this is a
+standalone script, not run by run_benchmarks: it only prints its times, which
+are not stored or compared with earlier runs.
+
+Run with:  python -m odscharts.benchmarks.bench_xml_backend
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+from collections import OrderedDict
+
+from odscharts.xml_backend import XML_BACKEND_L, ENV_VAR_NAME
+from odscharts.benchmarks.bench_data import make_rows
+
+NUM_REPEAT = 5
+NUM_ROWS = 10000 # rows of the data sheet built as Element objects
+NUM_PLOTS = 50   # plots (2 curves each) that are built and saved
+
+PHASE_L = ['parse templates', 'SpreadSheet()', 'add_sheet', 'add_scatter', 'save']
+
+
+def time_phases( tmp_dir ):
+    """Return OrderedDict of the time (sec) of each phase in PHASE_L with the current backend."""
+    from odscharts.spreadsheet import SpreadSheet, clear_template_cache, warm_template_cache
+
+    list_of_rows = make_rows( NUM_ROWS )
+    fname = os.path.join( tmp_dir, 'backend.ods' )
+
+    timeOD = OrderedDict()
+    t_start = time.time()
+    clear_template_cache()
+    warm_template_cache()
+    timeOD['parse templates'] = time.time() - t_start
+
+    t_start = time.time()
+    mySprSht = SpreadSheet()
+    timeOD['SpreadSheet()'] = time.time() - t_start
+
+    t_start = time.time()
+    mySprSht.add_sheet( 'Data', list_of_rows )
+    timeOD['add_sheet'] = time.time() - t_start
+
+    t_start = time.time()
+    for iplot in range( NUM_PLOTS ):
+        mySprSht.add_scatter( 'Plot_%i'%iplot, 'Data', xcol=1, ycolL=[2,3] )
+    timeOD['add_scatter'] = time.time() - t_start
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w') # save prints the file name
+    try:
+        t_start = time.time()
+        mySprSht.save( filename=fname )
+        timeOD['save'] = time.time() - t_start
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    return timeOD
+
+
+def run_child():
+    """Print (as JSON) the best time of each phase over NUM_REPEAT runs with the current backend."""
+    from odscharts.xml_backend import BACKEND_NAME
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        bestOD = OrderedDict()
+        for _ in range( NUM_REPEAT ):
+            for phase, t in time_phases( tmp_dir ).items():
+                bestOD[phase] = min( t, bestOD.get(phase, t) )
+    finally:
+        shutil.rmtree( tmp_dir )
+
+    print( json.dumps( OrderedDict( [('backend', BACKEND_NAME), ('times', bestOD)] ) ) )
+
+
+def time_backend( name ):
+    """Return OrderedDict of phase times of backend name (run in a new process), or None if it fails."""
+    env = dict( os.environ )
+    env[ENV_VAR_NAME] = name
+    proc = subprocess.Popen( [sys.executable, '-m', 'odscharts.benchmarks.bench_xml_backend', '--child'],
+                             env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE )
+    out, err = proc.communicate()
+    if proc.returncode != 0:
+        lastL = err.decode('utf-8').strip().splitlines()[-1:]
+        print( 'Backend "%s" not run: %s'%(name, ''.join(lastL)) )
+        return None
+
+    resultD = json.loads( out.decode('utf-8').strip().splitlines()[-1], object_pairs_hook=OrderedDict )
+    return resultD['times']
+
+
+def run_benchmark():
+    """Print the time of each phase for every backend, and its ratio to the fork."""
+    timeD = OrderedDict()
+    for name in XML_BACKEND_L:
+        times = time_backend( name )
+        if times is not None:
+            timeD[name] = times
+
+    print()
+    print( '%-16s'%'Phase' + ''.join( '%18s'%name for name in timeD ) )
+    for phase in PHASE_L:
+        sL = ['%-16s'%phase]
+        for name, times in timeD.items():
+            s = '%.2fms'%(times[phase] * 1000.0)
+            if name != 'fork' and 'fork' in timeD:
+                s += ' (x%.2f)'%(times[phase] / timeD['fork'][phase])
+            sL.append( '%18s'%s )
+        print( ''.join(sL) )
+    print( '(x ratio is backend time / fork time, %i rows, %i plots, best of %i)'%(NUM_ROWS, NUM_PLOTS, NUM_REPEAT) )
+
+
+if __name__ == '__main__':
+    if '--child' in sys.argv:
+        run_child()
+    else:
+        run_benchmark()
@@ -0,0 +1,255 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Offline runner for the asv style benchmark classes in BENCH_MODULE_L.
+
+Each benchmark is timed (best of --repeat calls, setup is called before each)
+and then run once more under tracemalloc to record the peak memory it allocates.
+Results are saved as JSON in --results-dir (default "benchmark_results" in the
+working directory) and compared with the previous run.
+
+Run with:  python -m odscharts.benchmarks.run_benchmarks [--quick] [-k pattern]
+
+bench_xml_backend and bench_compression are standalone scripts that print
+their own reports (see their docstrings); they are not run here.
+"""
+
+import os
+import sys
+import io
+import gc
+import json
+import time
+import glob
+import platform
+import argparse
+import itertools
+import subprocess
+from collections import OrderedDict
+from importlib import import_module
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None # python 2, no peak memory
+
+from odscharts import __version__
+
+here = os.path.abspath(os.path.dirname(__file__))
+RESULTS_DIR = 'benchmark_results' # relative to the working directory
+
+BENCH_MODULE_L = ['odscharts.benchmarks.bench_spreadsheet']
+
+# ratio of new/old value reported as a regression
+REGRESSION_RATIO = 1.2
+
+
+def is_size( param ):
+    """Return True if param is a number (like a row count) rather than an option."""
+    return isinstance(param, (int, float)) and not isinstance(param, bool)
+
+
+def iter_benchmarks( moduleL=BENCH_MODULE_L, quick=False ):
+    """
+    Yield (name, class, method name, params) for each benchmark.
+    If quick is set, only the first (smallest) value of each numeric parameter is used.
+    """
+    for module_name in moduleL:
+        module = import_module( module_name )
+        classL = [obj for obj in vars(module).values()
+                  if isinstance(obj, type) and obj.__module__ == module.__name__]
+        for cls in sorted( classL, key=lambda c: c.__name__ ):
+            methodL = sorted( name for name in dir(cls) if name.startswith('time_') )
+            paramLL = getattr(cls, 'params', [])
+            if quick:
+                paramLL = [paramL[:1] if all( is_size(p) for p in paramL ) else paramL
+                           for paramL in paramLL]
+
+            for params in itertools.product( *paramLL ):
+                for method_name in methodL:
+                    name = '%s.%s'%(cls.__name__, method_name)
+                    if params:
+                        name += '(%s)'%', '.join( '%s'%p for p in params )
+                    yield name, cls, method_name, params
+
+
+def run_once( cls, method_name, params, trace_memory=False ):
+    """Call setup, the benchmark method and teardown. Return (seconds, peak bytes or None)."""
+    bench = cls()
+    if hasattr(bench, 'setup'):
+        bench.setup( *params )
+
+    method = getattr( bench, method_name )
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w') # save prints the file name
+    gc.collect()
+    try:
+        if trace_memory:
+            tracemalloc.start()
+        t_start = time.time()
+        method( *params )
+        t_run = time.time() - t_start
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            peak = None
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+        if hasattr(bench, 'teardown'):
+            bench.teardown( *params )
+
+    return t_run, peak
+
+
+def run_benchmarks( pattern='', quick=False, repeat=3, moduleL=BENCH_MODULE_L ):
+    """Run the benchmarks whose name contains pattern, return OrderedDict of results by name."""
+    resultOD = OrderedDict()
+    for name, cls, method_name, params in iter_benchmarks( moduleL=moduleL, quick=quick ):
+        if pattern not in name:
+            continue
+
+        timeL = [run_once( cls, method_name, params )[0] for _ in range(repeat)]
+        if tracemalloc is None:
+            peak = None
+        else:
+            peak = run_once( cls, method_name, params, trace_memory=True )[1]
+
+        resultOD[name] = OrderedDict( [('time', min(timeL)), ('timeL', timeL), ('peak_mem', peak)] )
+        print( '%-50s %10s %10s'%(name, format_time( min(timeL) ), format_mem( peak )) )
+        sys.stdout.flush()
+
+    return resultOD
+
+
+def format_time( seconds ):
+    if seconds is None:
+        return '-'
+    if seconds < 1.0:
+        return '%.2fms'%(seconds*1000.0)
+    return '%.2fs'%seconds
+
+def format_mem( num_bytes ):
+    if num_bytes is None:
+        return '-'
+    return '%.1fMB'%(num_bytes / 1024.0 / 1024.0)
+
+
+def get_commit():
+    """Return the git commit of the source tree (or "" if not in a git checkout)."""
+    try:
+        out = subprocess.check_output( ['git', 'rev-parse', '--short', 'HEAD'],
+                                       cwd=here, stderr=subprocess.STDOUT )
+        return out.decode('utf-8').strip()
+    except Exception:
+        return ''
+
+
+def save_results( resultOD, results_dir=RESULTS_DIR ):
+    """Save resultOD with machine info as JSON in results_dir and return the file name."""
+    if not os.path.isdir( results_dir ):
+        os.makedirs( results_dir )
+
+    commit = get_commit()
+    date = time.strftime('%Y%m%d_%H%M%S')
+    runD = OrderedDict( [('date', date),
+                         ('commit', commit),
+                         ('version', __version__),
+                         ('python', platform.python_version()),
+                         ('platform', platform.platform()),
+                         ('results', resultOD)] )
+
+    fname = os.path.join( results_dir, '%s_%s.json'%(date, commit or 'nocommit') )
+    with io.open( fname, 'w', encoding='utf-8' ) as fOut:
+        fOut.write( '%s'%json.dumps( runD, indent=1 ) )
+    return fname
+
+
+def load_results( fname ):
+    with io.open( fname, 'r', encoding='utf-8' ) as fInp:
+        return json.load( fInp, object_pairs_hook=OrderedDict )
+
+
+def get_latest_results_file( results_dir=RESULTS_DIR, exclude=None ):
+    """Return the newest results file in results_dir (other than exclude) or None."""
+    fileL = sorted( glob.glob( os.path.join(results_dir, '*.json') ) )
+    fileL = [f for f in fileL if exclude is None or os.path.abspath(f) != os.path.abspath(exclude)]
+    if fileL:
+        return fileL[-1]
+    return None
+
+
+def compare_results( old_resultD, new_resultD, ratio=REGRESSION_RATIO ):
+    """
+    Compare two results dicts (the "results" of saved runs).
+    Return list of report lines and list of names that are slower or use more memory than ratio.
+    """
+    lineL = ['%-50s %10s %10s %7s %10s %10s %7s'%('Benchmark', 'Old time', 'New time', 'Ratio',
+                                                 'Old mem', 'New mem', 'Ratio')]
+    regressionL = []
+    for name, new in new_resultD.items():
+        old = old_resultD.get( name )
+        if old is None:
+            continue
+
+        flag = ''
+        ratioL = []
+        for key in ('time', 'peak_mem'):
+            if old.get(key) and new.get(key) is not None:
+                r = new[key] / old[key]
+                ratioL.append( '%.2f'%r )
+                if r > ratio:
+                    flag = '  <== REGRESSION'
+            else:
+                ratioL.append( '-' )
+        if flag:
+            regressionL.append( name )
+
+        lineL.append( '%-50s %10s %10s %7s %10s %10s %7s%s'%(name,
+                       format_time( old.get('time') ), format_time( new.get('time') ), ratioL[0],
+                       format_mem( old.get('peak_mem') ), format_mem( new.get('peak_mem') ), ratioL[1], flag) )
+    return lineL, regressionL
+
+
+def main( argv=None ):
+    """Command line entry point, returns exit status (1 if --fail-on-regression and any regression)"""
+    parser = argparse.ArgumentParser( description='Run the ODSCharts benchmarks offline.' )
+    parser.add_argument( '-k', dest='pattern', default='', help='only run benchmarks whose name contains PATTERN' )
+    parser.add_argument( '--quick', action='store_true', help='only the smallest value of each parameter' )
+    parser.add_argument( '--repeat', type=int, default=3, help='timed calls of each benchmark (default 3)' )
+    parser.add_argument( '--results-dir', default=RESULTS_DIR,
+                         help='where results are stored (default: %s)'%RESULTS_DIR )
+    parser.add_argument( '--compare', metavar='FILE', help='results file to compare with (default: previous run)' )
+    parser.add_argument( '--no-save', action='store_true', help='do not store the results of this run' )
+    parser.add_argument( '--fail-on-regression', action='store_true',
+                         help='exit status 1 if any benchmark is %.1f times slower or larger'%REGRESSION_RATIO )
+    args = parser.parse_args( argv )
+
+    resultOD = run_benchmarks( pattern=args.pattern, quick=args.quick, repeat=args.repeat )
+
+    fname = None
+    if not args.no_save:
+        fname = save_results( resultOD, results_dir=args.results_dir )
+        print( 'Saved results to', fname )
+
+    old_fname = args.compare or get_latest_results_file( results_dir=args.results_dir, exclude=fname )
+    if fname and old_fname and os.path.abspath(old_fname) == os.path.abspath(fname):
+        old_fname = None
+
+    regressionL = []
+    if old_fname:
+        print()
+        print( 'Compared with', old_fname )
+        lineL, regressionL = compare_results( load_results( old_fname )['results'], resultOD )
+        print( '\n'.join( lineL ) )
+
+    if args.fail_on_regression and regressionL:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
@@ -0,0 +1,449 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Write the "Object N/content.xml" of a chart as text, without changing a copy of
+the template Element tree.
+
+A ChartEmitter is compiled once from a chart template. The parts of the template
+that never change are serialized once into static text. The parts that do change
+(titles, axis and grid styles, the first series of each y axis and its style)
+become slots, each holding an ElemFragment: the attributes of an Element and its
+serialized children. For each plot, emit fills the slots from the PlotTableDesc
+fields, so the work grows only with the number of series.
+
+The output is the same as changing a copy of the template Element tree, then
+SpreadSheet.setAxisRanges and serialization (see the expected charts in tests/golden).
+"""
+
+from collections import OrderedDict
+
+from odscharts.xml_backend import ET, escape_cdata, escape_attrib
+from odscharts.template_xml_file import iter_serialize_xml
+from odscharts.object_content import ChartStyleIndex, get_all_units_on_chart, get_series_cells
+from odscharts.line_styles import get_dash_a_name
+from odscharts.find_obj import NS_attrib
+from odscharts.namespaces import STYLE_STYLE, STYLE_NAME, STYLE_GRAPHIC_PROPERTIES, STYLE_CHART_PROPERTIES, \
+                                 CHART_DOMAIN, CHART_DATA_POINT, CHART_STYLE_NAME, CHART_ATTACHED_AXIS, \
+                                 CHART_LABEL_CELL_ADDRESS, CHART_VALUES_CELL_RANGE_ADDRESS, CHART_REPEATED, \
+                                 CHART_SYMBOL_TYPE, CHART_SYMBOL_NAME, CHART_SYMBOL_WIDTH, CHART_SYMBOL_HEIGHT, \
+                                 CHART_MINIMUM, CHART_MAXIMUM, DRAW_FILL, DRAW_FILL_COLOR, DRAW_STROKE, \
+                                 DRAW_STROKE_DASH, SVG_STROKE_COLOR, SVG_STROKE_WIDTH, TABLE_CELL_RANGE_ADDRESS
+
+CHART_NS = '{urn:oasis:names:tc:opendocument:xmlns:chart:1.0}'
+CHART_GRID = CHART_NS + 'grid'
+CHART_CLASS = CHART_NS + 'class'
+CHART_LOGARITHMIC = CHART_NS + 'logarithmic'
+CHART_TICK_MARKS_MINOR_INNER = CHART_NS + 'tick-marks-minor-inner'
+CHART_TICK_MARKS_MINOR_OUTER = CHART_NS + 'tick-marks-minor-outer'
+
+# attributes that an emitted chart can have but the template might not
+NEW_ATTRIB_L = [CHART_SYMBOL_TYPE, CHART_SYMBOL_NAME, CHART_SYMBOL_WIDTH, CHART_SYMBOL_HEIGHT,
+                CHART_MINIMUM, CHART_MAXIMUM, DRAW_FILL, DRAW_FILL_COLOR, DRAW_STROKE, DRAW_STROKE_DASH,
+                SVG_STROKE_COLOR, SVG_STROKE_WIDTH, TABLE_CELL_RANGE_ADDRESS]
+
+# styles of the template that a plot option can change
+STYLE_SLOT_L = ['Axs0', 'GMa0', 'Axs1', 'GMa1', 'Axs2', 'G0S0', 'G1S0']
+
+# chart-properties of a logarithmic x axis (replaces all the template attributes)
+LOGX_CHART_PROP_D = OrderedDict([("chart:display-label", "true"), ("chart:link-data-style-to-source", "true"),
+    ("chart:logarithmic", "true"), ("chart:tick-marks-major-inner", "false"), ("chart:tick-marks-major-outer", "true"),
+    ("chart:tick-marks-minor-inner", "true"), ("chart:tick-marks-minor-outer", "true"), ("chart:visible", "true")])
+
+
+def make_minor_grid_style( style_name, with_graphic_properties=True ):
+    """Return the style:style Element of the minor grid style_name (like "GMi0")."""
+    style = ET.Element(STYLE_STYLE,
+        attrib=OrderedDict([('{urn:oasis:names:tc:opendocument:xmlns:style:1.0}family', 'chart'),
+        ('{urn:oasis:names:tc:opendocument:xmlns:style:1.0}name', style_name)]))
+    if with_graphic_properties:
+        ET.SubElement(style,STYLE_GRAPHIC_PROPERTIES,
+            attrib=OrderedDict([('{urn:oasis:names:tc:opendocument:xmlns:drawing:1.0}fill', 'none'),
+            ('{urn:oasis:names:tc:opendocument:xmlns:drawing:1.0}stroke', 'dash'),
+            ('{urn:oasis:names:tc:opendocument:xmlns:drawing:1.0}stroke-dash', 'a4'),
+            ('{urn:oasis:names:tc:opendocument:xmlns:svg-compatible:1.0}stroke-width', '0.01042in'),
+            ('{urn:oasis:names:tc:opendocument:xmlns:svg-compatible:1.0}stroke-color', '#000000'),
+            ('{urn:oasis:names:tc:opendocument:xmlns:svg-compatible:1.0}stroke-opacity', '100%'),
+            ('{urn:oasis:names:tc:opendocument:xmlns:drawing:1.0}stroke-linejoin', 'round')]))
+    return style
+
+def make_minor_grid( style_name ):
+    """Return the chart:grid Element of a minor grid that uses style_name."""
+    return ET.Element(CHART_GRID,
+        attrib=OrderedDict([(CHART_CLASS, 'minor'), (CHART_STYLE_NAME, style_name)]))
+
+
+class ElemFragment(object):
+    """
+    An Element of a chart template compiled for output: its attributes
+    (an OrderedDict like Element.attrib) and its children as fragments,
+    with the unchanged Element already serialized in xml.
+    """
+
+    def __init__(self, elem, qnameOD):
+        self.tag = elem.tag
+        self.qnameOD = qnameOD
+        self.attribOD = OrderedDict( elem.items() )
+        self.text = elem.text
+        self.tail = elem.tail
+        self.childL = [ElemFragment(child, qnameOD) for child in elem]
+        self.num_elem = 1 + sum( child.num_elem for child in self.childL )
+
+        self.xml = ''.join( iter_serialize_xml(elem, qnameOD, None) )
+
+    def find(self, tag):
+        """Return the child fragment with tag (None if not found)"""
+        for child in self.childL:
+            if child.tag == tag:
+                return child
+        return None
+
+    def copy_attrib(self, tag=None):
+        """Return a copy of the attributes of this fragment (or of its child with tag)."""
+        if tag is None:
+            return OrderedDict( self.attribOD )
+        return OrderedDict( self.find(tag).attribOD )
+
+    def to_xml(self, attribOD=None, text=None, childD=None):
+        """
+        Return the xml of this Element with attributes attribOD and text (default
+        is the template values). childD holds new attributes of children by tag.
+        """
+        if attribOD is None and text is None and not childD:
+            return self.xml
+
+        if attribOD is None:
+            attribOD = self.attribOD
+        if text is None:
+            text = self.text
+        qnameOD = self.qnameOD
+        tag = qnameOD[self.tag]
+
+        sL = ["<", tag]
+        for k, v in attribOD.items():
+            sL.append(" %s=\"%s\"" % (qnameOD[k], escape_attrib(v)))
+
+        if text or self.childL:
+            sL.append(">")
+            if text:
+                sL.append( escape_cdata(text) )
+            for child in self.childL:
+                if childD and child.tag in childD:
+                    sL.append( child.to_xml( attribOD=childD[child.tag] ) )
+                else:
+                    sL.append( child.xml )
+            sL.append( "</" + tag + ">" )
+        else:
+            sL.append(" />")
+
+        if self.tail:
+            sL.append( escape_cdata(self.tail) )
+        return "".join(sL)
+
+
+def set_series_style( gpD, cpD, color, line_thk, show_line, line_style, show_marker, marker_type, marker_ht_wd ):
+    """
+    Set the graphic-properties (gpD) and chart-properties (cpD) attributes of a
+    series style.
+    """
+    if color is not None:
+        gpD[SVG_STROKE_COLOR] = color
+        gpD[DRAW_FILL_COLOR] = color
+
+    if line_thk is not None:
+        gpD[SVG_STROKE_WIDTH] = line_thk
+
+    if not show_line:
+        gpD[DRAW_FILL] = "none"
+        gpD[DRAW_STROKE] = "none"
+    elif line_style > 0:
+        gpD[DRAW_STROKE_DASH] = get_dash_a_name( line_style )
+        gpD[DRAW_STROKE] = 'dash'
+    else:
+        gpD[DRAW_STROKE] = "solid"
+
+    if show_marker:
+        cpD[CHART_SYMBOL_TYPE] = "automatic"
+    else:
+        cpD[CHART_SYMBOL_TYPE] = "none"
+        for at in [CHART_SYMBOL_NAME, CHART_SYMBOL_WIDTH, CHART_SYMBOL_HEIGHT]:
+            cpD.pop( at, None )
+
+    if not show_line:
+        cpD[CHART_SYMBOL_TYPE] = "named-symbol"
+        cpD[CHART_SYMBOL_NAME] = marker_type
+        cpD[CHART_SYMBOL_WIDTH] = marker_ht_wd
+        cpD[CHART_SYMBOL_HEIGHT] = marker_ht_wd
+
+
+class ChartEmitter(object):
+    """
+    A chart template (TemplateXML_File of "Object 1/content.xml") compiled into
+    static xml text and slots. Call emit for each plot.
+    """
+
+    def __init__(self, chart_obj):
+        """chart_obj is a copy of the template that may be changed."""
+        nsOD = chart_obj.rev_nsOD
+
+        # every qualified name that can be written
+        self.qnameOD = qnameOD = OrderedDict( chart_obj.qnameOD )
+        for tag in NEW_ATTRIB_L:
+            if tag not in qnameOD:
+                uri, name = tag[1:].split('}')
+                qnameOD[tag] = chart_obj.nsOD[uri] + ':' + name
+
+        chart = chart_obj.find('office:body/office:chart/chart:chart')
+        chart_index = ChartStyleIndex( chart_obj )
+        plot_area = chart_index.plot_area
+        auto_styles = chart_index.auto_styles
+
+        xaxis = yaxis = y2axis = None
+        for axis in plot_area.findall('chart:axis', nsOD):
+            dim_xy = axis.get(CHART_NS + 'dimension')
+            dim_name = axis.get(CHART_NS + 'name')
+            if dim_xy == 'x' and dim_name == 'primary-x':
+                xaxis = axis
+            if dim_xy == 'y' and dim_name == 'primary-y':
+                yaxis = axis
+            if dim_xy == 'y' and dim_name.startswith('secondary'):
+                y2axis = axis
+
+        y_series = y2_series = None
+        for series in plot_area.findall('chart:series', nsOD):
+            axis_name = series.get(CHART_ATTACHED_AXIS)
+            if axis_name == 'primary-y':
+                y_series = series
+            if axis_name == 'secondary-y':
+                y2_series = series
+
+        # index=slot name, value=(parent Element, Element in the template or None to append)
+        slotD = OrderedDict()
+        for style_name in STYLE_SLOT_L:
+            style = chart_index.get_style( style_name )
+            if style is not None:
+                slotD[style_name] = (auto_styles, style)
+        slotD['minor_grid_styles'] = (auto_styles, None)
+
+        slotD['title'] = (chart.find('chart:title', nsOD), chart.find('chart:title/text:p', nsOD))
+        slotD['xtitle'] = (xaxis.find('chart:title', nsOD), xaxis.find('chart:title/text:p', nsOD))
+        slotD['ytitle'] = (yaxis.find('chart:title', nsOD), yaxis.find('chart:title/text:p', nsOD))
+        slotD['xgrid'] = (xaxis, None)
+        slotD['ygrid'] = (yaxis, None)
+        if y2axis is not None:
+            slotD['y2title'] = (y2axis.find('chart:title', nsOD), y2axis.find('chart:title/text:p', nsOD))
+        slotD['y_series'] = (plot_area, y_series)
+        if y2_series is not None:
+            slotD['y2_series'] = (plot_area, y2_series)
+
+        # put a placeholder Comment in place of each slot and compile the Element it replaces
+        self.fragmentD = {} # index=slot name, value=ElemFragment
+        spliceD = {}
+        num_elem = sum( 1 for _ in chart_obj.root.iter() )
+        for slot_name, (parent, elem) in slotD.items():
+            placeholder = ET.Comment( slot_name )
+            if elem is None:
+                parent.append( placeholder )
+            else:
+                fragment = ElemFragment( elem, qnameOD )
+                self.fragmentD[slot_name] = fragment
+                num_elem -= fragment.num_elem
+                parent[ list(parent).index(elem) ] = placeholder
+            spliceD[placeholder] = lambda slot_name=slot_name: ['\0%s\0'%slot_name]
+        self.num_static_elem = num_elem # Elements written as static text
+
+        # static text and slot names alternate (static text first and last)
+        self.partL = ''.join( chart_obj.iter_chunks( spliceD=spliceD ) ).split('\0')
+
+        self.minor_grid_styleD = {'GMi0':ElemFragment( make_minor_grid_style('GMi0'), qnameOD ),
+                                  'GMi1':ElemFragment( make_minor_grid_style('GMi1'), qnameOD ),
+                                  'GMi2':ElemFragment( make_minor_grid_style('GMi2', False), qnameOD )}
+        self.minor_gridD = {'GMi0':ElemFragment( make_minor_grid('GMi0'), qnameOD ),
+                            'GMi1':ElemFragment( make_minor_grid('GMi1'), qnameOD )}
+
+        # logarithmic x axis attributes by tag
+        self.logx_chart_propD = NS_attrib( LOGX_CHART_PROP_D, nsOD )
+
+    def emit(self, plotSheetObj, xMinMax=None, yMinMax=None, y2MinMax=None):
+        """
+        Return (content.xml text, number of Elements) of the chart of plotSheetObj.
+        xMinMax, yMinMax and y2MinMax are (min, max) axis ranges (None==automatic).
+        """
+        P = plotSheetObj
+        doc = P.document
+        fragmentD = self.fragmentD
+        textD = {} # index=slot name, value=xml text
+        num_elem = [self.num_static_elem]
+
+        def add_slot(slot_name, fragment, **kwargs):
+            textD[slot_name] = textD.get(slot_name, '') + fragment.to_xml( **kwargs )
+            num_elem[0] += fragment.num_elem
+
+        # =============== Titles =========================
+        xUnitsStr, yUnitsStr, y2UnitsStr = get_all_units_on_chart( P )
+
+        add_slot( 'title', fragmentD['title'], text=P.title or '' ) # None writes an empty title
+        if P.showUnits:
+            add_slot( 'xtitle', fragmentD['xtitle'], text=P.xlabel + xUnitsStr )
+        else:
+            add_slot( 'xtitle', fragmentD['xtitle'], text=P.xlabel )
+        if P.showUnits and P.ycolL:
+            add_slot( 'ytitle', fragmentD['ytitle'], text=P.ylabel + yUnitsStr )
+        else:
+            add_slot( 'ytitle', fragmentD['ytitle'], text=P.ylabel )
+        if 'y2title' in fragmentD:
+            if not P.ycol2L:
+                add_slot( 'y2title', fragmentD['y2title'] )
+            elif P.showUnits:
+                add_slot( 'y2title', fragmentD['y2title'], text=P.y2label + y2UnitsStr )
+            else:
+                add_slot( 'y2title', fragmentD['y2title'], text=P.y2label )
+
+        # =============== Axis and grid styles =========================
+        # attributes of changed styles, index=style name, value=(style attrib, childD)
+        styleD = {}
+        def get_style_attrib(style_name, child_tag=None):
+            if style_name not in styleD:
+                styleD[style_name] = (fragmentD[style_name].copy_attrib(), {})
+            attribOD, childD = styleD[style_name]
+            if child_tag is None:
+                return attribOD
+            if child_tag not in childD:
+                childD[child_tag] = fragmentD[style_name].copy_attrib( child_tag )
+            return childD[child_tag]
+
+        minor_grid_styleL = []
+        if P.logx:
+            get_style_attrib('Axs0', STYLE_CHART_PROPERTIES)
+            styleD['Axs0'][1][STYLE_CHART_PROPERTIES] = OrderedDict( self.logx_chart_propD )
+
+            gpD = get_style_attrib('GMa0', STYLE_GRAPHIC_PROPERTIES)
+            gpD[DRAW_STROKE] = 'solid'
+            del gpD[DRAW_STROKE_DASH]
+
+            minor_grid_styleL.append( 'GMi0' )
+            add_slot( 'xgrid', self.minor_gridD['GMi0'] )
+
+        if P.ycolL and P.logy:
+            cpD = get_style_attrib('Axs1', STYLE_CHART_PROPERTIES)
+            cpD[CHART_LOGARITHMIC] = "true"
+            cpD[CHART_TICK_MARKS_MINOR_INNER] = "true"
+            cpD[CHART_TICK_MARKS_MINOR_OUTER] = "true"
+
+            get_style_attrib('GMa1')[DRAW_STROKE] = "dash"
+
+            minor_grid_styleL.append( 'GMi1' )
+            add_slot( 'ygrid', self.minor_gridD['GMi1'] )
+
+        if P.ycol2L and P.log2y:
+            cpD = get_style_attrib('Axs2', STYLE_CHART_PROPERTIES)
+            cpD[CHART_LOGARITHMIC] = "true"
+            cpD[CHART_TICK_MARKS_MINOR_INNER] = "true"
+            cpD[CHART_TICK_MARKS_MINOR_OUTER] = "true"
+            minor_grid_styleL.append( 'GMi2' )
+
+        for style_name, minmax in (('Axs0', xMinMax), ('Axs1', yMinMax), ('Axs2', y2MinMax)):
+            if minmax is None or style_name not in fragmentD:
+                continue
+            min_val, max_val = minmax
+            cpD = get_style_attrib(style_name, STYLE_CHART_PROPERTIES)
+            if not min_val is None:
+                cpD[CHART_MINIMUM] = '%g'%min_val
+            if not max_val is None:
+                cpD[CHART_MAXIMUM] = '%g'%max_val
+
+        # =============== Series and their styles =========================
+        self.emit_series( P, doc, 'G0S', 'G0S0', 'y_series', add_slot, get_style_attrib,
+                          P.ycolL, P.ycolDataSheetNameL, P.xcolL, P.decimatedL,
+                          P.colorL, P.lineThkL, P.showLineL, P.lineStyleL, P.showMarkerL,
+                          P.markerTypeL, P.markerHtWdL, P.showMarkerL[0] )
+        if P.ycol2L and 'y2_series' in fragmentD:
+            # the first y2 series style shows markers by the first primary series (as in older versions)
+            self.emit_series( P, doc, 'G1S', 'G1S0', 'y2_series', add_slot, get_style_attrib,
+                              P.ycol2L, P.ycol2_DataSheetNameL, P.xcol2L, P.decimated2L,
+                              P.color2L, P.lineThk2L, P.showLine2L, P.lineStyle2L, P.showMarker2L,
+                              P.markerType2L, P.markerHtWd2L, P.showMarkerL[0] )
+
+        # the reference series styles come before their copies, so fill them in first
+        for style_name in STYLE_SLOT_L:
+            if style_name not in fragmentD:
+                continue
+            if style_name in styleD:
+                attribOD, childD = styleD[style_name]
+                text = fragmentD[style_name].to_xml( attribOD=attribOD, childD=childD )
+            else:
+                text = fragmentD[style_name].xml
+            textD[style_name] = text + textD.get(style_name + '+', '')
+            num_elem[0] += fragmentD[style_name].num_elem
+
+        for style_name in minor_grid_styleL:
+            add_slot( 'minor_grid_styles', self.minor_grid_styleD[style_name] )
+
+        partL = self.partL
+        sL = []
+        for i, part in enumerate( partL ):
+            if i % 2:
+                sL.append( textD.get(part, '') )
+            else:
+                sL.append( part )
+        return ''.join( sL ), num_elem[0]
+
+    def emit_series(self, P, doc, style_prefix, ref_style_name, series_slot, add_slot, get_style_attrib,
+                    ycolL, sheet_nameL, xcolL, decimatedL,
+                    colorL, lineThkL, showLineL, lineStyleL, showMarkerL,
+                    markerTypeL, markerHtWdL, ref_show_marker):
+        """
+        Add the series of one y axis and the styles of all but its first series
+        (the first style is written with the other template styles). (Not called by User)
+        """
+        fragment = self.fragmentD[series_slot]
+        style_fragment = self.fragmentD[ref_style_name]
+
+        # the first series and its style are changed in place...
+        gpD = get_style_attrib( ref_style_name, STYLE_GRAPHIC_PROPERTIES )
+        cpD = get_style_attrib( ref_style_name, STYLE_CHART_PROPERTIES )
+        set_series_style( gpD, cpD, colorL[0], lineThkL[0], showLineL[0], lineStyleL[0],
+                          ref_show_marker, markerTypeL[0], markerHtWdL[0] )
+
+        lab_cell, val_cell_range, xval_cell_range, npoints = \
+            get_series_cells( doc, sheet_nameL[0], xcolL[0], ycolL[0], decimatedL[0] )
+        seriesD = fragment.copy_attrib()
+        seriesD[CHART_LABEL_CELL_ADDRESS] = lab_cell
+        seriesD[CHART_VALUES_CELL_RANGE_ADDRESS] = val_cell_range
+        childD = {CHART_DOMAIN: fragment.copy_attrib( CHART_DOMAIN ),
+                  CHART_DATA_POINT: fragment.copy_attrib( CHART_DATA_POINT )}
+        childD[CHART_DOMAIN][TABLE_CELL_RANGE_ADDRESS] = xval_cell_range
+        childD[CHART_DATA_POINT][CHART_REPEATED] = '%i'%npoints
+        add_slot( series_slot, fragment, attribOD=seriesD, childD=childD )
+
+        # ...and the others are copies of them
+        style_attribOD = style_fragment.copy_attrib()
+        for i in range( 1, len(ycolL) ):
+            new_styleD = OrderedDict( style_attribOD )
+            new_styleD[STYLE_NAME] = '%s%i'%(style_prefix, i)
+            new_gpD = OrderedDict( gpD )
+            new_cpD = OrderedDict( cpD )
+            set_series_style( new_gpD, new_cpD, colorL[i], lineThkL[i], showLineL[i], lineStyleL[i],
+                              showMarkerL[i], markerTypeL[i], markerHtWdL[i] )
+            add_slot( ref_style_name + '+', style_fragment, attribOD=new_styleD,
+                      childD={STYLE_GRAPHIC_PROPERTIES:new_gpD, STYLE_CHART_PROPERTIES:new_cpD} )
+
+            new_seriesD = OrderedDict( seriesD )
+            new_seriesD[CHART_STYLE_NAME] = '%s%i'%(style_prefix, i)
+
+            decimated = decimatedL[i]
+            lab_cell, val_cell_range, xval_cell_range, npoints = \
+                get_series_cells( doc, sheet_nameL[i], xcolL[i], ycolL[i], decimated )
+            new_seriesD[CHART_LABEL_CELL_ADDRESS] = lab_cell
+            new_seriesD[CHART_VALUES_CELL_RANGE_ADDRESS] = val_cell_range
+            new_seriesD[TABLE_CELL_RANGE_ADDRESS] = xval_cell_range
+
+            new_childD = childD
+            if decimated is not None:
+                # the copied domain and point count are those of the first series
+                new_childD = {CHART_DOMAIN: OrderedDict( childD[CHART_DOMAIN] ),
+                              CHART_DATA_POINT: OrderedDict( childD[CHART_DATA_POINT] )}
+                new_childD[CHART_DOMAIN][TABLE_CELL_RANGE_ADDRESS] = xval_cell_range
+                new_childD[CHART_DATA_POINT][CHART_REPEATED] = '%i'%npoints
+            add_slot( series_slot, fragment, attribOD=new_seriesD, childD=new_childD )
@@ -0,0 +1,138 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+A ColumnTable holds the data of a data sheet as a list of columns
+(e.g. NumPy arrays) instead of a list of rows.
+
+It behaves like a read-only list of rows, so it can be used anywhere
+list_of_rows is used. When a data sheet is streamed, the cells are formatted
+a whole column at a time by iter_formatted_blocks.
+
+NumPy is optional. Without it, columns can be any sequence of values.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from odscharts.data_table_desc import format_cell
+
+BLOCK_SIZE = 4096 # number of rows formatted at one time
+
+
+def get_float_list( values ):
+    """
+    Return values as a list of python floats, or None if any value is not a number.
+
+    Numeric NumPy arrays are converted in bulk.
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        if values.dtype.kind in 'biuf':
+            return values.astype(float).tolist()
+        if values.dtype.kind != 'O':
+            return None # string and date arrays are formatted cell by cell
+        values = values.tolist()
+
+    try:
+        return list( map(float, values) )
+    except (TypeError, ValueError):
+        return None
+
+
+def format_column( values ):
+    """
+    Return (value_type, office_valueL, textL) for a whole column of values.
+
+    value_type is "float" when every value is a number (and none is NaN), otherwise
+    it is a list holding the value type of each cell (as returned by format_cell).
+    """
+    floatL = get_float_list( values )
+    if floatL is not None:
+        if all(fval == fval for fval in floatL): # NaN != NaN
+            return "float", list( map(str, floatL) ), list( map('%g'.__mod__, floatL) )
+        values = floatL # NaN cells are empty
+
+    value_typeL = []
+    office_valueL = []
+    textL = []
+    for value in values:
+        value_type, office_value, text = format_cell( value )
+        value_typeL.append( value_type )
+        office_valueL.append( office_value )
+        textL.append( text )
+    return value_typeL, office_valueL, textL
+
+
+class ColumnTable(object):
+    """Holds labels, units and a list of column arrays for a data sheet.
+    """
+
+    def __init__(self, labelL, unitsL, arrayL):
+        """
+        Inits ColumnTable with labels, units and columns.
+
+        Columns may have different lengths. Missing values at the end of
+        a short column are left blank.
+
+        Attributes::
+
+            labelL: list of labels (row 1)
+            unitsL: list of units (row 2)
+            arrayL: list of columns
+            ncols: number of columns
+            ndata: number of data rows (length of longest column)
+        """
+        self.labelL = list( labelL )
+        self.unitsL = list( unitsL )
+        self.arrayL = list( arrayL )
+
+        self.ncols = max( len(self.labelL), len(self.arrayL) )
+        self.ndata = 0
+        for values in self.arrayL:
+            self.ndata = max( self.ndata, len(values) )
+
+    def __len__(self):
+        return self.ndata + 2
+
+    def __getitem__(self, i):
+        """Return row i as a list (row 0 is labels, row 1 is units)"""
+        if i < 0:
+            i += len(self)
+        if i == 0:
+            return self.labelL + [''] * (self.ncols - len(self.labelL))
+        if i == 1:
+            return self.unitsL + [''] * (self.ncols - len(self.unitsL))
+        if i >= len(self) or i < 0:
+            raise IndexError('ColumnTable row index out of range')
+
+        row = []
+        for values in self.arrayL:
+            if i-2 < len(values):
+                row.append( values[i-2] )
+            else:
+                row.append( '' )
+        return row
+
+    def __iter__(self):
+        for i in range( len(self) ):
+            yield self[i]
+
+    def iter_formatted_blocks(self, block_size=BLOCK_SIZE):
+        """
+        Yield the data rows (rows 3 through N) in blocks of up to block_size rows.
+
+        Each block is a list holding (value_type, office_valueL, textL)
+        for every column, as returned by format_column.
+        """
+        for istart in range(0, self.ndata, block_size):
+            iend = min(istart + block_size, self.ndata)
+            blockL = []
+            for values in self.arrayL:
+                col = values[istart:iend]
+                if len(col) < iend - istart:
+                    col = list( col ) + [''] * (iend - istart - len(col))
+                blockL.append( format_column( col ) )
+            yield blockL
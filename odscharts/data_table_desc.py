@@ -7,21 +7,130 @@ A DataTableDesc object holds the XML logic as well as all info about a data tabl
 """
 
 import sys
+import itertools
+import operator
+from collections import OrderedDict
+from odscharts.xml_backend import ET, escape_cdata, escape_attrib
+
+from odscharts.namespaces import TABLE_TABLE, TABLE_TABLE_COLUMN, TABLE_TABLE_ROW, TABLE_TABLE_CELL, \
+                                 TABLE_NAME, TABLE_STYLE_NAME, TABLE_DEFAULT_CELL_STYLE_NAME, \
+                                 TABLE_NUMBER_ROWS_REPEATED, TABLE_NUMBER_COLUMNS_REPEATED, \
+                                 OFFICE_VALUE_TYPE, OFFICE_VALUE, TEXT_P
+
+MAX_COLS = 16384   # max number of columns in a sheet
+MAX_ROWS = 1048576 # max number of rows in a sheet
+
+
+EMPTY_CELL = (None, None, None) # formatted value of an empty cell
+
 if sys.version_info < (3,):
-    import odscharts.ElementTree_27OD as ET
+    string_types = basestring
+else:
+    string_types = str
+
+# Element attributes must keep the order that iter_xml_chunks writes.
+# A dict keeps insertion order since python 3.7 (and is faster to copy).
+if sys.version_info >= (3, 7):
+    AttribOD = dict
 else:
-    import odscharts.ElementTree_34OD as ET
+    AttribOD = OrderedDict
 
+# attributes that start each row and cell Element (copied for each Element)
+ROW_ATTRIB_OD = AttribOD( [(TABLE_STYLE_NAME, "ro1")] )
+FLOAT_CELL_ATTRIB_OD = AttribOD( [(OFFICE_VALUE_TYPE, "float"), (TABLE_STYLE_NAME, "ce1")] )
+STRING_CELL_ATTRIB_OD = AttribOD( [(OFFICE_VALUE_TYPE, "string"), (TABLE_STYLE_NAME, "ce1")] )
+
+
+def format_cell( value ):
+    """
+    Return (value_type, office_value, text_p) for a data cell value.
+
+    value_type is "float" or "string". office_value is None for string cells.
+    None, NaN and '' are empty cells and return EMPTY_CELL.
+    """
+    if value is None:
+        return EMPTY_CELL
+    try:
+        fval = float( value )
+    except:
+        if isinstance(value, string_types) and not value:
+            return EMPTY_CELL
+        return "string", None, "%s"%value
+
+    if fval != fval: # NaN
+        return EMPTY_CELL
+    return "float", str(fval), "%g"%fval
+
+
+def get_cell_runs( cellL ):
+    """
+    Return list of (value_type, office_value, text_p, repeat) for the runs of
+    identical cells in cellL, a list of formatted cells (see format_cell).
+
+    Trailing empty cells are left out, they are part of the filler cell
+    that ends every row.
+    """
+    n = len( cellL )
+    while n and cellL[n-1] == EMPTY_CELL:
+        n -= 1
+
+    runL = []
+    i = 0
+    while i < n:
+        cell = cellL[i]
+        j = i + 1
+        while j < n and cellL[j] == cell:
+            j += 1
+        runL.append( cell + (j - i,) )
+        i = j
+    return runL
+
+
+def set_column_types( col_typeL, runL ):
+    """
+    Update col_typeL, the value type of each column, with the cell runs of a
+    data row (see get_cell_runs). A column with any string cell is "string".
+    """
+    icol = 0
+    for value_type, office_value, text_p, repeat in runL:
+        if value_type is not None:
+            for i in range( icol, icol + repeat ):
+                if col_typeL[i] != 'string':
+                    col_typeL[i] = value_type
+        icol += repeat
+
+
+class StreamConsumedError(Exception):
+    """Custom exception handler for a streamed data sheet whose rows were already used up"""
+    def __init__(self, msg):
+        self.msg = msg
+    def __str__(self):
+        return repr(self.msg)
 
 
 class DataTableDesc(object):
     """Holds a description of a data table sheet.
     """
 
-    def __init__(self, data_sheetname, list_of_rows, parent_obj):
+    def __init__(self, data_sheetname, list_of_rows, parent_obj, stream=False, table_style='ta1',
+                 keep_rows=True):
         """Inits SpreadSheet with filename and blank content.
 
-        NS: cleans up the namespace callouts of the xml Element
+        If stream is True, no Element objects are built for the cells.
+        xmlSheetObj is then a placeholder Comment that parent_obj replaces with
+        the text chunks from iter_xml_chunks when it is serialized.
+
+        list_of_rows may also be any iterable of rows without a length (e.g. a
+        generator, a DB cursor or a csv.reader). It is then always streamed and
+        only the first two rows (labels and units) are read here. The rest is
+        read once, when parent_obj is serialized, and nrows is None until then.
+
+        table_style is the automatic style of the sheet ("ta1" is a visible sheet).
+
+        If keep_rows is False and the sheet is built as Element objects, list_of_rows
+        is released once the Elements are built. Only the size, labels, units and
+        column types (col_typeL) are kept, so get_column can no longer be called.
+        (A streamed sheet always keeps its rows, they are read when it is serialized.)
 
         Attributes::
 
@@ -30,110 +139,419 @@ class DataTableDesc(object):
             ncols: max number of cols
             labelL: list of labels
             unitsL: list of units
+            col_typeL: value type of the data cells of each column (None until get_column_types)
+            stream: flag indicating that sheet xml is streamed as text
+            is_dirty: flag indicating that sheet is not yet in a saved content.xml
 
         """
 
-        NS = parent_obj.NS
-        
         self.data_sheetname = data_sheetname
-        self.list_of_rows = list_of_rows
+        self.table_style = table_style
+        self.stream = stream or not hasattr(list_of_rows, '__len__')
+        self.is_consumed = False # only set for one-shot iterators after serialization
+        self.is_dirty = True # True until the sheet is in a saved content.xml
+
+        if hasattr(list_of_rows, '__len__'):
+            self.list_of_rows = list_of_rows
+            self.is_one_shot = False
+
+            # calc number of rows and columns in data
+            self.nrows = len( list_of_rows )
+            self.ncols = getattr(list_of_rows, 'ncols', None) # a ColumnTable knows its ncols
+            if self.ncols is None:
+                self.ncols = 0
+                for row in list_of_rows:
+                    self.ncols = max(self.ncols, len(row))
 
-        # calc number of rows and columns in data
-        self.nrows = len( list_of_rows )
-        self.ncols = 0
-        for row in list_of_rows:
-            self.ncols = max(self.ncols, len(row))
+            head_rowL = [list_of_rows[i] for i in range( min(2, self.nrows) )]
+        else:
+            row_iter = iter( list_of_rows )
+            head_rowL = list( itertools.islice(row_iter, 2) )
+            self.list_of_rows = itertools.chain( head_rowL, row_iter )
+            self.is_one_shot = True
+
+            # number of rows is not known until the iterator is used up
+            self.nrows = None
+            self.ncols = 0
+            for row in head_rowL:
+                self.ncols = max(self.ncols, len(row))
 
         # make sure that row1 and row2 contain labels and units
+        self.head_rowL = head_rowL
         self.labelL = []
         self.unitsL = []
-        for n in range( self.ncols ):
-            try:
-                s = str( list_of_rows[0][n] ).strip()
-            except:
-                s = 'Column %i'%(n+1,)
-            self.labelL.append( s )
+        self.set_labels_and_units()
+        self.col_typeL = None
 
-            try:
-                s = str( list_of_rows[1][n] ).strip()
-            except:
-                s = ''
-            self.unitsL.append( s )
+        if self.stream:
+            self.qnameD = self.get_stream_qnames( parent_obj )
+            self.xmlSheetObj = ET.Comment( 'ODSCharts data sheet: %s'%data_sheetname )
+            parent_obj.add_splice( self.xmlSheetObj, self.iter_xml_chunks )
+            return
 
         # Start building new xml Element to be new Sheet in spreadsheet
         #print( nsmap )
-        attribD = {NS('table:name'):data_sheetname, NS('table:style-name'):"ta1"}
-        newsheet = ET.Element(NS('table:table'), attrib=attribD)
+        attribOD = AttribOD( [(TABLE_NAME, data_sheetname), (TABLE_STYLE_NAME, table_style)] )
+        newsheet = ET.Element(TABLE_TABLE, attrib=attribOD)
 
-        colD = {NS('table:style-name'):"co1", NS('table:number-columns-repeated'):"16384",
-                NS('table:default-cell-style-name'):"ce1"}
-        col_elm = ET.Element(NS('table:table-column'), attrib=colD)
+        colD = AttribOD( [(TABLE_STYLE_NAME, "co1"), (TABLE_NUMBER_COLUMNS_REPEATED, "16384"),
+                             (TABLE_DEFAULT_CELL_STYLE_NAME, "ce1")] )
+        col_elm = ET.Element(TABLE_TABLE_COLUMN, attrib=colD)
         newsheet.append( col_elm )
 
-        str_cellD = {NS('office:value-type'):"string", NS('table:style-name'):"ce1"}
-        float_cellD = {NS('office:value-type'):"float", NS('table:style-name'):"ce1"}
+        row_rep = MAX_ROWS # max number of rows
 
-        row_rep = 1048576 # max number of rows
+        # Runs of identical cells and rows are written once with a repeat count.
+        # (the final filler row is the same as an empty row)
+        row_obj = None
+        row_runL = None
 
-        for row in list_of_rows:
-            row_obj = ET.Element(NS('table:table-row'),
-                                 attrib={NS('table:style-name'):"ro1"})
+        # column types are found here if the rows are not kept
+        col_typeL = None if keep_rows else [None] * self.ncols
 
-            col_rep = 16384 # max number of columns
+        for irow, row in enumerate( itertools.chain( list_of_rows, [None] ) ):
+            if row is None: # final filler row
+                runL = []
+                nrep = row_rep
+            else:
+                runL = get_cell_runs( [format_cell( value ) for value in row] )
+                nrep = 1
+                row_rep -= 1 # decrement max remaining number of rows
+                if col_typeL is not None and irow >= 2:
+                    set_column_types( col_typeL, runL )
 
-            for value in row:
-                try:
-                    fval = float( value )
-                    float_cellD[NS('office:value')] = str(fval)
-                    D = float_cellD
-                    text_p = "%g"%fval
-                except:
-                    D = str_cellD
-                    text_p = "%s"%value
+            if runL == row_runL:
+                nrep += int( row_obj.get(TABLE_NUMBER_ROWS_REPEATED, '1') )
+                row_obj.set( TABLE_NUMBER_ROWS_REPEATED, '%i'%nrep )
+                continue
 
-                cell_obj = ET.Element(NS('table:table-cell'), attrib=D)
-                text_obj = ET.Element(NS('text:p'))
-                text_obj.text = text_p
-                cell_obj.append( text_obj )
-                row_obj.append(cell_obj)
-                col_rep -= 1 # decrement max available columns remaining
+            row_obj = ET.Element(TABLE_TABLE_ROW, attrib=ROW_ATTRIB_OD)
+            if nrep > 1:
+                row_obj.set( TABLE_NUMBER_ROWS_REPEATED, '%i'%nrep )
+            row_runL = runL
 
-            last_cell_obj = ET.Element(NS('table:table-cell'),
-                                       attrib={NS('table:number-columns-repeated'):"%i"%col_rep})
-            row_obj.append(last_cell_obj)
-            newsheet.append( row_obj )
-            row_rep -= 1 # decrement max remaining number of rows
+            col_rep = MAX_COLS # max number of columns
 
-        last_row_obj = ET.Element(NS('table:table-row'),
-                             attrib={NS('table:style-name'):"ro1",
-                                     NS('table:number-rows-repeated'):"%i"%row_rep})
-        last_row_obj.append( ET.Element(NS('table:table-cell'),
-                                        attrib={NS('table:number-columns-repeated'):"16384"}) )
+            for value_type, office_value, text_p, repeat in runL:
+                if value_type is None:
+                    D = {}
+                elif value_type == "float":
+                    D = FLOAT_CELL_ATTRIB_OD.copy()
+                    D[OFFICE_VALUE] = office_value
+                else:
+                    D = STRING_CELL_ATTRIB_OD.copy()
+                if repeat > 1:
+                    D[TABLE_NUMBER_COLUMNS_REPEATED] = "%i"%repeat
 
-        newsheet.append( last_row_obj )
+                cell_obj = ET.Element(TABLE_TABLE_CELL, attrib=D)
+                if value_type is not None:
+                    text_obj = ET.Element(TEXT_P)
+                    text_obj.text = text_p
+                    cell_obj.append( text_obj )
+                row_obj.append(cell_obj)
+                col_rep -= repeat # decrement max available columns remaining
 
+            last_cell_obj = ET.Element(TABLE_TABLE_CELL,
+                                       attrib={TABLE_NUMBER_COLUMNS_REPEATED:"%i"%col_rep})
+            row_obj.append(last_cell_obj)
+            newsheet.append( row_obj )
 
-        # make sure any added Element objects are in nsOD, rev_nsOD and qnameOD of parent_obj
 
         # make sure any added Element objects are in nsOD, rev_nsOD and qnameOD of parent_obj
-        def add_tag( tag ):
-            sL = tag.split('}')
-            uri = sL[0][1:]
-            name = sL[1]
-            parent_obj.qnameOD[tag] = parent_obj.nsOD[uri] + ':' + name
-            
         def add_tags( obj ):
             if hasattr(obj,'tag'):
-                add_tag( obj.tag )
+                add_tag( obj.tag, parent_obj )
             if hasattr(obj, 'attrib'):
                 for q,v in obj.attrib.items():
-                    add_tag( q )
+                    add_tag( q, parent_obj )
         
         for parent in newsheet.iter():
             add_tags( parent )
-            for child in parent.getchildren():
+            for child in list(parent):
                 add_tags( child )
                 
                 
 
         self.xmlSheetObj = newsheet
+
+        if not keep_rows:
+            # the Elements now hold the data, labels and units are in labelL and unitsL
+            self.col_typeL = col_typeL
+            self.list_of_rows = None
+            self.head_rowL = None
+
+    def set_labels_and_units(self):
+        """Fill labelL and unitsL out to ncols from the first two rows."""
+        for n in range( len(self.labelL), self.ncols ):
+            try:
+                s = str( self.head_rowL[0][n] ).strip()
+            except:
+                s = 'Column %i'%(n+1,)
+            self.labelL.append( s )
+
+            try:
+                s = str( self.head_rowL[1][n] ).strip()
+            except:
+                s = ''
+            self.unitsL.append( s )
+
+    def slim_copy(self):
+        """
+        Return a copy holding only the sheet name, size, labels and units.
+        (This is all a chart needs, e.g. when charts are built in another process.)
+        """
+        new_obj = DataTableDesc.__new__( DataTableDesc )
+        for name in ('data_sheetname', 'stream', 'nrows', 'ncols', 'labelL', 'unitsL'):
+            setattr( new_obj, name, getattr(self, name) )
+        return new_obj
+
+    def get_column(self, col):
+        """
+        Return the data values (rows 3 through N) of the 1-based column col.
+        Missing cells are None. (a column array of a ColumnTable is returned as it is)
+        """
+        if self.list_of_rows is None or self.is_one_shot:
+            raise StreamConsumedError('Values of data sheet "%s" are not kept '%self.data_sheetname +
+                                      '(only a list of rows or columns kept with keep_rows=True can be decimated)')
+
+        arrayL = getattr(self.list_of_rows, 'arrayL', None) # a ColumnTable holds its columns
+        if arrayL is not None:
+            if col <= len(arrayL):
+                return arrayL[col-1]
+            return []
+
+        valL = []
+        for irow in range( 2, self.nrows ):
+            row = self.list_of_rows[irow]
+            valL.append( row[col-1] if col <= len(row) else None )
+        return valL
+
+    def get_column_types(self):
+        """
+        Return list of the value type ("float", "string" or None if all empty)
+        of the data cells (rows 3 through N) of each column.
+        """
+        if self.col_typeL is None:
+            col_typeL = [None] * self.ncols
+            for icol in range( self.ncols ):
+                for value_type in set( format_cell( value )[0] for value in self.get_column( icol+1 ) ):
+                    if value_type is not None and col_typeL[icol] != 'string':
+                        col_typeL[icol] = value_type
+            self.col_typeL = col_typeL
+        return self.col_typeL
+
+    def get_stream_qnames(self, parent_obj):
+        """
+        Return dict of the qualified names (like "table:table-cell") used when
+        streaming, built from the namespace prefixes of parent_obj.
+        """
+        qnameD = {}
+        for short_name in ['table:table', 'table:name', 'table:style-name', 'table:table-column',
+                           'table:number-columns-repeated', 'table:default-cell-style-name',
+                           'table:table-row', 'table:number-rows-repeated', 'table:table-cell',
+                           'office:value-type', 'office:value', 'text:p']:
+            tag = parent_obj.NS( short_name )
+            add_tag( tag, parent_obj )
+            qnameD[short_name] = parent_obj.qnameOD[tag]
+        return qnameD
+
+    def iter_xml_chunks(self):
+        """
+        Yield the xml text of the data sheet one row at a time.
+
+        Produces the same text as serializing the Element built in non-stream
+        mode, but without making any Element objects.
+
+        Sets nrows and ncols once all the rows have been read.
+        """
+        if self.is_consumed:
+            raise StreamConsumedError('Rows of streamed data sheet "%s" have already been used'%self.data_sheetname)
+
+        Q = self.qnameD
+        esc_cdata = escape_cdata
+
+        yield '<%s %s="%s" %s="%s"><%s %s="co1" %s="%i" %s="ce1" />'%(
+                Q['table:table'], Q['table:name'], escape_attrib(self.data_sheetname),
+                Q['table:style-name'], self.table_style, Q['table:table-column'], Q['table:style-name'],
+                Q['table:number-columns-repeated'], MAX_COLS, Q['table:default-cell-style-name'])
+
+        row_start = '<%s %s="ro1">'%(Q['table:table-row'], Q['table:style-name'])
+        row_rep_start = '<%s %s="ro1" %s="%%i">'%(Q['table:table-row'], Q['table:style-name'],
+                                                 Q['table:number-rows-repeated'])
+        row_end = '</%s>'%Q['table:table-row']
+        float_cell = '<%s %s="float" %s="ce1" %s="%%s"'%(Q['table:table-cell'], Q['office:value-type'],
+                                                        Q['table:style-name'], Q['office:value'])
+        str_cell = '<%s %s="string" %s="ce1"'%(Q['table:table-cell'], Q['office:value-type'],
+                                               Q['table:style-name'])
+        empty_cell = '<%s'%Q['table:table-cell']
+        repeat_attr = ' %s="%%i"'%Q['table:number-columns-repeated']
+        text_p = '><%s>%%s</%s></%s>'%(Q['text:p'], Q['text:p'], Q['table:table-cell'])
+        empty_text_p = '><%s /></%s>'%(Q['text:p'], Q['table:table-cell'])
+        filler_cell = '<%s %s="%%i" />'%(Q['table:table-cell'], Q['table:number-columns-repeated'])
+
+        def cell_xml( value_type, office_value, text, repeat=1 ):
+            if value_type == "float":
+                start = float_cell%office_value
+            elif value_type is None:
+                start = empty_cell
+            else:
+                start = str_cell
+            if repeat > 1:
+                start += repeat_attr%repeat
+
+            if text:
+                return start + text_p%esc_cdata(text)
+            if value_type is None:
+                return start + ' />'
+            return start + empty_text_p
+
+        def row_xml( cells, nrep ):
+            if nrep > 1:
+                return row_rep_start%nrep + cells + row_end
+            return row_start + cells + row_end
+
+        def cells_xml( cellL ):
+            """Return (number of cells used, xml of cells) for a row of formatted cells"""
+            if cellL and cellL[-1][0] is not None and not any( map(operator.eq, cellL, cellL[1:]) ):
+                # no runs (most rows of dense data)
+                return len( cellL ), ''.join([cell_xml( *cell ) for cell in cellL])
+
+            runL = get_cell_runs( cellL )
+            ncells = 0
+            for run in runL:
+                ncells += run[3]
+            return ncells, ''.join([cell_xml( *run ) for run in runL])
+
+        def iter_row_cells():
+            """Yield (number of values, number of cells used, xml of cells) for each row"""
+            if hasattr(self.list_of_rows, 'iter_formatted_blocks'):
+                # a ColumnTable formats its data a whole column at a time
+                for row in self.head_rowL:
+                    yield (len(row),) + cells_xml( [format_cell(value) for value in row] )
+
+                float_cell_text = float_cell + text_p
+                empty_cell_xml = cell_xml( *EMPTY_CELL )
+                for blockL in self.list_of_rows.iter_formatted_blocks():
+                    colL = []
+                    for value_type, office_valueL, textL in blockL:
+                        if value_type == "float":
+                            colL.append( list( map(float_cell_text.__mod__, zip(office_valueL, textL)) ) )
+                        else:
+                            colL.append( list( map(cell_xml, value_type, office_valueL, textL) ) )
+
+                    for k, xmlT in enumerate( zip( *colL ) ):
+                        if xmlT[-1] != empty_cell_xml and not any( map(operator.eq, xmlT, xmlT[1:]) ):
+                            yield len(xmlT), len(xmlT), ''.join( xmlT )
+                        else:
+                            # rebuild the formatted cells of this row to find the runs
+                            cellL = []
+                            for value_type, office_valueL, textL in blockL:
+                                if value_type != "float":
+                                    value_type = value_type[k]
+                                cellL.append( (value_type, office_valueL[k], textL[k]) )
+                            yield (len(cellL),) + cells_xml( cellL )
+            else:
+                for row in self.list_of_rows:
+                    yield (len(row),) + cells_xml( [format_cell(value) for value in row] )
+
+        # Runs of identical cells and rows are written once with a repeat count.
+        nrows = 0
+        ncols = 0
+        last_cells = None # xml of all cells in previous row
+        nrep = 0          # number of times the previous row repeats
+        for nvalues, ncells, cells in iter_row_cells():
+            nrows += 1
+            ncols = max(ncols, nvalues)
+            cells += filler_cell%(MAX_COLS - ncells)
+
+            if cells == last_cells:
+                nrep += 1
+                continue
+            if last_cells is not None:
+                yield row_xml( last_cells, nrep )
+            last_cells = cells
+            nrep = 1
+
+        self.nrows = nrows
+        self.ncols = ncols
+        self.set_labels_and_units()
+        if self.is_one_shot:
+            self.is_consumed = True
+
+        # the final filler row is the same as an empty row
+        row_rep = MAX_ROWS - nrows
+        filler_cells = filler_cell%MAX_COLS
+        if last_cells == filler_cells:
+            nrep += row_rep
+        else:
+            if last_cells is not None:
+                yield row_xml( last_cells, nrep )
+            last_cells = filler_cells
+            nrep = row_rep
+
+        yield row_xml( last_cells, nrep ) + '</%s>'%Q['table:table']
+
+
+def read_data_table_desc( xmlSheetObj, parent_obj ):
+    """
+    Return a DataTableDesc for a data sheet Element read from an existing ods file.
+
+    nrows, ncols, labels and units are found from the cells. The cell values
+    are not kept, the Element itself stays in parent_obj unchanged.
+    """
+    NS = parent_obj.NS
+
+    dataTableObj = DataTableDesc.__new__( DataTableDesc )
+    dataTableObj.data_sheetname = xmlSheetObj.get( NS('table:name') )
+    dataTableObj.stream = False
+    dataTableObj.is_consumed = False
+    dataTableObj.is_dirty = False
+    dataTableObj.is_one_shot = False
+    dataTableObj.list_of_rows = None
+    dataTableObj.col_typeL = None
+    dataTableObj.xmlSheetObj = xmlSheetObj
+
+    head_rowL = [] # text of first two rows
+    nrows = 0 # rows up to last row with a value
+    ncols = 0
+    irow = 0
+    for row in xmlSheetObj.iter( NS('table:table-row') ):
+        row_rep = int( row.get( NS('table:number-rows-repeated'), '1' ) )
+
+        valL = []
+        n_empty = 0 # empty cells not yet put into valL
+        for cell in row.findall( NS('table:table-cell') ):
+            col_rep = int( cell.get( NS('table:number-columns-repeated'), '1' ) )
+            text_pL = cell.findall( NS('text:p') )
+            if text_pL or cell.get( NS('office:value-type') ) is not None:
+                valL.extend( [''] * n_empty )
+                n_empty = 0
+                text = '\n'.join( [''.join( text_p.itertext() ) for text_p in text_pL] )
+                valL.extend( [text] * col_rep )
+            else:
+                n_empty += col_rep
+
+        if valL:
+            nrows = irow + row_rep
+            ncols = max(ncols, len(valL))
+        for _ in range( min(row_rep, 2 - len(head_rowL)) ):
+            head_rowL.append( valL )
+        irow += row_rep
+
+    dataTableObj.nrows = nrows
+    dataTableObj.ncols = ncols
+    dataTableObj.head_rowL = head_rowL
+    dataTableObj.labelL = []
+    dataTableObj.unitsL = []
+    dataTableObj.set_labels_and_units()
+    return dataTableObj
+
+
+def add_tag( tag, parent_obj ):
+    """make sure tag is in qnameOD of parent_obj"""
+    if tag in parent_obj.qnameOD:
+        return
+    sL = tag.split('}')
+    uri = sL[0][1:]
+    name = sL[1]
+    parent_obj.qnameOD[tag] = parent_obj.nsOD[uri] + ':' + name
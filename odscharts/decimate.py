@@ -0,0 +1,204 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Decimate a long (x, y) series to a few thousand points for chart display.
+
+Two methods are available::
+    * lttb: Largest-Triangle-Three-Buckets, keeps the visual shape of the curve
+    * minmax: the min and max y point of each bucket, keeps every peak
+
+Buckets are made by point index, so x does not need to be sorted.
+Points where x or y is not a number are dropped.
+
+With NumPy the work is done on whole arrays (about a second for 10M points).
+Without NumPy a pure python version of the same method is used.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DECIMATE_METHOD_L = ['lttb', 'minmax']
+
+DEFAULT_MAX_POINTS = 2000 # number of points kept by default
+
+# smallest max_points of each method (first and last point plus one point, or a min and a max)
+MIN_POINTS_D = {'lttb':3, 'minmax':4}
+
+
+def check_method( method ):
+    """Raise ValueError if method is not a decimation method."""
+    if method not in DECIMATE_METHOD_L:
+        raise ValueError('decimate must be one of %s, not "%s"'%(DECIMATE_METHOD_L, method))
+
+
+def to_float( value ):
+    """Return value as a float (NaN if it is not a number)."""
+    try:
+        return float( value )
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def decimate_xy( xvals, yvals, max_points=DEFAULT_MAX_POINTS, method='lttb' ):
+    """
+    Return (x, y) holding at most max_points points of the series xvals, yvals.
+    (NumPy arrays if NumPy is installed, otherwise lists.)
+
+    The first and last points are always kept. A series that is already short
+    enough is returned with only the non-number points removed.
+    A max_points below 3 for "lttb" or 4 for "minmax" is raised to that.
+    """
+    check_method( method )
+    max_points = max(MIN_POINTS_D[method], int(max_points))
+
+    if np is not None:
+        x, y = get_xy_arrays( xvals, yvals )
+        if len(x) <= max_points:
+            return x, y
+        if method == 'lttb':
+            idx = lttb_indices_np( x, y, max_points )
+        else:
+            idx = minmax_indices_np( y, max_points )
+        return x[idx], y[idx]
+
+    x, y = get_xy_lists( xvals, yvals )
+    if len(x) <= max_points:
+        return x, y
+    if method == 'lttb':
+        idx = lttb_indices( x, y, max_points )
+    else:
+        idx = minmax_indices( y, max_points )
+    return [x[i] for i in idx], [y[i] for i in idx]
+
+
+def get_xy_arrays( xvals, yvals ):
+    """Return float arrays of the points where both xvals and yvals are numbers."""
+    x = as_float_array( xvals )
+    y = as_float_array( yvals )
+    n = min( len(x), len(y) )
+    x, y = x[:n], y[:n]
+
+    mask = np.isfinite( x ) & np.isfinite( y )
+    if not mask.all():
+        x, y = x[mask], y[mask]
+    return x, y
+
+def as_float_array( values ):
+    """Return values as a float array (NaN for any value that is not a number)."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'biuf':
+        return values.astype(float)
+    try:
+        return np.asarray( values, dtype=float )
+    except (TypeError, ValueError):
+        return np.array( [to_float(v) for v in values], dtype=float )
+
+def get_xy_lists( xvals, yvals ):
+    """Return float lists of the points where both xvals and yvals are numbers."""
+    x = []
+    y = []
+    inf = float('inf')
+    for xv, yv in zip( xvals, yvals ):
+        xv = to_float( xv )
+        yv = to_float( yv )
+        # NaN != NaN
+        if xv == xv and yv == yv and abs(xv) != inf and abs(yv) != inf:
+            x.append( xv )
+            y.append( yv )
+    return x, y
+
+
+def get_lttb_edges( n, n_out ):
+    """Return list of n_out-1 bucket edges splitting points 1 to n-2 into n_out-2 buckets."""
+    nb = n_out - 2
+    return [1 + (i * (n - 2)) // nb for i in range( nb + 1 )]
+
+
+def lttb_indices_np( x, y, n_out ):
+    """Return array of the n_out point indices chosen by LTTB (NumPy version)."""
+    n = len( x )
+    edges = np.array( get_lttb_edges( n, n_out ) )
+
+    # average point of every bucket, from cumulative sums (the last point is its own bucket)
+    csx = np.concatenate( ([0.0], np.cumsum(x)) )
+    csy = np.concatenate( ([0.0], np.cumsum(y)) )
+    lo = np.append( edges[:-1], n-1 )
+    hi = np.append( edges[1:], n )
+    avg_x = (csx[hi] - csx[lo]) / (hi - lo)
+    avg_y = (csy[hi] - csy[lo]) / (hi - lo)
+
+    idx = np.empty( n_out, dtype=int )
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range( n_out - 2 ):
+        b0, b1 = edges[i], edges[i+1]
+        xa, ya = x[a], y[a]
+        # twice the area of the triangle (point a, bucket point, average of next bucket)
+        area = np.abs( (xa - avg_x[i+1]) * (y[b0:b1] - ya) - (xa - x[b0:b1]) * (avg_y[i+1] - ya) )
+        a = b0 + int( area.argmax() )
+        idx[i+1] = a
+    return idx
+
+def lttb_indices( x, y, n_out ):
+    """Return list of the n_out point indices chosen by LTTB (pure python version)."""
+    n = len( x )
+    edges = get_lttb_edges( n, n_out ) + [n] # the last point is its own bucket
+
+    idx = [0]
+    a = 0
+    for i in range( n_out - 2 ):
+        b0, b1 = edges[i], edges[i+1]
+        n0, n1 = edges[i+1], edges[i+2]
+        avg_x = sum( x[n0:n1] ) / (n1 - n0)
+        avg_y = sum( y[n0:n1] ) / (n1 - n0)
+
+        xa, ya = x[a], y[a]
+        best_area = -1.0
+        for j in range( b0, b1 ):
+            area = abs( (xa - avg_x) * (y[j] - ya) - (xa - x[j]) * (avg_y - ya) )
+            if area > best_area:
+                best_area = area
+                best_j = j
+        a = best_j
+        idx.append( a )
+    idx.append( n - 1 )
+    return idx
+
+
+def get_minmax_bucket_size( n, n_out ):
+    """Return number of points per bucket so that min, max and end points fit in n_out (>= 4) points."""
+    nb = max(1, (n_out - 2) // 2)
+    return -(-n // nb) # ceil(n / nb)
+
+def minmax_indices_np( y, n_out ):
+    """Return sorted array of at most n_out point indices (min and max of each bucket), NumPy version."""
+    n = len( y )
+    b = get_minmax_bucket_size( n, n_out )
+    nb = -(-n // b)
+
+    # pad the last bucket with values that are never chosen
+    ymin = np.full( nb*b, np.inf )
+    ymin[:n] = y
+    ymax = np.full( nb*b, -np.inf )
+    ymax[:n] = y
+
+    start = np.arange( nb ) * b
+    imin = start + ymin.reshape( nb, b ).argmin( axis=1 )
+    imax = start + ymax.reshape( nb, b ).argmax( axis=1 )
+    return np.unique( np.concatenate( ([0], imin, imax, [n-1]) ) )
+
+def minmax_indices( y, n_out ):
+    """Return sorted list of at most n_out point indices (min and max of each bucket), pure python version."""
+    n = len( y )
+    b = get_minmax_bucket_size( n, n_out )
+
+    idxS = set( [0, n-1] )
+    for start in range( 0, n, b ):
+        bucket = y[start:start+b]
+        idxS.add( start + bucket.index( min(bucket) ) )
+        idxS.add( start + bucket.index( max(bucket) ) )
+    return sorted( idxS )
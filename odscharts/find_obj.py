@@ -3,21 +3,15 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 from __future__ import print_function
 
+from odscharts.namespaces import resolve_qname
+
 
 def NS( path_or_tag, nsOD ): 
     """force into tag format like: '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}table' """
-    if path_or_tag.startswith('{'):
-        return path_or_tag
-    
-    pathL = path_or_tag.split('/')
-    ansL = []
-    for path in pathL:    
-        sL = path_or_tag.split(':')
-        if len(sL)!=2:
-            ansL.append( path )
-        else:
-            ansL.append( '{%s}%s'%( nsOD[sL[0]], sL[1] ) )
-    return '/'.join( ansL )
+    resolve = getattr(nsOD, 'resolve', None)
+    if resolve is not None:
+        return resolve( path_or_tag ) # a NamespaceMap remembers resolved names
+    return resolve_qname( path_or_tag, nsOD )
 
         
 def NS_attrib( attD, nsOD ):
@@ -8,11 +8,7 @@ from copy import deepcopy
 from collections import OrderedDict
 from odscharts.find_obj import find_elem_w_attrib, elem_set, NS_attrib, NS
 
-import sys
-if sys.version_info < (3,):
-    import odscharts.ElementTree_27OD as ET
-else:
-    import odscharts.ElementTree_34OD as ET
+from odscharts.xml_backend import ET
 
 # 'Solid' is a place-holder 
 #    such that lineStyle==0 will not generate a new style of draw:stroke-dash
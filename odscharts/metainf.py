@@ -6,38 +6,44 @@ from __future__ import print_function
 Make changes to META-INF data and Object 1-N subdirectories
 """
 
-import sys
-if sys.version_info < (3,):
-    import odscharts.ElementTree_27OD as ET
-else:
-    import odscharts.ElementTree_34OD as ET
+import re
+from odscharts.xml_backend import ET
 
 
 
-def add_ObjectN( N, metainf_manifest_xml_obj):
-    """Add Object manifest:file-entry object to manifest.xml in META-INF of ods file"""
-    
+def set_ObjectN_entries( num_chartL, metainf_manifest_xml_obj):
+    """
+    Replace the Object manifest:file-entry objects of manifest.xml with the entries
+    for the chart numbers in num_chartL. The "Object N/" entries follow the root
+    entry and their xml files follow styles.xml.
+    """
+
     NS = metainf_manifest_xml_obj.NS
-    
+    full_path = NS('manifest:full-path')
+    media_type = NS('manifest:media-type')
+    file_entry = NS('manifest:file-entry')
+
     M = metainf_manifest_xml_obj.getroot() # just to reduce line lengths
-    
-    # put subdirectory object into manifest
-    obj_name = 'Object %i'%N
-    attribD = {NS('manifest:full-path'):obj_name+'/', 
-               NS('manifest:media-type'):"application/vnd.oasis.opendocument.chart"}
-                   
-    mfe = ET.Element(NS('manifest:file-entry'), attrib=attribD)
-    M.insert(N ,mfe) # place in order
-    
-    # put xml files into subdirectory
-    attribD = {NS('manifest:full-path'):obj_name+'/content.xml', 
-               NS('manifest:media-type'):"text/xml"}
-    mfe = ET.Element(NS('manifest:file-entry'), attrib=attribD)
-    M.insert(N*3 ,mfe) # place in order
-    
-    attribD = {NS('manifest:full-path'):obj_name+'/styles.xml', 
-               NS('manifest:media-type'):"text/xml"}
-    mfe = ET.Element(NS('manifest:file-entry'), attrib=attribD)
-    M.insert(N*3 ,mfe) # place in order
-    
-    
\ No newline at end of file
+
+    # entries of any "Object N" made by ODSCharts are built again
+    objectS = set()
+    for elem in M:
+        path = elem.get(full_path, '')
+        if re.match(r'Object \d+/((content|styles)\.xml)?$', path):
+            objectS.add( elem )
+    otherL = [elem for elem in M if elem not in objectS]
+
+    dirL = []  # subdirectory objects
+    fileL = [] # xml files in subdirectories
+    for N in sorted( num_chartL ):
+        obj_name = 'Object %i'%N
+        dirL.append( ET.Element(file_entry, attrib={full_path:obj_name+'/',
+                     media_type:"application/vnd.oasis.opendocument.chart"}) )
+        fileL.append( ET.Element(file_entry, attrib={full_path:obj_name+'/styles.xml',
+                      media_type:"text/xml"}) )
+        fileL.append( ET.Element(file_entry, attrib={full_path:obj_name+'/content.xml',
+                      media_type:"text/xml"}) )
+
+    # like: "/", Object 1/, Object 2/, "styles.xml", Object 1/styles.xml, Object 1/content.xml, ...
+    M[:] = otherL[:1] + dirL + otherL[1:2] + fileL + otherL[2:]
+
@@ -0,0 +1,142 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Qualified names of the ODF namespaces.
+
+A short name like "table:table-cell" is resolved to the qualified tag format used by
+ElementTree, like "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}table-cell".
+
+NamespaceMap is a prefix to URI mapping (like TemplateXML_File.rev_nsOD) that
+remembers every name it has resolved, so a name is only split and formatted once.
+The names used while building sheets and charts are also given as constants below.
+"""
+
+import sys
+from collections import OrderedDict
+
+if sys.version_info < (3,):
+    def intern( s ):
+        return s # python 2 can only intern byte strings
+else:
+    from sys import intern
+
+# prefix to URI of the namespaces in ODF files (as written by LibreOffice and Excel)
+ODF_NSOD = OrderedDict([
+    ('office',   'urn:oasis:names:tc:opendocument:xmlns:office:1.0'),
+    ('style',    'urn:oasis:names:tc:opendocument:xmlns:style:1.0'),
+    ('text',     'urn:oasis:names:tc:opendocument:xmlns:text:1.0'),
+    ('table',    'urn:oasis:names:tc:opendocument:xmlns:table:1.0'),
+    ('draw',     'urn:oasis:names:tc:opendocument:xmlns:drawing:1.0'),
+    ('fo',       'urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0'),
+    ('xlink',    'http://www.w3.org/1999/xlink'),
+    ('dc',       'http://purl.org/dc/elements/1.1/'),
+    ('meta',     'urn:oasis:names:tc:opendocument:xmlns:meta:1.0'),
+    ('number',   'urn:oasis:names:tc:opendocument:xmlns:datastyle:1.0'),
+    ('svg',      'urn:oasis:names:tc:opendocument:xmlns:svg-compatible:1.0'),
+    ('chart',    'urn:oasis:names:tc:opendocument:xmlns:chart:1.0'),
+    ('dr3d',     'urn:oasis:names:tc:opendocument:xmlns:dr3d:1.0'),
+    ('manifest', 'urn:oasis:names:tc:opendocument:xmlns:manifest:1.0'),
+    ('msoxl',    'http://schemas.microsoft.com/office/excel/formula'),
+    ])
+
+
+def resolve_qname( path_or_tag, nsOD ):
+    """
+    Return path_or_tag in tag format like: '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}table'
+    Each step of a path like 'office:body/office:spreadsheet' is resolved.
+    nsOD maps prefix to URI (e.g. TemplateXML_File.rev_nsOD).
+    """
+    if path_or_tag.startswith('{'):
+        return path_or_tag
+
+    ansL = []
+    for path in path_or_tag.split('/'):
+        sL = path.split(':')
+        if len(sL)!=2:
+            ansL.append( path )
+        else:
+            ansL.append( '{%s}%s'%( nsOD[sL[0]], sL[1] ) )
+    return intern( '/'.join( ansL ) )
+
+
+class NamespaceMap(OrderedDict):
+    """
+    OrderedDict of prefix to URI that caches the names resolved by resolve.
+
+    It can be used wherever ElementTree expects a namespaces mapping.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.qname_cacheD = {} # index=short name, value=tag format
+        OrderedDict.__init__(self, *args, **kwargs)
+
+    def __setitem__(self, prefix, uri, *args):
+        self.qname_cacheD = {}
+        OrderedDict.__setitem__(self, prefix, uri, *args)
+
+    def __delitem__(self, prefix, *args):
+        self.qname_cacheD = {}
+        OrderedDict.__delitem__(self, prefix, *args)
+
+    def resolve(self, path_or_tag):
+        """Return path_or_tag in tag format (see resolve_qname)."""
+        try:
+            return self.qname_cacheD[ path_or_tag ]
+        except KeyError:
+            tag = resolve_qname( path_or_tag, self )
+            self.qname_cacheD[ path_or_tag ] = tag
+            return tag
+
+
+ODF_NAMESPACES = NamespaceMap( ODF_NSOD )
+
+def qname( short_name ):
+    """Return the tag format of short_name in the standard ODF namespaces."""
+    return ODF_NAMESPACES.resolve( short_name )
+
+
+# ================= names used to build data sheets
+TABLE_TABLE = qname('table:table')
+TABLE_TABLE_COLUMN = qname('table:table-column')
+TABLE_TABLE_ROW = qname('table:table-row')
+TABLE_TABLE_CELL = qname('table:table-cell')
+TABLE_NAME = qname('table:name')
+TABLE_STYLE_NAME = qname('table:style-name')
+TABLE_DEFAULT_CELL_STYLE_NAME = qname('table:default-cell-style-name')
+TABLE_NUMBER_ROWS_REPEATED = qname('table:number-rows-repeated')
+TABLE_NUMBER_COLUMNS_REPEATED = qname('table:number-columns-repeated')
+TABLE_CELL_RANGE_ADDRESS = qname('table:cell-range-address')
+OFFICE_VALUE_TYPE = qname('office:value-type')
+OFFICE_VALUE = qname('office:value')
+TEXT_P = qname('text:p')
+
+# ================= names used to build charts
+STYLE_STYLE = qname('style:style')
+STYLE_NAME = qname('style:name')
+STYLE_FAMILY = qname('style:family')
+STYLE_GRAPHIC_PROPERTIES = qname('style:graphic-properties')
+STYLE_CHART_PROPERTIES = qname('style:chart-properties')
+
+CHART_SERIES = qname('chart:series')
+CHART_DOMAIN = qname('chart:domain')
+CHART_DATA_POINT = qname('chart:data-point')
+CHART_STYLE_NAME = qname('chart:style-name')
+CHART_ATTACHED_AXIS = qname('chart:attached-axis')
+CHART_LABEL_CELL_ADDRESS = qname('chart:label-cell-address')
+CHART_VALUES_CELL_RANGE_ADDRESS = qname('chart:values-cell-range-address')
+CHART_REPEATED = qname('chart:repeated')
+CHART_SYMBOL_TYPE = qname('chart:symbol-type')
+CHART_SYMBOL_NAME = qname('chart:symbol-name')
+CHART_SYMBOL_WIDTH = qname('chart:symbol-width')
+CHART_SYMBOL_HEIGHT = qname('chart:symbol-height')
+CHART_MINIMUM = qname('chart:minimum')
+CHART_MAXIMUM = qname('chart:maximum')
+
+DRAW_FILL = qname('draw:fill')
+DRAW_FILL_COLOR = qname('draw:fill-color')
+DRAW_STROKE = qname('draw:stroke')
+DRAW_STROKE_DASH = qname('draw:stroke-dash')
+SVG_STROKE_COLOR = qname('svg:stroke-color')
+SVG_STROKE_WIDTH = qname('svg:stroke-width')
@@ -0,0 +1,129 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Compare two ods files member by member.
+
+Members with identical bytes are equal. Other xml members are compared with
+SetRep.find_diff, so attribute order and namespace declarations do not matter.
+Members that are not xml are compared byte for byte.
+
+Run with:  python -m odscharts.ods_diff first.ods second.ods
+Exit status is 0 if the files are equal, 1 if they differ.
+"""
+
+import sys
+import argparse
+import zipfile
+from collections import OrderedDict
+
+from odscharts.xml_set_rep import SetRep
+
+# meta.xml holds the creation date, so it differs on every save
+DEFAULT_IGNORE_L = ['meta.xml']
+
+
+class OdsDiff(object):
+    """
+    The result of diff_ods.
+    """
+
+    def __init__(self, file1, file2):
+        self.file1 = file1
+        self.file2 = file2
+
+        self.only_in1L = [] # member names only found in file1
+        self.only_in2L = [] # member names only found in file2
+        self.xml_diffOD = OrderedDict() # index=xml member name, value=SetRepDiff (only if bytes differ)
+        self.binary_changedL = [] # names of other members whose bytes differ
+
+    @property
+    def changed_xmlL(self):
+        return [name for name, diff in self.xml_diffOD.items() if not diff.is_equal]
+
+    @property
+    def is_equal(self):
+        return not (self.only_in1L or self.only_in2L or self.binary_changedL or self.changed_xmlL)
+
+    def summary(self, max_paths=10):
+        """Return a text report of the differences (at most max_paths paths per depth of each member)"""
+        sL = []
+        for name in self.only_in1L:
+            sL.append( 'Only in %s: %s'%(self.file1, name) )
+        for name in self.only_in2L:
+            sL.append( 'Only in %s: %s'%(self.file2, name) )
+        for name in self.binary_changedL:
+            sL.append( 'Binary member differs: %s'%name )
+        for name in self.changed_xmlL:
+            sL.append( '='*20 + ' %s '%name + '='*20 )
+            sL.append( self.xml_diffOD[name].summary( max_paths=max_paths ) )
+
+        if self.is_equal:
+            sL.append( 'Files are equal' )
+        return '\n'.join( sL )
+
+
+def diff_ods( file1, file2, ignoreL=DEFAULT_IGNORE_L ):
+    """
+    Compare two ods files (file names or binary file objects) and return an OdsDiff object.
+
+    Members named in ignoreL are not compared.
+    """
+    ods_diff = OdsDiff( getattr(file1, 'name', file1), getattr(file2, 'name', file2) )
+
+    with zipfile.ZipFile( file1 ) as zip1, zipfile.ZipFile( file2 ) as zip2:
+        nameL1 = [name for name in zip1.namelist() if name not in ignoreL]
+        nameL2 = [name for name in zip2.namelist() if name not in ignoreL]
+        nameS2 = set( nameL2 )
+        nameS1 = set( nameL1 )
+
+        ods_diff.only_in1L = [name for name in nameL1 if name not in nameS2]
+        ods_diff.only_in2L = [name for name in nameL2 if name not in nameS1]
+
+        for name in nameL1:
+            if name not in nameS2:
+                continue
+            data1 = zip1.read( name )
+            data2 = zip2.read( name )
+            if data1 == data2:
+                continue
+
+            if name.endswith('.xml'):
+                setrep1 = SetRep( data1.decode('utf-8') )
+                setrep2 = SetRep( data2.decode('utf-8') )
+                ods_diff.xml_diffOD[name] = setrep1.find_diff( setrep2 )
+            else:
+                ods_diff.binary_changedL.append( name )
+
+    return ods_diff
+
+
+def main( argv=None ):
+    """Command line entry point, returns exit status"""
+    parser = argparse.ArgumentParser( description='Compare two ods files member by member.' )
+    parser.add_argument( 'file1', help='first ods file' )
+    parser.add_argument( 'file2', help='second ods file' )
+    parser.add_argument( '--ignore', action='append', default=[], metavar='MEMBER',
+                         help='member name to skip (can be repeated), meta.xml is always skipped unless --all' )
+    parser.add_argument( '--all', action='store_true', help='also compare meta.xml' )
+    parser.add_argument( '--max-paths', type=int, default=10,
+                         help='most element paths to list per depth of each member (default 10)' )
+    parser.add_argument( '-q', '--quiet', action='store_true', help='no report, only exit status' )
+    args = parser.parse_args( argv )
+
+    ignoreL = args.ignore
+    if not args.all:
+        ignoreL = ignoreL + DEFAULT_IGNORE_L
+
+    ods_diff = diff_ods( args.file1, args.file2, ignoreL=ignoreL )
+    if not args.quiet:
+        print( ods_diff.summary( max_paths=args.max_paths ) )
+
+    if ods_diff.is_equal:
+        return 0
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
@@ -6,11 +6,7 @@ from __future__ import print_function
 A PlotTableDesc object holds the XML logic as well as all info about a
 scatter plot table
 """
-import sys
-if sys.version_info < (3,):
-    import odscharts.ElementTree_27OD as ET
-else:
-    import odscharts.ElementTree_34OD as ET
+from odscharts.xml_backend import ET
 
 from odscharts.color_utils import BIG_COLOR_HEXSTR_LIST,  EXCEL_COLOR_LIST, getValidHexStr
 
@@ -110,6 +106,8 @@ class PlotTableDesc(object):
 
         # make sure any added Element objects are in nsOD, rev_nsOD and qnameOD of parent_obj
         def add_tag( tag ):
+            if tag in parent_obj.qnameOD:
+                return
             sL = tag.split('}')
             uri = sL[0][1:]
             name = sL[1]
@@ -124,12 +122,17 @@ class PlotTableDesc(object):
 
         for parent in newsheet.iter():
             add_tags( parent )
-            for child in parent.getchildren():
+            for child in list(parent):
                 add_tags( child )
 
 
         self.xmlSheetObj = newsheet
 
+        self.num_chart = num_chart # chart is in "Object N" of ods file
+        self.is_opened = False # True for a plot read from an existing ods file
+        self.is_dirty = True # True when "Object N" must be built again at save
+        self.chart_obj = None
+        self.chart_index = None # ChartStyleIndex of chart_obj
 
         self.plot_sheetname = ''
         self.data_sheetname = ''
@@ -137,196 +140,170 @@ class PlotTableDesc(object):
         self.xlabel = ''
         self.ylabel = ''
         self.y2label = ''
-        self.ycolL = None
-        self.ycol2L = None
 
         self.logx = False
         self.logy = False
         self.log2y = False
 
-        self.xcolL = []
-        self.ycolDataSheetNameL = []
-
-        self.xcol2L = []
-        self.ycol2_DataSheetNameL = []
-
-        self.showMarkerL = None
-        self.showMarker2L = None
-        self.markerTypeL = None
-        self.markerType2L = None
-        
-        self.showLineL = None
-        self.showLine2L = None
-
-        self.lineThkL = None
-        self.lineThk2L = None
-        
-        self.lineStyleL = None
-        self.lineStyle2L = None
+        # the curves of each y axis (see AxisSeries), also read as ycolL, colorL, ycol2L, color2L, etc.
+        self.series = AxisSeries()
+        self.series2 = AxisSeries()
         self.set_of_line_styles = set()
-        
-        self.markerHtWdL = None
-        self.markerHtWd2L = None
-        
-        self.showUnits = True
 
-        self.colorL = None
-        self.color2L = None
+        self.showUnits = True
 
-        self.labelL = None
-        self.label2L = None
+        # decimated series are on a hidden helper sheet (see AxisSeries.decimatedL)
+        self.decimated_sheetname = None # name of the helper sheet
+        self.decimated_table = None # ColumnTable of the helper sheet
 
     def add_to_primary_y(self, data_sheetname, xcol, ycolL,
                             showMarkerL=None, showLineL=None,
                             lineThkL=None, lineStyleL=None, 
-                            colorL=None, labelL=None):
+                            colorL=None, labelL=None, decimatedL=None):
         """
         Add new curves to primary y axis
         """
         if ycolL is None:
             return
+        self.is_dirty = True
 
-        #print('colorL =',colorL)
-        # self.colorL will always be None 1st time through
-        if self.colorL is None:
-            self.colorL = []
-            self.labelL = []
-            self.showMarkerL = []
-            self.markerTypeL = []
-            self.showLineL = []
-            self.lineThkL = []
-            self.lineStyleL = []
-            self.markerHtWdL = []
-            self.ycolL = []
-            self.xcolL = []
-            self.ycolDataSheetNameL = []
-
-        # Fill attribute lists with input list values
-        for i,ycol in enumerate(ycolL):
-            self.ycolL.append( ycol )
-            self.xcolL.append( xcol )
-            self.ycolDataSheetNameL.append( data_sheetname )
-
-            # See if there's an input color
-            c_inp = get_ith_value( colorL, i, None )
-            c_palette = self.get_next_color()
-            c = getValidHexStr( c_inp, c_palette)
-            self.colorL.append( c )
-            
-            self.markerTypeL.append( self.get_next_symbol_type() )
-
-            self.labelL.append( get_ith_value( labelL, i, None ) )
-
-            if len(self.showMarkerL):
-                self.showMarkerL.append( get_ith_value( showMarkerL, i, self.showMarkerL[-1] ) )
-            else:
-                self.showMarkerL.append( get_ith_value( showMarkerL, i, True ) )
-
-            if len(self.showLineL):
-                self.showLineL.append( get_ith_value( showLineL, i, self.showLineL[-1] ) )
-            else:
-                self.showLineL.append( get_ith_value( showLineL, i, True ) )
-
-            # first get number into line thickness
-            if len(self.lineThkL): # remember that this holds strings like: "2.5mm" 
-                self.lineThkL.append( get_ith_value( lineThkL, i, self.lineThkL[-1][:-2] ) )
-            else:
-                self.lineThkL.append( get_ith_value( lineThkL, i, 0.8 ) )
-                
-            # then convert to mm
-            try:
-                v = float(self.lineThkL[-1])
-                self.markerHtWdL.append("%gmm"%(v*3,))
-                self.lineThkL[-1] = "%gmm"%v
-            except:
-                self.markerHtWdL.append("%2.4mm")
-                self.lineThkL[-1] = "0.8mm"
-
-            # Set line style to solid unless otherwise indicated
-            if len(self.lineStyleL):
-                self.lineStyleL.append( get_ith_value( lineStyleL, i, self.lineStyleL[-1] ) )
-            else:
-                self.lineStyleL.append( get_ith_value( lineStyleL, i, 0 ) )
-                
-            # include all y curves (primary and secondary) in set_of_line_styles
-            self.set_of_line_styles.update( set(self.lineStyleL) )
-            self.set_of_line_styles.discard(0)  # Make sure that 0 does not appear
-            
+        self.series.add_curves( self, data_sheetname, xcol, ycolL,
+                                showMarkerL=showMarkerL, showLineL=showLineL,
+                                lineThkL=lineThkL, lineStyleL=lineStyleL,
+                                colorL=colorL, labelL=labelL, decimatedL=decimatedL )
 
     def add_to_secondary_y(self, data_sheetname, xcol, ycol2L,
                               showMarker2L=None, showLine2L=None,
                               lineThk2L=None, lineStyle2L=None, 
-                              color2L=None, label2L=None):
+                              color2L=None, label2L=None, decimated2L=None):
         """
-        Add new curves to primary y axis
+        Add new curves to secondary y axis
         """
         if ycol2L is None:
             return
+        self.is_dirty = True
+
+        self.series2.add_curves( self, data_sheetname, xcol, ycol2L,
+                                 showMarkerL=showMarker2L, showLineL=showLine2L,
+                                 lineThkL=lineThk2L, lineStyleL=lineStyle2L,
+                                 colorL=color2L, labelL=label2L, decimatedL=decimated2L )
+
+
+# (primary y name, secondary y name, AxisSeries name) of each per-curve list of PlotTableDesc
+SERIES_ATTR_L = [('ycolL', 'ycol2L', 'ycolL'),
+                 ('xcolL', 'xcol2L', 'xcolL'),
+                 ('ycolDataSheetNameL', 'ycol2_DataSheetNameL', 'sheet_nameL'),
+                 ('colorL', 'color2L', 'colorL'),
+                 ('labelL', 'label2L', 'labelL'),
+                 ('showMarkerL', 'showMarker2L', 'showMarkerL'),
+                 ('markerTypeL', 'markerType2L', 'markerTypeL'),
+                 ('showLineL', 'showLine2L', 'showLineL'),
+                 ('lineThkL', 'lineThk2L', 'lineThkL'),
+                 ('lineStyleL', 'lineStyle2L', 'lineStyleL'),
+                 ('markerHtWdL', 'markerHtWd2L', 'markerHtWdL'),
+                 ('decimatedL', 'decimated2L', 'decimatedL')]
+
+class AxisSeries(object):
+    """
+    Holds the curves of one y axis as parallel lists, one entry per curve.
+
+    decimatedL entries are None or (helper sheet name, x column, y column, last row)
+    of the decimated curve on the hidden helper sheet.
+    """
+
+    __slots__ = tuple( name for _, _, name in SERIES_ATTR_L )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr( self, name, [] )
 
-        # self.color2L will always be None 1st time through
-        if self.color2L is None:
-            self.color2L = []
-            self.label2L = []
-            self.showMarker2L = []
-            self.markerType2L = []
-            self.showLine2L = []
-            self.lineThk2L = []
-            self.lineStyle2L = []
-            self.markerHtWd2L = []
-            self.ycol2L = []
-            self.xcol2L = []
-            self.ycol2_DataSheetNameL = []
-
-        # Fill attribute lists with input list values
-        for i,ycol in enumerate(ycol2L):
-            self.ycol2L.append( ycol )
-            self.xcol2L.append( xcol )
-            self.ycol2_DataSheetNameL.append( data_sheetname )
-
-            # See if there's an input color
-            c_inp = get_ith_value( color2L, i, None )
-            c_palette = self.get_next_color()
-            c = getValidHexStr( c_inp, c_palette)
-            self.color2L.append( c )
-            
-            self.markerType2L.append( self.get_next_symbol_type() )
-
-            self.label2L.append( get_ith_value( label2L, i, None ) )
-
-            if len(self.showMarker2L):
-                self.showMarker2L.append( get_ith_value( showMarker2L, i, self.showMarker2L[-1] ) )
-            else:
-                self.showMarker2L.append( get_ith_value( showMarker2L, i, True ) )
-
-            if len(self.showLine2L):
-                self.showLine2L.append( get_ith_value( showLine2L, i, self.showLine2L[-1] ) )
-            else:
-                self.showLine2L.append( get_ith_value( showLine2L, i, True ) )
-
-            # first get number into line thickness
-            if len(self.lineThk2L): # remember that this holds strings like: "2.5mm" 
-                self.lineThk2L.append( get_ith_value( lineThk2L, i, self.lineThk2L[-1][:-2] ) )
-            else:
-                self.lineThk2L.append( get_ith_value( lineThk2L, i, 0.8 ) )
-                
-            # then convert to mm
+    def __len__(self):
+        return len( self.ycolL )
+
+    def add_curves(self, plotSheetObj, data_sheetname, xcol, ycolL,
+                   showMarkerL=None, showLineL=None,
+                   lineThkL=None, lineStyleL=None,
+                   colorL=None, labelL=None, decimatedL=None):
+        """
+        Append the curves ycolL vs xcol of data_sheetname.
+        Colors and marker types come from the palettes of plotSheetObj.
+        A missing showMarker, showLine, lineThk or lineStyle repeats that of the curve before it.
+        (Not called by User)
+        """
+        num_new = len( ycolL )
+
+        self.ycolL.extend( ycolL )
+        self.xcolL.extend( [xcol] * num_new )
+        self.sheet_nameL.extend( [data_sheetname] * num_new )
+
+        # See if there's an input color
+        for c_inp in fill_values( colorL, num_new, None ):
+            self.colorL.append( getValidHexStr( c_inp, plotSheetObj.get_next_color() ) )
+        for _ in range( num_new ):
+            self.markerTypeL.append( plotSheetObj.get_next_symbol_type() )
+
+        self.labelL.extend( fill_values( labelL, num_new, None ) )
+        self.decimatedL.extend( fill_values( decimatedL, num_new, None ) )
+
+        self.showMarkerL.extend( fill_values( showMarkerL, num_new, last_value(self.showMarkerL, True), True ) )
+        self.showLineL.extend( fill_values( showLineL, num_new, last_value(self.showLineL, True), True ) )
+
+        # line thickness is a number, lineThkL holds strings like: "2.5mm"
+        last_thk = 0.8
+        if self.lineThkL:
+            last_thk = self.lineThkL[-1][:-2]
+        mmD = {} # index=line thickness, value=(line thickness, marker size) strings shared by the curves
+        for i in range( num_new ):
+            # a missing thickness repeats the converted thickness of the curve before it
             try:
-                v = float(self.lineThk2L[-1])
-                self.markerHtWd2L.append("%gmm"%(v*3,))
-                self.lineThk2L[-1] = "%gmm"%v
+                v = float( get_ith_value( lineThkL, i, last_thk ) )
             except:
-                self.markerHtWd2L.append("%2.4mm")
-                self.lineThk2L[-1] = "0.8mm"
-
-            # Set line style to solid unless otherwise indicated
-            if len(self.lineStyle2L):
-                self.lineStyle2L.append( get_ith_value( lineStyle2L, i, self.lineStyle2L[-1] ) )
-            else:
-                self.lineStyle2L.append( get_ith_value( lineStyle2L, i, 0 ) )
-                
-            # include all y curves (primary and secondary) in set_of_line_styles
-            self.set_of_line_styles.update( set(self.lineStyle2L) )
-            self.set_of_line_styles.discard(0)  # Make sure that 0 does not appear
+                v = 0.8
+            if v not in mmD:
+                mmD[v] = ("%gmm"%v, "%gmm"%(v*3,))
+            self.lineThkL.append( mmD[v][0] )
+            self.markerHtWdL.append( mmD[v][1] )
+            last_thk = v
+
+        # Set line style to solid unless otherwise indicated
+        new_styleL = fill_values( lineStyleL, num_new, last_value(self.lineStyleL, 0), True )
+        self.lineStyleL.extend( new_styleL )
+
+        # include all y curves (primary and secondary) in set_of_line_styles
+        plotSheetObj.set_of_line_styles.update( new_styleL )
+        plotSheetObj.set_of_line_styles.discard(0)  # Make sure that 0 does not appear
+
+
+def make_series_property( axis_name, list_name ):
+    """Return a read-only property giving list list_name of the AxisSeries in attribute axis_name."""
+    def get_list( self ):
+        return getattr( getattr(self, axis_name), list_name )
+    return property( get_list )
+
+for prim_name, sec_name, list_name in SERIES_ATTR_L:
+    setattr( PlotTableDesc, prim_name, make_series_property( 'series', list_name ) )
+    setattr( PlotTableDesc, sec_name, make_series_property( 'series2', list_name ) )
+
+def fill_values( valL, num_vals, default_val, repeat_last=False ):
+    """
+    Return list of the first num_vals values in valL. Missing values are default_val,
+    or with repeat_last, the value before them (default_val only if valL is empty).
+    """
+    try:
+        resultL = list( valL[:num_vals] )
+    except:
+        resultL = []
+    if len(resultL) < num_vals:
+        if repeat_last and resultL:
+            default_val = resultL[-1]
+        resultL.extend( [default_val] * (num_vals - len(resultL)) )
+    return resultL
+
+def last_value( valL, default_val ):
+    """Return the last value in valL, or default_val if valL is empty"""
+    if valL:
+        return valL[-1]
+    return default_val
 
 def get_ith_value( valL, i, default_val ):
     """Return the ith value in valL if possible, otherwise default_val"""
@@ -338,3 +315,24 @@ def get_ith_value( valL, i, default_val ):
     return val
 
 
+def read_plot_table_desc( xmlSheetObj, plot_sheetname, num_chart ):
+    """
+    Return a PlotTableDesc for a plot sheet Element read from an existing ods file.
+
+    Only the sheet name and chart number are known. The chart itself ("Object N")
+    is not rebuilt, it is copied from the existing file when saved.
+    """
+    plotSheetObj = PlotTableDesc.__new__( PlotTableDesc )
+    plotSheetObj.xmlSheetObj = xmlSheetObj
+    plotSheetObj.plot_sheetname = plot_sheetname
+    plotSheetObj.num_chart = num_chart
+    plotSheetObj.is_opened = True
+    plotSheetObj.is_dirty = False
+    plotSheetObj.chart_obj = None
+    plotSheetObj.chart_index = None
+    plotSheetObj.series = AxisSeries()
+    plotSheetObj.series2 = AxisSeries()
+    plotSheetObj.set_of_line_styles = set()
+    plotSheetObj.decimated_sheetname = None
+    plotSheetObj.decimated_table = None
+    return plotSheetObj
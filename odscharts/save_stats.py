@@ -0,0 +1,235 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Timing and counters of a SpreadSheet save.
+
+Wall time is charged to one phase at a time, so the phase times add up to the
+time spent inside ODSCharts. The phases are::
+    * template load: reading or copying the parsed ods templates
+    * data cells: building data sheet cells (Elements in add_sheet, text for streamed sheets)
+    * chart build: writing chart objects (ChartEmitter.emit, line dash styles)
+    * serialize: turning Element trees into xml text
+    * zip write: compressing and writing the zip (including raw copies of unchanged members)
+    * count elements: counting the Elements of each sheet (only done when stats are collected)
+
+When stats are not collected, a NullSaveStats is used and costs nothing.
+"""
+
+import time
+from collections import OrderedDict
+
+# wall clock with the best resolution
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time # python 2
+
+
+class SaveStats(object):
+    """Holds the timing and counters of one save (see SpreadSheet.stats).
+
+    Attributes::
+
+        phase_timeD: index=phase name, value=wall time (sec) charged to the phase
+        member_sizeD: index=zip member name, value=(uncompressed bytes, compressed bytes)
+        raw_memberL: names of zip members copied as raw compressed bytes
+        sheet_elem_countD: index=sheet name, value=number of Elements (None for a streamed sheet)
+        sheet_nrowsD: index=data sheet name, value=number of rows including label and units rows
+        chart_elem_countD: index=plot sheet name, value=number of Elements in chart content.xml
+        template_loads: number of templates loaded (from cache or parsed)
+        template_parses: number of templates read and parsed from the ods template files
+        save_time: wall time (sec) from start to end of the save
+    """
+
+    enabled = True
+
+    def __init__(self, template_countD=None):
+        """template_countD is the process-wide dict of template counters (keys "loads" and "parses")."""
+        self.phase_timeD = OrderedDict()
+        self.member_sizeD = OrderedDict()
+        self.raw_memberL = []
+        self.sheet_elem_countD = OrderedDict()
+        self.sheet_nrowsD = OrderedDict()
+        self.chart_elem_countD = OrderedDict()
+        self.template_loads = 0
+        self.template_parses = 0
+        self.save_time = None
+
+        self.template_countD = template_countD
+        if template_countD is None:
+            self.template_count0D = {}
+        else:
+            self.template_count0D = dict( template_countD )
+
+        self.current_phase = None # phase that is charged for the time since t_switch
+        self.t_switch = timer()
+        self.t_start = None
+
+    def switch(self, phase):
+        """
+        Charge the time since the last switch to the current phase and make
+        phase the current phase (None==charge nobody). Return the previous phase.
+        """
+        t = timer()
+        if self.current_phase is not None:
+            self.phase_timeD[self.current_phase] = self.phase_timeD.get(self.current_phase, 0.0) + t - self.t_switch
+        self.t_switch = t
+
+        old_phase = self.current_phase
+        self.current_phase = phase
+        return old_phase
+
+    def phase(self, phase):
+        """Return a context manager that charges the time of its block to phase."""
+        return PhaseTimer( self, phase )
+
+    def timed_chunks(self, phase, chunk_iter):
+        """Yield the items of chunk_iter, charging the time spent inside chunk_iter to phase."""
+        chunk_iter = iter( chunk_iter )
+        while True:
+            old_phase = self.switch( phase )
+            try:
+                chunk = next( chunk_iter )
+            except StopIteration:
+                return
+            finally:
+                self.switch( old_phase )
+            yield chunk
+
+    def timed_splices(self, phase, spliceD):
+        """Return a copy of the spliceD of a TemplateXML_File whose chunk sources are charged to phase."""
+        def timed_source( chunk_source ):
+            return lambda: self.timed_chunks( phase, chunk_source() )
+
+        return dict( (placeholder, timed_source(chunk_source)) for placeholder, chunk_source in spliceD.items() )
+
+    def start(self):
+        """Called at the start of a save."""
+        self.t_start = timer()
+
+    def finish(self):
+        """Called at the end of a save to set save_time and the template counters."""
+        self.switch( None )
+        if self.t_start is not None:
+            self.save_time = timer() - self.t_start
+
+        if self.template_countD is not None:
+            self.template_loads = self.template_countD['loads'] - self.template_count0D['loads']
+            self.template_parses = self.template_countD['parses'] - self.template_count0D['parses']
+
+    def add_member(self, info, is_raw=False):
+        """Record the sizes of the zip member described by ZipInfo info."""
+        self.member_sizeD[info.filename] = (info.file_size, info.compress_size)
+        if is_raw:
+            self.raw_memberL.append( info.filename )
+
+    def count_sheet(self, sheetname, elem, nrows=None):
+        """Record the number of Elements in the sheet Element elem (None for a streamed sheet)."""
+        if elem is None:
+            self.sheet_elem_countD[sheetname] = None
+        else:
+            self.sheet_elem_countD[sheetname] = sum( 1 for _ in elem.iter() )
+        if nrows is not None:
+            self.sheet_nrowsD[sheetname] = nrows
+
+    def count_chart(self, plot_sheetname, chart_root):
+        """Record the number of Elements in the chart object of plot_sheetname."""
+        self.count_chart_elems( plot_sheetname, sum( 1 for _ in chart_root.iter() ) )
+
+    def count_chart_elems(self, plot_sheetname, num_elem):
+        """Record num_elem as the number of Elements in the chart object of plot_sheetname."""
+        self.chart_elem_countD[plot_sheetname] = num_elem
+
+    def get_total_bytes(self):
+        """Return (uncompressed bytes, compressed bytes) of all zip members."""
+        return (sum( size for size, csize in self.member_sizeD.values() ),
+                sum( csize for size, csize in self.member_sizeD.values() ))
+
+    def summary(self):
+        """Return a multi-line text report of the stats."""
+        lineL = []
+        if self.save_time is not None:
+            lineL.append( 'Save time: %.4f sec'%self.save_time )
+
+        lineL.append( '%-16s %10s'%('Phase', 'Time (sec)') )
+        for phase, seconds in self.phase_timeD.items():
+            lineL.append( '%-16s %10.4f'%(phase, seconds) )
+
+        lineL.append( 'Templates: %i loads, %i parses'%(self.template_loads, self.template_parses) )
+
+        lineL.append( '%-28s %12s %12s'%('Zip member', 'Bytes', 'Compressed') )
+        for name, (size, csize) in self.member_sizeD.items():
+            flag = '  (raw copy)' if name in self.raw_memberL else ''
+            lineL.append( '%-28s %12i %12i%s'%(name, size, csize, flag) )
+
+        lineL.append( '%-28s %12s %12s'%('Sheet', 'Elements', 'Rows') )
+        for name, count in self.sheet_elem_countD.items():
+            lineL.append( '%-28s %12s %12s'%(name, 'streamed' if count is None else count,
+                                               self.sheet_nrowsD.get(name, '')) )
+        for name, count in self.chart_elem_countD.items():
+            lineL.append( '%-28s %12i'%('Chart of ' + name, count) )
+
+        return '\n'.join( lineL )
+
+
+class PhaseTimer(object):
+    """Context manager returned by SaveStats.phase"""
+    def __init__(self, stats, phase):
+        self.stats = stats
+        self.phase = phase
+
+    def __enter__(self):
+        self.old_phase = self.stats.switch( self.phase )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.switch( self.old_phase )
+        return False
+
+
+class NullPhaseTimer(object):
+    """Context manager that does nothing"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NULL_PHASE_TIMER = NullPhaseTimer()
+
+
+class NullSaveStats(object):
+    """Same methods as SaveStats, but does nothing. Used when stats are not collected."""
+
+    enabled = False
+
+    def phase(self, phase):
+        return NULL_PHASE_TIMER
+
+    def timed_chunks(self, phase, chunk_iter):
+        return chunk_iter
+
+    def timed_splices(self, phase, spliceD):
+        return spliceD
+
+    def start(self):
+        pass
+
+    def finish(self):
+        pass
+
+    def add_member(self, info, is_raw=False):
+        pass
+
+    def count_sheet(self, sheetname, elem, nrows=None):
+        pass
+
+    def count_chart(self, plot_sheetname, chart_root):
+        pass
+
+    def count_chart_elems(self, plot_sheetname, num_elem):
+        pass
+
+NULL_STATS = NullSaveStats()
@@ -44,26 +44,34 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """
 import zipfile
+import io
 import os
+import re
 import time
-from copy import deepcopy, copy
+import threading
+from copy import copy
+from collections import OrderedDict
 import  subprocess
 
 import sys
-if sys.version_info < (3,):
-    import odscharts.ElementTree_27OD as ET
-else:
-    import odscharts.ElementTree_34OD as ET
+from odscharts.xml_backend import ET
 
-from odscharts.data_table_desc import DataTableDesc
-from odscharts.plot_table_desc import PlotTableDesc
-from odscharts.metainf import add_ObjectN
-from odscharts.object_content import build_chart_object_content
+from odscharts.data_table_desc import DataTableDesc, read_data_table_desc
+from odscharts.column_table import ColumnTable
+from odscharts.plot_table_desc import PlotTableDesc, read_plot_table_desc, get_ith_value
+from odscharts.metainf import set_ObjectN_entries
+from odscharts.object_content import ChartStyleIndex
+from odscharts.chart_emitter import ChartEmitter
 
 from odscharts.template_xml_file import TemplateXML_File
-from odscharts.find_obj import find_elem_w_attrib, elem_set, NS_attrib, NS
+from odscharts.zip_utils import zipfile_insert, zipfile_stream_insert, iter_zipfile_stream_insert, \
+                                 get_compress_type, check_compresslevel, ZipChunkSink, read_raw_members, \
+                                 read_written_member, decompress_raw, zipfile_insert_raw, get_zip_fileobj
+from odscharts.namespaces import STYLE_CHART_PROPERTIES, CHART_MINIMUM, CHART_MAXIMUM
 
 from odscharts.line_styles import gen_dash_elements_from_set_of_istyles
+from odscharts.save_stats import SaveStats, NULL_STATS
+from odscharts.decimate import decimate_xy, check_method, DEFAULT_MAX_POINTS
 
 here = os.path.abspath(os.path.dirname(__file__))
 
@@ -79,8 +87,26 @@ __status__ = "3 - Alpha" # "3 - Alpha", "4 - Beta", "5 - Production/Stable"
 
 TABLE_INSERT_POINT = 1  # just after "table:calculation-settings" Element
 
+HIDDEN_TABLE_STYLE = 'ta2' # automatic style of hidden sheets (e.g. decimated series)
+
+# zip members that are always written by save (all others in an opened file may be copied raw)
+REWRITTEN_MEMBERL = ['mimetype', 'meta.xml', 'META-INF/manifest.xml', 'content.xml']
+
+
+# Process-wide cache of parsed templates
+_template_cacheD = {} # index=(full ods path, inner file name, mtime), value=TemplateXML_File
+_template_cache_lock = threading.Lock()
+# Process-wide counters of template loads (all loads, and loads that read and parsed the ods file)
+template_load_countD = {'loads':0, 'parses':0}
 
 def load_template_xml_from_ods(ods_fname, fname, subdir='' ):
+    """
+    Return a TemplateXML_File object for the file fname inside templates/ods_fname.
+
+    Each template is read and parsed only once per process. The parsed template
+    is cached by (ods file, inner file name, modification time of ods file) and
+    every caller gets its own copy, so callers are free to modify it.
+    """
 
     full_ods_path = os.path.join( here, 'templates', ods_fname )
 
@@ -89,27 +115,105 @@ def load_template_xml_from_ods(ods_fname, fname, subdir='' ):
     else:
         inner_fname =  fname
 
-    odsfile = zipfile.ZipFile( full_ods_path )
-    src = odsfile.read( inner_fname ).decode('utf-8')
+    key = (full_ods_path, inner_fname, os.path.getmtime( full_ods_path ))
+
+    with _template_cache_lock:
+        template_obj = _template_cacheD.get( key, None )
+        if template_obj is None:
+            # throw away any entry made from an older version of the ods file
+            for old_key in list( _template_cacheD.keys() ):
+                if old_key[:2] == key[:2]:
+                    del _template_cacheD[old_key]
+
+            odsfile = zipfile.ZipFile( full_ods_path )
+            src = odsfile.read( inner_fname ).decode('utf-8')
+            odsfile.close()
+
+            template_obj = TemplateXML_File( src )
+            _template_cacheD[key] = template_obj
+            template_load_countD['parses'] += 1
+        template_load_countD['loads'] += 1
+
+    return template_obj.clone()
+
+def clear_template_cache():
+    """Empty the cache of parsed templates used by load_template_xml_from_ods (and of chart emitters)."""
+    with _template_cache_lock:
+        _template_cacheD.clear()
+        _chart_emitterD.clear()
+
+_chart_emitterD = {} # index=(full ods path, mtime), value=ChartEmitter
+
+def get_chart_emitter( ods_fname ):
+    """
+    Return the ChartEmitter compiled from "Object 1/content.xml" of templates/ods_fname.
+    It is compiled only once per process.
+    """
+    full_ods_path = os.path.join( here, 'templates', ods_fname )
+    key = (full_ods_path, os.path.getmtime( full_ods_path ))
+
+    emitter = _chart_emitterD.get( key, None )
+    if emitter is None:
+        emitter = ChartEmitter( load_template_xml_from_ods(ods_fname, 'content.xml', subdir='Object 1') )
+        with _template_cache_lock:
+            emitter = _chart_emitterD.setdefault( key, emitter )
+    return emitter
+
+# (ods file, inner file name, subdir) of every template used by SpreadSheet
+TEMPLATE_L = [('alt_chart.ods', 'content.xml', ''),
+              ('alt_chart.ods', 'meta.xml', ''),
+              ('alt_chart.ods', 'styles.xml', ''),
+              ('empty_sheets123.ods', 'manifest.xml', 'META-INF'),
+              ('alt_chart.ods', 'styles.xml', 'Object 1'),
+              ('alt_chart.ods', 'content.xml', 'Object 1'),
+              ('alt_chart_y2.ods', 'content.xml', 'Object 1')]
 
-    return TemplateXML_File( src )
+# ods files of the chart templates compiled into a ChartEmitter
+CHART_TEMPLATE_L = ['alt_chart.ods', 'alt_chart_y2.ods']
 
+def warm_template_cache():
+    """Read and parse every template into the cache, e.g. when a worker process starts."""
+    for ods_fname, fname, subdir in TEMPLATE_L:
+        load_template_xml_from_ods( ods_fname, fname, subdir=subdir )
+    for ods_fname in CHART_TEMPLATE_L:
+        get_chart_emitter( ods_fname )
 
-def zipfile_insert( zipfileobj, filename, data):
-    """Create a file named filename, in the zip archive.
-       "data" is the UTF-8 string that is placed into filename.
+
+# SpreadSheet copy used by a chart building worker process (see save(workers=N))
+_worker_chart_doc = None
+
+def init_chart_worker( chart_doc ):
+    """Initialize a save(workers=N) worker process with a slim SpreadSheet copy.
 
        (Not called by User)
     """
+    global _worker_chart_doc
+    chart_doc.template_ObjectN_styles_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'styles.xml',
+                                                                            subdir='Object 1')
+    _worker_chart_doc = chart_doc
+
+def build_chart_xml_in_worker( plot_sheetname ):
+    """Return (styles.xml, content.xml) strings of a chart from a worker process.
 
-    # zip seems to struggle with non-ascii characters
-    #data = data.encode('utf-8')
+       (Not called by User)
+    """
+    return _worker_chart_doc.build_chart_xml( plot_sheetname )
 
-    now = time.localtime(time.time())[:6]
-    info = zipfile.ZipInfo(filename)
-    info.date_time = now
-    info.compress_type = zipfile.ZIP_DEFLATED
-    zipfileobj.writestr(info, data)
+def gil_is_enabled():
+    """Return False only on a free-threaded python running without the GIL."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    if is_gil_enabled is None:
+        return True
+    return is_gil_enabled()
+
+def process_pool_is_available():
+    """
+    Return True if worker processes can be used (python 3.7+).
+
+    (concurrent.futures is not in python 2 and its ProcessPoolExecutor
+    has no initializer before python 3.7)
+    """
+    return sys.version_info >= (3, 7)
 
 
 class MySheetNameError(Exception):
@@ -144,37 +248,64 @@ class SpreadSheet(object):
             opener ="open" if sys.platform == "darwin" else "xdg-open"
             subprocess.call([opener, self.filename])
 
-    def __init__(self):
-        """Inits SpreadSheet with filename and blank content."""
+    def __init__(self, collect_stats=False, stats_callback=None, keep_rows=True):
+        """Inits SpreadSheet with filename and blank content.
+
+        :keyword bool collect_stats: If True, timing and counters of each save are collected (see enable_stats)
+        :keyword stats_callback: Called as stats_callback(stats) at the end of each save (default==None)
+        :type  stats_callback: None or callable
+        :keyword bool keep_rows: If False, a data sheet that is not streamed lets go of its
+            list_of_rows once its xml is built, keeping only its size, labels, units and
+            column types. Saves memory, but its curves can not be decimated. (default==True)
+        """
 
         self.filename = None
+        self.keep_rows = keep_rows # False==data sheets release their rows once built
+        self.stats = None # SaveStats of the last save (only set if stats are collected)
+        self.stats_callback = None
+        self.next_stats = NULL_STATS # collects stats for the next save
+        if collect_stats or stats_callback is not None:
+            self.enable_stats( callback=stats_callback )
+
         self.data_table_objD = {} # dict of data desc objects (DataTableDesc), index=data_sheetname, value=Obj
         self.plot_sheet_objD = {} # dict of plot desc objects (PlotTableDesc), index=plot_sheetname, value=Obj
         self.ordered_plotL = [] # list of plot names in insertion order
         self.ordered_dataL = [] # list of data sheet names in insertion order
 
+        self.sheet_nameL = [] # names of all sheets (data and plot) in insertion order
+        self.sheet_orderL = None # sheet order from set_sheet_order (None==newest sheet first)
+        self.helper_sheet_nameOD = OrderedDict() # names of hidden helper sheets (index=name, value=None)
+        self.next_num_chart = 1 # "Object N" number of the next plot
+
         self.plot_xMinMaxD = {} # index=plot sheet name, values=(xmin,xmax). can be (None,None)
         self.plot_yMinMaxD = {} # index=plot sheet name, values=(ymin,ymax). can be (None,None)
         self.plot_y2MinMaxD = {} # index=plot sheet name, values=(y2min,y2max). can be (None,None)
 
-        self.content_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'content.xml' )
-        self.meta_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'meta.xml' )
-        self.mimetype_str = 'application/vnd.oasis.opendocument.spreadsheet'
-        self.styles_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'styles.xml' )
+        # zip members of an opened ods file or of the last save,
+        # index=member name, value=(ZipInfo, raw compressed bytes)
+        self.raw_memberD = OrderedDict()
+        # compression policy of raw members from the last save, index=member name, value=policy tuple
+        # (members of an opened ods file are not in raw_policyD and are copied with any policy)
+        self.raw_policyD = {}
+        # members that changed since the last save. (the charts use PlotTableDesc.is_dirty)
+        self.dirty_memberS = set()
 
-        self.metainf_manifest_xml_obj = load_template_xml_from_ods('empty_sheets123.ods', 'manifest.xml', subdir='META-INF')
+        with self.next_stats.phase( 'template load' ):
+            self.content_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'content.xml' )
+            self.meta_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'meta.xml' )
+            self.mimetype_str = 'application/vnd.oasis.opendocument.spreadsheet'
+            self.styles_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'styles.xml' )
 
-        self.template_ObjectN_styles_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'styles.xml', subdir='Object 1')
+            self.metainf_manifest_xml_obj = load_template_xml_from_ods('empty_sheets123.ods', 'manifest.xml', subdir='META-INF')
+
+            self.template_ObjectN_styles_xml_obj = load_template_xml_from_ods( 'alt_chart.ods', 'styles.xml', subdir='Object 1')
 
         # Clean up template for content (remove default table and graph)
 
         self.spreadsheet_obj = self.content_xml_obj.find('office:body/office:spreadsheet')
 
-        self.meta_creation_date_obj = self.meta_xml_obj.find('office:meta/meta:creation-date')
-        self.meta_dc_date_obj = self.meta_xml_obj.find('office:meta/dc:date')
-
-        self.meta_init_creator_obj = self.meta_xml_obj.find('office:meta/meta:initial-creator')
-        self.meta_dc_creator_obj = self.meta_xml_obj.find('office:meta/dc:creator')
+        self.set_meta_xml_obj( self.meta_xml_obj )
+        self.is_created = False # True==meta.xml holds the creation date and initial creator
 
         # Remove the empty sheets from the template spreadsheet
         tableL = self.content_xml_obj.findall('office:body/office:spreadsheet/table:table')
@@ -193,6 +324,170 @@ class SpreadSheet(object):
         #print( table2.items() )
 
 
+    @classmethod
+    def open(cls, filename, collect_stats=False, stats_callback=None, keep_rows=True):
+        """
+        Open an existing ods file made by ODSCharts, so that more data sheets and
+        plots can be added to it before it is saved again.
+
+        content.xml, meta.xml and META-INF/manifest.xml are parsed as they are read from the file.
+        (meta.xml keeps its creation date, the modification date is set when saved)
+        Data sheets and plots are found from content.xml. Plots from the file keep their
+        chart as it is (only setXrange, setYrange and setY2range can change it).
+        Charts and other files that do not change are copied into the saved file
+        as raw compressed bytes.
+
+        :param filename: Name of ods file to open
+        :type  filename: str or unicode
+        :keyword bool collect_stats: If True, timing and counters of each save are collected (see enable_stats)
+        :keyword stats_callback: Called as stats_callback(stats) at the end of each save (default==None)
+        :type  stats_callback: None or callable
+        :keyword bool keep_rows: If False, added data sheets let go of their rows once built (default==True)
+        :return: SpreadSheet holding the sheets and plots of filename
+        :rtype: SpreadSheet
+        """
+        mySprSht = cls( collect_stats=collect_stats, stats_callback=stats_callback, keep_rows=keep_rows )
+
+        odsfile = zipfile.ZipFile( filename )
+        try:
+            with mySprSht.next_stats.phase( 'template load' ):
+                mySprSht.content_xml_obj = TemplateXML_File( odsfile.open('content.xml') )
+                mySprSht.metainf_manifest_xml_obj = TemplateXML_File( odsfile.open('META-INF/manifest.xml') )
+                if 'meta.xml' in odsfile.namelist():
+                    mySprSht.is_created = mySprSht.set_meta_xml_obj( TemplateXML_File( odsfile.open('meta.xml') ) )
+            mySprSht.raw_memberD = read_raw_members( odsfile, skip_nameL=REWRITTEN_MEMBERL )
+        finally:
+            odsfile.close()
+
+        mySprSht.filename = filename
+
+        content_xml_obj = mySprSht.content_xml_obj
+        NS = content_xml_obj.NS
+        mySprSht.spreadsheet_obj = content_xml_obj.find('office:body/office:spreadsheet')
+
+        # new sheets are inserted at the front, so insertion order is the reverse of sheet order
+        plotL = [] # list of (num_chart, plot_sheetname)
+        for table in reversed( mySprSht.spreadsheet_obj.findall( NS('table:table') ) ):
+            sheetname = table.get( NS('table:name') )
+
+            draw_obj = table.find( 'table:shapes/draw:frame/draw:object', content_xml_obj.rev_nsOD )
+            if draw_obj is None:
+                mySprSht.data_table_objD[sheetname] = read_data_table_desc( table, content_xml_obj )
+                mySprSht.ordered_dataL.append( sheetname )
+                mySprSht.sheet_nameL.append( sheetname )
+            else:
+                # like: xlink:href="Object 1/"
+                href = draw_obj.get( NS('xlink:href') )
+                num_chart = int( re.search(r'Object (\d+)', href).group(1) )
+                plotSheetObj = read_plot_table_desc( table, sheetname, num_chart )
+                plotSheetObj.document = mySprSht
+                mySprSht.plot_sheet_objD[sheetname] = plotSheetObj
+                mySprSht.sheet_nameL.append( sheetname )
+                plotL.append( (num_chart, sheetname) )
+                mySprSht.next_num_chart = max( mySprSht.next_num_chart, num_chart + 1 )
+
+        mySprSht.ordered_plotL = [sheetname for num_chart, sheetname in sorted(plotL)]
+
+        return mySprSht
+
+    def set_meta_xml_obj(self, meta_xml_obj):
+        """
+        Use meta_xml_obj as meta.xml. Return False (and keep the old one) if it is
+        missing a date or creator Element written at save. (Not called by User)
+        """
+        elemL = [meta_xml_obj.find( path ) for path in ('office:meta/meta:creation-date', 'office:meta/dc:date',
+                                                        'office:meta/meta:initial-creator', 'office:meta/dc:creator')]
+        if None in elemL:
+            return False
+
+        self.meta_xml_obj = meta_xml_obj
+        self.meta_creation_date_obj, self.meta_dc_date_obj, \
+            self.meta_init_creator_obj, self.meta_dc_creator_obj = elemL
+        return True
+
+    def enable_stats(self, callback=None):
+        """
+        Collect timing and counters of each save. After a save, they are in self.stats
+        (a SaveStats object, see stats.summary()) and are passed to callback(stats).
+
+        Wall time is recorded for each phase (template load, data cells, chart build,
+        serialize and zip write), from the end of the last save (or from enable_stats)
+        to the end of this save. Also recorded are the bytes of each zip member,
+        the Element count of each sheet and chart and the number of template loads.
+
+        :keyword callback: Called as callback(stats) at the end of each save (default==None)
+        :type  callback: None or callable
+        :return: None
+        :rtype: None
+        """
+        self.stats_callback = callback
+        if not self.next_stats.enabled:
+            self.next_stats = SaveStats( template_countD=template_load_countD )
+
+    def disable_stats(self):
+        """Stop collecting timing and counters of each save (see enable_stats)."""
+        self.stats_callback = None
+        self.next_stats = NULL_STATS
+
+    def get_sheet_order(self):
+        """
+        Return the names of all the sheets in the order they have in the saved file.
+
+        Unless set_sheet_order is called, the newest sheet is first.
+        Hidden helper sheets (e.g. of decimated curves) are last, in the order they were added.
+
+        :return: list of sheet names
+        :rtype: list of str
+        """
+        if self.sheet_orderL is None:
+            return list( reversed(self.sheet_nameL) ) + list( self.helper_sheet_nameOD )
+
+        orderS = set( self.sheet_orderL )
+        return self.sheet_orderL + [name for name in self.sheet_nameL if name not in orderS] + \
+               [name for name in self.helper_sheet_nameOD if name not in orderS]
+
+    def set_sheet_order(self, sheet_nameL):
+        """
+        Set the order of the sheets (tab pages) in the saved file.
+
+        Sheets that are not in sheet_nameL (including sheets added later) follow
+        in the order they were added.
+
+        :param sheet_nameL: list of data and plot sheet names
+        :type  sheet_nameL: list of str
+        :return: None
+        :rtype: None
+        """
+        sheet_nameL = list( sheet_nameL )
+        for name in sheet_nameL:
+            if (name not in self.data_table_objD) and (name not in self.plot_sheet_objD):
+                raise  MySheetNameError('Named sheet does NOT exist: "%s"'%name)
+        if len( set(sheet_nameL) ) != len( sheet_nameL ):
+            raise  MySheetNameError('Duplicate sheet name in sheet order: %s'%sheet_nameL)
+
+        self.sheet_orderL = sheet_nameL
+        self.dirty_memberS.add( 'content.xml' )
+
+    def get_sheet_elem(self, sheetname):
+        """Return the xml Element of the data or plot sheet named sheetname. (Not called by User)"""
+        if sheetname in self.data_table_objD:
+            return self.data_table_objD[ sheetname ].xmlSheetObj
+        return self.plot_sheet_objD[ sheetname ].xmlSheetObj
+
+    def assemble_sheets(self):
+        """
+        Put the sheets into content.xml in sheet order and the chart objects
+        into manifest.xml. Called by save. (Not called by User)
+        """
+        sheetL = [self.get_sheet_elem( name ) for name in self.get_sheet_order()]
+        sheetS = set( sheetL )
+
+        otherL = [elem for elem in self.spreadsheet_obj if elem not in sheetS]
+        self.spreadsheet_obj[:] = otherL[:TABLE_INSERT_POINT] + sheetL + otherL[TABLE_INSERT_POINT:]
+
+        num_chartL = [plotSheetObj.num_chart for plotSheetObj in self.plot_sheet_objD.values()]
+        set_ObjectN_entries( num_chartL, self.metainf_manifest_xml_obj )
+
     def meta_time(self):
         "Return time string in meta data format"
         t = time.localtime()
@@ -201,6 +496,8 @@ class SpreadSheet(object):
 
     # make sure any added Element objects are in nsOD, rev_nsOD and qnameOD of parent_obj
     def add_tag(self, tag, parent_obj ):
+        if tag in parent_obj.qnameOD:
+            return
         sL = tag.split('}')
         uri = sL[0][1:]
         name = sL[1]
@@ -225,22 +522,18 @@ class SpreadSheet(object):
 
         plotSheetObj = self.plot_sheet_objD[plot_sheetname]
         chart_obj = plotSheetObj.chart_obj
-        nsOD = chart_obj.rev_nsOD
 
-        auto_styles = chart_obj.find('office:automatic-styles')
-        minmax_style,ipos_minmax_style = find_elem_w_attrib('style:style', auto_styles, nsOD,
-                                   attrib={'style:name':'%s'%axis_name}, nth_match=0)
-        #print( 'FOUND:  ipos_minmax_style = ', ipos_minmax_style )
+        minmax_style = plotSheetObj.chart_index.get_style( axis_name )
 
-        chart_prop = minmax_style.find( NS('style:chart-properties', nsOD) )
+        chart_prop = minmax_style.find( STYLE_CHART_PROPERTIES )
 
         if not min_val is None:
-            chart_prop.set( NS('chart:minimum', nsOD), '%g'%min_val )
-            self.add_tag( NS('chart:minimum', nsOD), chart_obj )
+            chart_prop.set( CHART_MINIMUM, '%g'%min_val )
+            self.add_tag( CHART_MINIMUM, chart_obj )
 
         if not max_val is None:
-            chart_prop.set( NS('chart:maximum', nsOD), '%g'%max_val )
-            self.add_tag( NS('chart:maximum', nsOD), chart_obj )
+            chart_prop.set( CHART_MAXIMUM, '%g'%max_val )
+            self.add_tag( CHART_MAXIMUM, chart_obj )
 
     def setAxisRanges(self, plot_sheetname ):
 
@@ -283,6 +576,7 @@ class SpreadSheet(object):
             plot_sheetname = self.ordered_plotL[-1]
 
         self.plot_xMinMaxD[plot_sheetname] = (xmin, xmax)
+        self.set_plot_dirty( plot_sheetname )
 
 
     def setYrange(self, ymin=None, ymax=None, plot_sheetname=None):
@@ -309,6 +603,7 @@ class SpreadSheet(object):
             plot_sheetname = self.ordered_plotL[-1]
 
         self.plot_yMinMaxD[plot_sheetname] = (ymin, ymax)
+        self.set_plot_dirty( plot_sheetname )
 
 
     def setY2range(self, ymin=None, ymax=None, plot_sheetname=None):
@@ -335,8 +630,14 @@ class SpreadSheet(object):
             plot_sheetname = self.ordered_plotL[-1]
 
         self.plot_y2MinMaxD[plot_sheetname] = (ymin, ymax)
+        self.set_plot_dirty( plot_sheetname )
 
 
+    def set_plot_dirty(self, plot_sheetname):
+        """Mark the chart of plot_sheetname to be built again at save. (Not called by User)"""
+        if plot_sheetname in self.plot_sheet_objD:
+            self.plot_sheet_objD[ plot_sheetname ].is_dirty = True
+
     def add_curve(self, plot_sheetname, data_sheetname, xcol=1,
                     ycolL=None, ycol2L=None,
                     showMarkerL=None, showMarker2L=None,
@@ -344,7 +645,8 @@ class SpreadSheet(object):
                     lineThkL=None, lineThk2L=None,
                     lineStyleL=None, lineStyle2L=None,
                     colorL=None, color2L=None,
-                    labelL=None, label2L=None):
+                    labelL=None, label2L=None,
+                    decimate=None, max_points=DEFAULT_MAX_POINTS):
         """        
         Use data from "data_sheetname" to add a plot or plots to scatter plot on
         page  "plot_sheetname".
@@ -404,6 +706,12 @@ class SpreadSheet(object):
         :type  labelL: None or str list
         :keyword label2L: Not yet implemented (default==None)
         :type  label2L: None or str list
+        :keyword decimate: Chart only max_points points of each curve, chosen by "lttb" (keeps the
+            shape of the curve) or "minmax" (keeps the peaks). The chosen points go to a hidden
+            helper sheet, the full data stays on the data sheet. (default==None, chart all points)
+        :type  decimate: None or str
+        :keyword int max_points: Maximum number of points in a decimated curve, at least 3 for "lttb"
+            and 4 for "minmax" (default==2000)
 
         :return: None
         :rtype: None
@@ -429,19 +737,34 @@ class SpreadSheet(object):
 
         # Make of copy of original plotSheetObj
         plotSheetObj = self.plot_sheet_objD[plot_sheetname]
+        if plotSheetObj.is_opened:
+            raise  MySheetNameError('Can not add curves to plot read from existing file: "%s"'%plot_sheetname)
+
 
+        # decimating ycol2L may fail after ycolL is on the helper sheet, so keep the old one
+        old_decimation = (plotSheetObj.decimated_sheetname, plotSheetObj.decimated_table,
+                          self.data_table_objD.get( plotSheetObj.decimated_sheetname, None ))
+        try:
+            decimatedL = self.decimate_curves( plot_sheetname, data_sheetname, xcol, ycolL, decimate, max_points )
+            decimated2L = self.decimate_curves( plot_sheetname, data_sheetname, xcol, ycol2L, decimate, max_points )
+        except Exception:
+            # leave the plot as it was
+            self.restore_decimated_sheet( plotSheetObj, *old_decimation )
+            raise
 
         plotSheetObj.add_to_primary_y(data_sheetname, xcol, ycolL,
                                       showMarkerL=showMarkerL, colorL=colorL,
                                       lineThkL=lineThkL,
                                       lineStyleL=lineStyleL,
-                                      labelL=labelL)
+                                      labelL=labelL,
+                                      decimatedL=decimatedL)
 
         plotSheetObj.add_to_secondary_y( data_sheetname, xcol, ycol2L,
                                          showMarker2L=showMarker2L, color2L=color2L,
                                          lineThk2L=lineThk2L,
                                          lineStyle2L=lineStyle2L,
-                                         label2L=label2L)
+                                         label2L=label2L,
+                                         decimated2L=decimated2L)
 
 
 
@@ -455,7 +778,8 @@ class SpreadSheet(object):
                       lineThkL=None, lineThk2L=None,
                       lineStyleL=None, lineStyle2L=None,
                       colorL=None, color2L=None,
-                      labelL=None, label2L=None):
+                      labelL=None, label2L=None,
+                      decimate=None, max_points=DEFAULT_MAX_POINTS):
         """
         Add a scatter plot to the spread sheet.
 
@@ -529,6 +853,12 @@ class SpreadSheet(object):
         :type  labelL: None or str list
         :keyword label2L: Not yet implemented (default==None)
         :type  label2L: None or str list
+        :keyword decimate: Chart only max_points points of each curve, chosen by "lttb" (keeps the
+            shape of the curve) or "minmax" (keeps the peaks). The chosen points go to a hidden
+            helper sheet, the full data stays on the data sheet. (default==None, chart all points)
+        :type  decimate: None or str
+        :keyword int max_points: Maximum number of points in a decimated curve, at least 3 for "lttb"
+            and 4 for "minmax" (default==2000)
 
         :return: None
         :rtype: None
@@ -541,16 +871,20 @@ class SpreadSheet(object):
         if (data_sheetname not in self.data_table_objD):
             raise  MySheetNameError('Data sheet for "%s" plot missing: "%s"'%(plot_sheetname, data_sheetname))
 
-        num_chart = len(self.plot_sheet_objD) + 1
+        if decimate is not None:
+            check_method( decimate )
 
-        # Add new chart object and tab page in Excel/LibreOffice/OpenOffice
-        add_ObjectN( num_chart, self.metainf_manifest_xml_obj)
+        num_chart = self.next_num_chart
+        self.next_num_chart += 1
 
+        # Add new chart object and tab page in Excel/LibreOffice/OpenOffice
+        # (they are put into manifest.xml and content.xml by assemble_sheets at save)
         plotSheetObj = PlotTableDesc( plot_sheetname, num_chart, self.content_xml_obj,
                                       excel_colors=excel_colors)
         plotSheetObj.document = self
 
-        self.spreadsheet_obj.insert(TABLE_INSERT_POINT, plotSheetObj.xmlSheetObj)
+        self.sheet_nameL.append( plot_sheetname )
+        self.dirty_memberS.update( ['content.xml', 'META-INF/manifest.xml'] )
 
         #obj_name = 'Object %i'%num_chart
 
@@ -558,13 +892,22 @@ class SpreadSheet(object):
         self.plot_sheet_objD[plot_sheetname] = plotSheetObj
         self.ordered_plotL.append( plot_sheetname )
 
+        try:
+            decimatedL = self.decimate_curves( plot_sheetname, data_sheetname, xcol, ycolL, decimate, max_points )
+            decimated2L = self.decimate_curves( plot_sheetname, data_sheetname, xcol, ycol2L, decimate, max_points )
+        except Exception:
+            # leave no half made plot behind
+            self.remove_plot( plot_sheetname )
+            raise
+
         plotSheetObj.add_to_primary_y(data_sheetname, xcol, ycolL,
                                       showMarkerL=showMarkerL,
                                       showLineL=showLineL,
                                       colorL=colorL,
                                       lineThkL=lineThkL,
                                       lineStyleL=lineStyleL,
-                                      labelL=labelL)
+                                      labelL=labelL,
+                                      decimatedL=decimatedL)
 
         plotSheetObj.add_to_secondary_y( data_sheetname, xcol, ycol2L,
                                          showMarker2L=showMarker2L,
@@ -572,7 +915,8 @@ class SpreadSheet(object):
                                          color2L=color2L,
                                          lineThk2L=lineThk2L,
                                          lineStyle2L=lineStyle2L,
-                                         label2L=label2L)
+                                         label2L=label2L,
+                                         decimated2L=decimated2L)
 
         # Start making the chart object that goes onto the plot sheet
         #  Assign plot parameters to PlotTableDesc object
@@ -582,8 +926,6 @@ class SpreadSheet(object):
         plotSheetObj.xlabel = xlabel
         plotSheetObj.ylabel = ylabel
         plotSheetObj.y2label = y2label
-        plotSheetObj.ycolL = ycolL
-        plotSheetObj.ycol2L = ycol2L
 
         plotSheetObj.logx = logx
         plotSheetObj.logy = logy
@@ -591,7 +933,118 @@ class SpreadSheet(object):
 
 
 
-    def add_sheet(self, data_sheetname, list_of_rows):
+    def decimate_curves(self, plot_sheetname, data_sheetname, xcol, ycolL, decimate, max_points):
+        """
+        Decimate the curves ycolL vs xcol of data_sheetname and put them on the
+        hidden helper sheet of plot_sheetname. Return the decimatedL entries for
+        PlotTableDesc (None if decimate is None). (Not called by User)
+        """
+        if decimate is None or not ycolL:
+            return None
+        check_method( decimate )
+
+        plotSheetObj = self.plot_sheet_objD[ plot_sheetname ]
+        dataTableObj = self.data_table_objD[ data_sheetname ]
+        xvals = dataTableObj.get_column( xcol )
+
+        table = plotSheetObj.decimated_table
+        if table is None:
+            helper_name = '%s_decimated'%plot_sheetname
+            if (helper_name in self.data_table_objD) or (helper_name in self.plot_sheet_objD):
+                raise  MySheetNameError('Duplicate sheet name for decimated curves: "%s"'%helper_name)
+            plotSheetObj.decimated_sheetname = helper_name
+            table = ColumnTable( [], [], [] )
+        else:
+            # new lists, the helper sheet made from table is put back if add_curve fails
+            table = ColumnTable( list(table.labelL), list(table.unitsL), list(table.arrayL) )
+        plotSheetObj.decimated_table = table
+
+        decimatedL = []
+        for ycol in ycolL:
+            x, y = decimate_xy( xvals, dataTableObj.get_column( ycol ), max_points=max_points, method=decimate )
+
+            # an x and y column for each curve, labels and units are those of the data sheet
+            for col, values in ((xcol, x), (ycol, y)):
+                table.labelL.append( get_ith_value( dataTableObj.labelL, col-1, '' ) )
+                table.unitsL.append( get_ith_value( dataTableObj.unitsL, col-1, '' ) )
+                table.arrayL.append( values )
+            ncols = len( table.arrayL )
+            decimatedL.append( (plotSheetObj.decimated_sheetname, ncols-1, ncols, len(x) + 2) )
+
+        self.set_decimated_sheet( plotSheetObj )
+        return decimatedL
+
+    def remove_plot(self, plot_sheetname):
+        """Remove a plot sheet that was just added (and its helper sheet). (Not called by User)"""
+        plotSheetObj = self.plot_sheet_objD.pop( plot_sheetname )
+        # it was just added, so it is last
+        self.ordered_plotL.pop()
+        self.sheet_nameL.pop()
+        if plotSheetObj.num_chart == self.next_num_chart - 1:
+            self.next_num_chart -= 1
+
+        helper_name = plotSheetObj.decimated_sheetname
+        if helper_name in self.data_table_objD:
+            self.remove_helper_sheet_elem( self.data_table_objD.pop( helper_name ) )
+            del self.helper_sheet_nameOD[ helper_name ]
+
+    def remove_helper_sheet_elem(self, dataTableObj):
+        """Take the placeholder Element of a hidden helper sheet out of content.xml. (Not called by User)"""
+        self.content_xml_obj.spliceD.pop( dataTableObj.xmlSheetObj, None )
+        # a save put it into spreadsheet_obj (see assemble_sheets)
+        if dataTableObj.xmlSheetObj in list( self.spreadsheet_obj ):
+            self.spreadsheet_obj.remove( dataTableObj.xmlSheetObj )
+
+    def restore_decimated_sheet(self, plotSheetObj, decimated_sheetname, decimated_table, old_table_obj):
+        """Put back the helper sheet of plotSheetObj as it was before decimate_curves. (Not called by User)"""
+        helper_name = plotSheetObj.decimated_sheetname
+        new_table_obj = self.data_table_objD.pop( helper_name, None )
+        if new_table_obj is not None:
+            self.remove_helper_sheet_elem( new_table_obj )
+            if old_table_obj is None:
+                del self.helper_sheet_nameOD[ helper_name ]
+        if old_table_obj is not None:
+            self.data_table_objD[ helper_name ] = old_table_obj
+            self.content_xml_obj.add_splice( old_table_obj.xmlSheetObj, old_table_obj.iter_xml_chunks )
+
+        plotSheetObj.decimated_sheetname = decimated_sheetname
+        plotSheetObj.decimated_table = decimated_table
+
+    def set_decimated_sheet(self, plotSheetObj):
+        """Make (or remake) the hidden helper sheet from plotSheetObj.decimated_table. (Not called by User)"""
+        helper_name = plotSheetObj.decimated_sheetname
+        old_table_obj = self.data_table_objD.get( helper_name, None )
+        if old_table_obj is None:
+            self.helper_sheet_nameOD[ helper_name ] = None
+        else:
+            self.remove_helper_sheet_elem( old_table_obj )
+
+        table = plotSheetObj.decimated_table
+        plotSheetObj.decimated_table = ColumnTable( table.labelL, table.unitsL, table.arrayL )
+
+        self.add_hidden_table_style()
+        self.data_table_objD[ helper_name ] = DataTableDesc( helper_name, plotSheetObj.decimated_table,
+                                                             self.content_xml_obj, stream=True,
+                                                             table_style=HIDDEN_TABLE_STYLE )
+        self.dirty_memberS.add( 'content.xml' )
+
+    def add_hidden_table_style(self):
+        """Add the automatic style of hidden sheets to content.xml if it is not there. (Not called by User)"""
+        auto_styles = self.content_xml_obj.find('office:automatic-styles')
+        NS = self.content_xml_obj.NS
+        for style in auto_styles:
+            if style.get( NS('style:name') ) == HIDDEN_TABLE_STYLE:
+                return
+
+        style = self.content_xml_obj.new_elem( 'style:style', OrderedDict([('style:name', HIDDEN_TABLE_STYLE),
+                                                                           ('style:family', 'table'),
+                                                                           ('style:master-page-name', 'mp1')]) )
+        table_prop = self.content_xml_obj.new_elem( 'style:table-properties', OrderedDict([('table:display', 'false'),
+                                                                                          ('style:writing-mode', 'lr-tb')]) )
+        self.content_xml_obj.add_child( table_prop, style )
+        self.content_xml_obj.add_child( style, auto_styles )
+
+    def add_sheet(self, data_sheetname, list_of_rows, stream=False):
         """Create a new sheet in the spreadsheet with "data_sheetname" as its name.
 
            the list_of_rows will be placed at "A1" and should be:
@@ -615,6 +1068,12 @@ class SpreadSheet(object):
             - row 1 is labels
             - row 2 is units
             - row 3 through N is float or string entries
+            May also be any iterable of rows (e.g. a generator, DB cursor or csv.reader).
+            An iterable without a length is always streamed and is only read when
+            the file is saved, so it can only be saved once.
+        :keyword bool stream: If True, the sheet is written to content.xml as text
+            directly from list_of_rows when the file is saved, without building an
+            xml Element for every cell. Recommended for very large sheets. (default==False)
         :return: None
         :rtype: None
 
@@ -623,23 +1082,227 @@ class SpreadSheet(object):
             raise  MySheetNameError('Duplicate sheet name submitted for new datasheet: "%s"'%data_sheetname)
 
 
-        dataTableObj = DataTableDesc( data_sheetname, list_of_rows, self.content_xml_obj)
-        self.spreadsheet_obj.insert(TABLE_INSERT_POINT, dataTableObj.xmlSheetObj)
+        with self.next_stats.phase( 'data cells' ):
+            dataTableObj = DataTableDesc( data_sheetname, list_of_rows, self.content_xml_obj, stream=stream,
+                                          keep_rows=self.keep_rows )
+        self.sheet_nameL.append( data_sheetname )
+        self.dirty_memberS.add( 'content.xml' )
 
         self.data_table_objD[data_sheetname] = dataTableObj
-        self.ordered_dataL.append( dataTableObj )
+        self.ordered_dataL.append( data_sheetname )
+
+    def add_sheet_columns(self, data_sheetname, labelL, unitsL, arrayL):
+        """Create a new sheet in the spreadsheet with "data_sheetname" as its name
+           from a list of columns instead of a list of rows.
+
+           Columns are typically NumPy arrays (NumPy is not required, any sequence works).
+           Numeric columns are formatted a whole column at a time and the sheet
+           is always streamed (see add_sheet).
+
+            for example: ::
+
+                add_sheet_columns('Alt_Data', ['Altitude','Pressure'], ['feet','psia'],
+                                  [np.array([0., 5000., 10000.]), np.array([14.7, 12.23, 10.11])])
+
+        :param data_sheetname:  Name of the data's tabbed window in Excel, LibreOffice or OpenOffice
+        :type  data_sheetname: str or unicode
+        :param list labelL: list of column labels (row 1)
+        :param list unitsL: list of column units (row 2)
+        :param list arrayL: list of columns of float or string entries (rows 3 through N)
+        :return: None
+        :rtype: None
+
+        """
+        self.add_sheet( data_sheetname, ColumnTable(labelL, unitsL, arrayL), stream=True )
+
+
+    def build_chart_xml(self, plot_sheetname, stats=NULL_STATS):
+        """
+        Build the chart object of plot_sheetname and return the xml strings
+        (styles.xml, content.xml) for its "Object N" directory. (Not called by User)
+
+        The time spent is charged to the phases of stats (see SaveStats).
+        """
+        plotSheetObj = self.plot_sheet_objD[ plot_sheetname ]
+
+        if plotSheetObj.is_opened:
+            # only the axis ranges of a chart from an opened file can change
+            obj_name = 'Object %i/'%plotSheetObj.num_chart
+            with stats.phase( 'template load' ):
+                src = decompress_raw( *self.raw_memberD[obj_name + 'content.xml'] ).decode('utf-8')
+                plotSheetObj.chart_obj = TemplateXML_File( src )
+            with stats.phase( 'chart build' ):
+                plotSheetObj.chart_index = ChartStyleIndex( plotSheetObj.chart_obj )
+                self.setAxisRanges( plot_sheetname )
+            styles_xml = decompress_raw( *self.raw_memberD[obj_name + 'styles.xml'] ).decode('utf-8')
+            with stats.phase( 'serialize' ):
+                content_xml = plotSheetObj.chart_obj.tostring()
+            stats.count_chart( plot_sheetname, plotSheetObj.chart_obj.root )
+            return styles_xml, content_xml
+
+        # write a new chart from the compiled chart template
+        with stats.phase( 'template load' ):
+            emitter = get_chart_emitter( self.get_chart_template_name( plotSheetObj ) )
+
+        with stats.phase( 'chart build' ):
+            content_xml, num_elem = emitter.emit( plotSheetObj,
+                                                  xMinMax=self.plot_xMinMaxD.get( plot_sheetname, None ),
+                                                  yMinMax=self.plot_yMinMaxD.get( plot_sheetname, None ),
+                                                  y2MinMax=self.plot_y2MinMaxD.get( plot_sheetname, None ) )
+            ObjectN_styles_xml_obj = self.get_chart_styles_xml_obj( plotSheetObj )
+
+        with stats.phase( 'serialize' ):
+            styles_xml = ObjectN_styles_xml_obj.tostring()
+        stats.count_chart_elems( plot_sheetname, num_elem )
+        return styles_xml, content_xml
+
+    def get_chart_template_name(self, plotSheetObj):
+        """Return the ods file of the chart template of plotSheetObj. (Not called by User)"""
+        if plotSheetObj.ycol2L:
+            return 'alt_chart_y2.ods'
+        return 'alt_chart.ods'
+
+    def get_chart_styles_xml_obj(self, plotSheetObj):
+        """Return the "Object N/styles.xml" TemplateXML_File of plotSheetObj (with its line dashes). (Not called by User)"""
+        if len(plotSheetObj.set_of_line_styles) == 0:
+            return self.template_ObjectN_styles_xml_obj
+
+        ObjectN_styles_xml_obj = self.template_ObjectN_styles_xml_obj.clone()
+        nsOD = ObjectN_styles_xml_obj.rev_nsOD
+        office_styles_obj = ObjectN_styles_xml_obj.root.find("office:styles", nsOD)
+        gen_dash_elements_from_set_of_istyles( office_styles_obj, 
+                                               plotSheetObj.set_of_line_styles )
+        return ObjectN_styles_xml_obj
+
+    def get_chart_doc(self):
+        """
+        Return a slim, picklable copy of SpreadSheet holding only what build_chart_xml
+        needs. It is sent to the worker processes of save(workers=N). (Not called by User)
+        """
+        chart_doc = SpreadSheet.__new__( SpreadSheet )
+
+        chart_doc.ordered_plotL = list( self.ordered_plotL )
+        chart_doc.plot_xMinMaxD = dict( self.plot_xMinMaxD )
+        chart_doc.plot_yMinMaxD = dict( self.plot_yMinMaxD )
+        chart_doc.plot_y2MinMaxD = dict( self.plot_y2MinMaxD )
+
+        chart_doc.data_table_objD = {}
+        for data_sheetname, dataTableObj in self.data_table_objD.items():
+            chart_doc.data_table_objD[data_sheetname] = dataTableObj.slim_copy()
+
+        chart_doc.plot_sheet_objD = {}
+        for plot_sheetname, plotSheetObj in self.plot_sheet_objD.items():
+            plotSheetObj = copy( plotSheetObj )
+            plotSheetObj.xmlSheetObj = None
+            plotSheetObj.chart_obj = None
+            plotSheetObj.chart_index = None
+            plotSheetObj.decimated_table = None
+            plotSheetObj.document = chart_doc
+            chart_doc.plot_sheet_objD[plot_sheetname] = plotSheetObj
+
+        return chart_doc
+
+    def get_raw_member(self, name, policy):
+        """
+        Return (ZipInfo, raw compressed bytes) of member name if it can be copied
+        unchanged into a file saved with the compression policy, otherwise None.
+        (Not called by User)
+        """
+        if name not in self.raw_memberD or name in self.dirty_memberS:
+            return None
+        if self.raw_policyD.get( name, policy ) != policy:
+            return None
+        return self.raw_memberD[ name ]
+
+    def is_raw_chart(self, plot_sheetname, policy=None):
+        """
+        Return True if the chart of plot_sheetname is copied unchanged from
+        the opened ods file or from the last save. (Not called by User)
+        """
+        plotSheetObj = self.plot_sheet_objD[ plot_sheetname ]
+        if plotSheetObj.is_dirty:
+            return False
+        obj_name = 'Object %i/'%plotSheetObj.num_chart
+        for fname in ('styles.xml', 'content.xml'):
+            if self.get_raw_member( obj_name + fname, policy ) is None:
+                return False
+        return True
+
+    def iter_chart_xml(self, workers=None, policy=None, stats=NULL_STATS):
+        """
+        Yield (styles.xml, content.xml) strings for each chart in ordered_plotL order.
+        Yields None for a chart that is copied unchanged from the opened ods file
+        or from the last save (see is_raw_chart).
 
+        If workers > 1, the charts are built in a pool of worker processes
+        (or threads on a python running without the GIL). Before python 3.7
+        they are built here. (Not called by User)
 
-    def save(self, filename='my_chart.ods', launch=False):
+        Charts built in this process charge their time to the phases of stats.
+        (Charts built by workers are not split into phases or counted.)
+        """
+        # charts from an opened ods file are always done here
+        build_plotL = [name for name in self.ordered_plotL
+                       if not (self.plot_sheet_objD[name].is_opened or self.is_raw_chart(name, policy))]
+
+        if not workers or workers <= 1 or len(build_plotL) <= 1 or not process_pool_is_available():
+            for plot_sheetname in self.ordered_plotL:
+                if self.is_raw_chart( plot_sheetname, policy ):
+                    yield None
+                else:
+                    yield self.build_chart_xml( plot_sheetname, stats=stats )
+            return
+
+        import concurrent.futures
+
+        workers = min(workers, len(build_plotL))
+        if gil_is_enabled():
+            executor = concurrent.futures.ProcessPoolExecutor( max_workers=workers,
+                                                               initializer=init_chart_worker,
+                                                               initargs=(self.get_chart_doc(),) )
+            build_func = build_chart_xml_in_worker
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor( max_workers=workers )
+            build_func = self.build_chart_xml
+
+        chunksize = max(1, len(build_plotL) // (4*workers))
+        with executor:
+            # map returns results in build_plotL order
+            result_iter = executor.map( build_func, build_plotL, chunksize=chunksize )
+            for plot_sheetname in self.ordered_plotL:
+                if self.is_raw_chart( plot_sheetname, policy ):
+                    yield None
+                elif not self.plot_sheet_objD[ plot_sheetname ].is_opened:
+                    yield next( result_iter )
+                else:
+                    yield self.build_chart_xml( plot_sheetname, stats=stats )
+
+    def save(self, filename='my_chart.ods', launch=False, workers=None,
+             compression='deflate', compresslevel=None, store_below=0):
         """
         Saves SpreadSheet to an ods file readable by Microsoft Excel, LibreOffice or OpenOffice.
 
         If the launch flag is set, will launch Excel, LibreOffice or Openoffice using "os.startfile"
         or "open" or "xdg-open" depending on the platform.
 
+        If workers is greater than 1, the chart objects are built in a pool of that many
+        worker processes (threads on a python running without the GIL).
+        The saved file is the same as a serial save. Before python 3.7 workers is ignored.
+
+        The compression policy sets how each file inside the ods zip archive is compressed.
+        "stored" is fastest, "deflate" with compresslevel=9 gives the smallest file.
+        Files smaller than store_below bytes are always stored.
+
         :keyword filename: Name of ods file to save (default=='my_chart.ods')
         :type  filename: str or unicode
         :keyword bool launch: If True, will launch Excel, LibreOffice or OpenOffice (default==False)
+        :keyword workers: Number of workers building chart objects (default==None, build in this process)
+        :type  workers: None or int
+        :keyword compression: "deflate" or "stored" (default=="deflate")
+        :type  compression: str
+        :keyword compresslevel: zlib compression level 0-9 for "deflate" (default==None, zlib default, needs python 3.7+)
+        :type  compresslevel: None or int
+        :keyword int store_below: Store files smaller than this many bytes (default==0)
         :return: None
         :rtype: None
         """
@@ -650,60 +1313,233 @@ class SpreadSheet(object):
         print('Saving ods file: %s'%filename)
         self.filename = filename
 
-        zipfileobj = zipfile.ZipFile(filename, "w")
+        for _ in self.iter_write_ods( filename, workers=workers, compression=compression,
+                                      compresslevel=compresslevel, store_below=store_below ):
+            pass
 
-        self.meta_creation_date_obj.text = self.meta_time()
-        self.meta_dc_date_obj.text = self.meta_time()
-        self.meta_init_creator_obj.text = 'ODSCharts'
-        self.meta_dc_creator_obj.text = 'ODSCharts'
-
-
-
-        zipfile_insert( zipfileobj, 'meta.xml', self.meta_xml_obj.tostring())
+        if launch:
+            #os.startfile( self.filename )
+            self.launch_application()
 
-        zipfile_insert( zipfileobj, 'mimetype', self.mimetype_str.encode('UTF-8'))
+    def save_to(self, fileobj, workers=None, compression='deflate', compresslevel=None, store_below=0):
+        """
+        Writes SpreadSheet as an ods file to fileobj (any file-like object opened for binary writing).
+        Nothing is printed and no file name is set.
 
-        zipfile_insert( zipfileobj, 'META-INF/manifest.xml', self.metainf_manifest_xml_obj.tostring())
+        See save for the keyword arguments.
 
-        for N, plot_sheetname in enumerate( self.ordered_plotL ):
+        :param fileobj: file-like object with a write method (e.g. io.BytesIO)
+        :return: None
+        :rtype: None
+        """
+        for _ in self.iter_write_ods( fileobj, workers=workers, compression=compression,
+                                      compresslevel=compresslevel, store_below=store_below ):
+            pass
 
-            plotSheetObj = self.plot_sheet_objD[ plot_sheetname ]
+    def to_bytes(self, workers=None, compression='deflate', compresslevel=None, store_below=0):
+        """
+        Return SpreadSheet as the bytes of an ods file.
 
-            # create a new chart object
-            if plotSheetObj.ycol2L:
-                chart_obj = load_template_xml_from_ods('alt_chart_y2.ods', 'content.xml', subdir='Object 1')
-            else:
-                chart_obj = load_template_xml_from_ods('alt_chart.ods', 'content.xml', subdir='Object 1')
-
-            build_chart_object_content( chart_obj, plotSheetObj )
-
-            self.setAxisRanges( plot_sheetname )
-            
-            if len(plotSheetObj.set_of_line_styles) > 0:
-                ObjectN_styles_xml_obj = deepcopy( self.template_ObjectN_styles_xml_obj )
-                nsOD = chart_obj.rev_nsOD
-                office_styles_obj = ObjectN_styles_xml_obj.root.find("office:styles", nsOD)
-                gen_dash_elements_from_set_of_istyles( office_styles_obj, 
-                                                       plotSheetObj.set_of_line_styles )
-            else:
-                ObjectN_styles_xml_obj = self.template_ObjectN_styles_xml_obj
-                
+        See save for the keyword arguments.
 
-            zipfile_insert( zipfileobj, 'Object %i/styles.xml'%(N+1,), ObjectN_styles_xml_obj.tostring())
+        :return: contents of ods file
+        :rtype: bytes
+        """
+        fileobj = io.BytesIO()
+        self.save_to( fileobj, workers=workers, compression=compression,
+                      compresslevel=compresslevel, store_below=store_below )
+        return fileobj.getvalue()
 
-            zipfile_insert( zipfileobj, 'Object %i/content.xml'%(N+1,), plotSheetObj.chart_obj.tostring())
+    def iter_bytes(self, workers=None, compression='deflate', compresslevel=None, store_below=0):
+        """
+        Generator that yields the bytes of an ods file as the zip archive is produced,
+        e.g. to stream a WSGI or ASGI response without writing a file.
 
+        The zip is written as an unseekable stream, so it is valid, but not
+        byte for byte the same as to_bytes.
 
-        zipfile_insert( zipfileobj, 'content.xml', self.content_xml_obj.tostring())
+        See save for the keyword arguments.
 
-        zipfile_insert( zipfileobj, 'styles.xml', self.styles_xml_obj.tostring())
+        :return: generator of bytes chunks
+        :rtype: generator
+        """
+        sink = ZipChunkSink()
+        for _ in self.iter_write_ods( sink, workers=workers, compression=compression,
+                                      compresslevel=compresslevel, store_below=store_below ):
+            data = sink.pop_bytes()
+            if data:
+                yield data
+
+        data = sink.pop_bytes()
+        if data:
+            yield data
+
+    def iter_write_ods(self, fileobj, workers=None, compression='deflate', compresslevel=None, store_below=0):
+        """
+        Write the ods zip archive to fileobj (a file name or file-like object).
+        Yields None each time more of the zip has been written. (Not called by User)
 
-        zipfileobj.close()
+        Members that did not change since the last save (with the same compression policy)
+        are copied as their raw compressed bytes. meta.xml is always written again.
 
-        if launch:
-            #os.startfile( self.filename )
-            self.launch_application()
+        If stats are collected (see enable_stats), they are put into self.stats
+        and passed to stats_callback at the end.
+        """
+        stats = self.next_stats
+
+        stats.start()
+        # time inside ODSCharts that is not charged to another phase is zip compression and writing
+        for _ in stats.timed_chunks( 'zip write',
+                                     self.iter_write_zip( fileobj, stats, workers=workers, compression=compression,
+                                                          compresslevel=compresslevel, store_below=store_below ) ):
+            yield None
+        stats.finish()
+
+        if stats.enabled:
+            # anything done from here on is part of the next save
+            self.next_stats = SaveStats( template_countD=template_load_countD )
+            self.stats = stats
+            if self.stats_callback is not None:
+                self.stats_callback( stats )
+
+    def iter_write_zip(self, fileobj, stats, workers=None, compression='deflate', compresslevel=None, store_below=0):
+        """
+        Body of iter_write_ods. The time spent is charged to the phases of stats.
+        (Not called by User)
+        """
+        compress_type = get_compress_type( compression )
+        check_compresslevel( compresslevel )
+        policy = (compress_type, compresslevel, store_below)
+
+        close_fileobj = None
+        if sys.version_info < (3,) and not hasattr(fileobj, 'write'):
+            # python 2 ZipFile opens the file write-only, but new members are read back
+            # (see read_written_member), so open it like python 3 does
+            fileobj = close_fileobj = io.open( fileobj, 'w+b' )
+        zipfileobj = zipfile.ZipFile(get_zip_fileobj( fileobj ), "w")
+
+        # every file in the zip archive gets the same time stamp and compression policy
+        zip_optD = dict( date_time=time.localtime(time.time())[:6], compress_type=compress_type,
+                         compresslevel=compresslevel, store_below=store_below )
+
+        # the creation date is that of the first save (or of the opened file)
+        if not self.is_created:
+            self.meta_creation_date_obj.text = self.meta_time()
+            self.meta_init_creator_obj.text = 'ODSCharts'
+            self.is_created = True
+        self.meta_dc_date_obj.text = self.meta_time()
+        self.meta_dc_creator_obj.text = 'ODSCharts'
 
+        for dataTableObj in self.data_table_objD.values():
+            if dataTableObj.is_dirty:
+                self.dirty_memberS.add( 'content.xml' )
+
+        self.assemble_sheets()
+
+        def insert_raw( name ):
+            # copy member name if it is unchanged, return True if it was copied
+            raw_member = self.get_raw_member( name, policy )
+            if raw_member is None:
+                return False
+            zipfile_insert_raw( zipfileobj, *raw_member, date_time=zip_optD['date_time'] )
+            raw_nameL.append( name )
+            return True
+
+        def xml_chunks( xml_obj, spliceD=None ):
+            # serialized xml of xml_obj, timed as "serialize"
+            return stats.timed_chunks( 'serialize', xml_obj.iter_chunks( spliceD=spliceD ) )
+
+        # members written (not copied) by this save
+        new_nameL = []
+        # members copied as raw compressed bytes
+        raw_nameL = []
+
+        try:
+            zipfile_stream_insert( zipfileobj, 'meta.xml', xml_chunks( self.meta_xml_obj ), **zip_optD)
+
+            zipfile_insert( zipfileobj, 'mimetype', self.mimetype_str.encode('UTF-8'), **zip_optD)
+
+            if not insert_raw( 'META-INF/manifest.xml' ):
+                zipfile_stream_insert( zipfileobj, 'META-INF/manifest.xml', xml_chunks( self.metainf_manifest_xml_obj ),
+                                       **zip_optD)
+                new_nameL.append( 'META-INF/manifest.xml' )
+            yield None
+
+            # content.xml goes before the charts so that any streamed data sheets are read
+            # and their final nrows is known when the chart cell ranges are built.
+            # It is written as it is serialized, so it is never in memory as a whole.
+            if not insert_raw( 'content.xml' ):
+                # streamed data sheets make their cells as they are serialized
+                spliceD = stats.timed_splices( 'data cells', self.content_xml_obj.spliceD )
+                for _ in iter_zipfile_stream_insert( zipfileobj, 'content.xml',
+                                                     xml_chunks( self.content_xml_obj, spliceD=spliceD ), **zip_optD):
+                    yield None
+                new_nameL.append( 'content.xml' )
+            yield None
+
+            chart_xml_iter = stats.timed_chunks( 'chart build',
+                                                 self.iter_chart_xml( workers=workers, policy=policy, stats=stats ) )
+            for plot_sheetname, chart_xml in zip( self.ordered_plotL, chart_xml_iter ):
+                obj_name = 'Object %i/'%self.plot_sheet_objD[ plot_sheetname ].num_chart
+
+                if chart_xml is None:
+                    # unchanged chart from opened ods file or last save
+                    for fname in ('styles.xml', 'content.xml'):
+                        insert_raw( obj_name + fname )
+                else:
+                    styles_xml, content_xml = chart_xml
+
+                    zipfile_insert( zipfileobj, obj_name + 'styles.xml', styles_xml, **zip_optD)
+
+                    zipfile_insert( zipfileobj, obj_name + 'content.xml', content_xml, **zip_optD)
+                    new_nameL.extend( [obj_name + 'styles.xml', obj_name + 'content.xml'] )
+                yield None
+
+            # any other files from an opened ods file are copied unchanged
+            written_nameS = set( zipfileobj.namelist() )
+            for name, (info, raw_data) in self.raw_memberD.items():
+                if name not in written_nameS and name != 'styles.xml':
+                    zipfile_insert_raw( zipfileobj, info, raw_data, date_time=zip_optD['date_time'] )
+                    raw_nameL.append( name )
+
+            if not insert_raw( 'styles.xml' ):
+                zipfile_stream_insert( zipfileobj, 'styles.xml', xml_chunks( self.styles_xml_obj ), **zip_optD)
+                new_nameL.append( 'styles.xml' )
+
+            if stats.enabled:
+                raw_nameS = set( raw_nameL )
+                for info in zipfileobj.infolist():
+                    stats.add_member( info, is_raw=info.filename in raw_nameS )
+
+                with stats.phase( 'count elements' ):
+                    for sheetname in self.get_sheet_order():
+                        if sheetname in self.data_table_objD:
+                            dataTableObj = self.data_table_objD[ sheetname ]
+                            elem = None if dataTableObj.stream else dataTableObj.xmlSheetObj
+                            stats.count_sheet( sheetname, elem, nrows=dataTableObj.nrows )
+                        else:
+                            stats.count_sheet( sheetname, self.plot_sheet_objD[ sheetname ].xmlSheetObj )
+
+            # keep the compressed bytes of the new members for the next save
+            for name in new_nameL:
+                raw_member = read_written_member( zipfileobj, name )
+                if raw_member is None:
+                    # written to a stream, must be written again next time
+                    self.raw_memberD.pop( name, None )
+                    self.raw_policyD.pop( name, None )
+                else:
+                    self.raw_memberD[ name ] = raw_member
+                    self.raw_policyD[ name ] = policy
+        finally:
+            zipfileobj.close()
+            if close_fileobj is not None:
+                close_fileobj.close()
+
+        self.dirty_memberS.clear()
+        for dataTableObj in self.data_table_objD.values():
+            dataTableObj.is_dirty = False
+        for plotSheetObj in self.plot_sheet_objD.values():
+            plotSheetObj.is_dirty = False
 
 if __name__ == '__main__':
     C = SpreadSheet()
@@ -3,14 +3,11 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 from __future__ import print_function
 
-import sys
 from collections import OrderedDict
+from odscharts.namespaces import NamespaceMap
 import io
 
-if sys.version_info < (3,):
-    import odscharts.ElementTree_27OD as ET
-else:
-    import odscharts.ElementTree_34OD as ET
+from odscharts.xml_backend import ET, escape_cdata, escape_attrib
 
 
 # get StringIO for either python 2.x or 3.x
@@ -24,6 +21,106 @@ from copy import deepcopy
 
 header_re = re.compile( '\<\?.*\?\>', flags=re.MULTILINE | re.UNICODE )
 
+
+def iter_serialize_xml(elem, qnames, namespaces, short_empty_elements=True, spliceD=None):
+    """
+    Generator version of ET._serialize_xml that yields text chunks instead of
+    calling a write function.
+
+    Any Comment Element that is a key in spliceD is not written as a comment.
+    Instead, spliceD[elem]() is called and each text chunk it returns is
+    yielded in its place (used to stream large data sheets into content.xml).
+
+    Walks the tree with an explicit stack so that chunks do not have to pass
+    up through one generator per level of the tree.
+    """
+    stack = [] # holds (closing tag, tail, iterator over remaining siblings)
+    children = iter( (elem,) )
+
+    while True:
+        for e in children:
+            tag = e.tag
+            if tag is ET.Comment:
+                if spliceD and e in spliceD:
+                    for chunk in spliceD[e]():
+                        yield chunk
+                else:
+                    yield "<!--%s-->" % e.text
+            elif tag is ET.ProcessingInstruction:
+                yield "<?%s?>" % e.text
+            else:
+                tag = qnames[tag]
+                text = e.text
+                if tag is None:
+                    if text:
+                        yield escape_cdata(text)
+                    stack.append( (None, e.tail, children) )
+                    children = iter(e)
+                    namespaces = None
+                    break
+
+                sL = ["<", tag]
+                if namespaces:
+                    for v, k in namespaces.items():
+                        if k:
+                            k = ":" + k
+                        sL.append(" xmlns%s=\"%s\"" % (k, escape_attrib(v)))
+                    namespaces = None
+                for k, v in e.items():
+                    if isinstance(k, ET.QName):
+                        k = k.text
+                    if isinstance(v, ET.QName):
+                        v = qnames[v.text]
+                    else:
+                        v = escape_attrib(v)
+                    sL.append(" %s=\"%s\"" % (qnames[k], v))
+
+                if text or len(e) or not short_empty_elements:
+                    sL.append(">")
+                    if text:
+                        sL.append( escape_cdata(text) )
+                    yield "".join(sL)
+                    stack.append( (tag, e.tail, children) )
+                    children = iter(e)
+                    break
+                else:
+                    sL.append(" />")
+                    yield "".join(sL)
+                namespaces = None
+
+            if e.tail:
+                yield escape_cdata(e.tail)
+        else:
+            # all children at this level are done, close the parent
+            if not stack:
+                return
+            tag, tail, children = stack.pop()
+            if tag is None:
+                if tail:
+                    yield escape_cdata(tail)
+            elif tail:
+                yield "</" + tag + ">" + escape_cdata(tail)
+            else:
+                yield "</" + tag + ">"
+
+def lazy_index( name ):
+    """
+    Make a property for one of the TemplateXML_File bookkeeping indexes.
+    The indexes are all built together the first time any one of them is used.
+    """
+    attr_name = '_' + name
+
+    def getter(self):
+        if not self.indexes_built:
+            self.build_indexes()
+        return getattr(self, attr_name)
+
+    def setter(self, value):
+        setattr(self, attr_name, value)
+
+    return property(getter, setter)
+
+
 class TemplateXML_File(object):
 
     def __init__(self, xml_file_name_or_src):
@@ -32,22 +129,32 @@ class TemplateXML_File(object):
         xml.etree.ElementTree.
 
         xml_file_name_or_src can be a file name like: "content.xml" OR
-        can be xml source.
+        can be xml source OR can be a binary file object (like the ones
+        from ZipFile.open) that is parsed as it is read.
         """
         #xml_file_name_or_src = xml_file_name_or_src.decode('utf-8')
         
-        if xml_file_name_or_src.endswith('.xml') and len(xml_file_name_or_src)<256:
+        if hasattr(xml_file_name_or_src, 'read'):
+            self.xml_file_name_or_src = None
+            xml_src = xml_file_name_or_src
+            if hasattr(xml_src, 'peek'):
+                head_src = xml_src.peek( 256 )[:256].decode('utf-8', 'ignore')
+            else:
+                head_src = ''
+        elif xml_file_name_or_src.endswith('.xml') and len(xml_file_name_or_src)<256:
             self.xml_file_name_or_src = xml_file_name_or_src
 
             fInp = io.open(xml_file_name_or_src, 'rt', encoding='utf-8')
             xml_src = fInp.read()
             fInp.close()
+            head_src = xml_src
         else:
             self.xml_file_name_or_src = None
             xml_src = xml_file_name_or_src
+            head_src = xml_src
 
         self.xml_header = '' # Assume no header unless found at head of file
-        match = header_re.match(xml_src)
+        match = header_re.match(head_src)
         if match:
             #print( 'Found XML Header: ' + match.group(0) )
             self.xml_header = match.group(0) # will need \n when serialized
@@ -56,13 +163,16 @@ class TemplateXML_File(object):
         self.nsOD = OrderedDict()
 
         # rev_ns entries like: (u'table', 'urn:oasis:names:tc:opendocument:xmlns:table:1.0')
-        self.rev_nsOD = OrderedDict()
+        self.rev_nsOD = NamespaceMap()
 
         # qname entries like: ('{urn:oasis:names:tc:opendocument:xmlns:office:1.0}document-content', u'office:document-content')
         self.qnameOD = OrderedDict()
 
         events = ("start", "end", "start-ns", "end-ns")
-        context = ET.iterparse(StringIO(xml_src), events=events)
+        if hasattr(xml_src, 'read'):
+            context = ET.iterparse(xml_src, events=events)
+        else:
+            context = ET.iterparse(StringIO(xml_src), events=events)
 
         for event, elem in context:
             if event=="start":
@@ -85,53 +195,151 @@ class TemplateXML_File(object):
                 self.rev_nsOD[elem[0]] = elem[1] # like: (u'table', 'urn:oasis:names:tc:opendocument:xmlns:table:1.0')
 
         self.context = context
+
+        # index=placeholder Comment Element, value=function returning iterable of text chunks
+        self.spliceD = {}
         #self.root = ET.ElementTree( context.root )
         self.root = context.root
 
         self.parentD = {} # index=child Element object, value=parent Element object
-        self.depthD = {}  # index=Element object, value = depth in xml tree
-        self.original_posD = {}  # index=Element object, value=tuple of child position (e.g. (0,3,1))
-        self.get_elem_from_orig_posD = {}  # reverse lookup of "original_posD"
-        
-        self.max_depth = 0
-        self.short_pathD = {} # index=Element, value = short name (like: "ns0:name1/ns1:xyz/ns3:abc")
-        # After building tree, create self.parentD for all Elements
         self.parentD[self.root] = None
-        self.depthD[self.root] = 0
-        self.short_pathD[self.root] = self.qnameOD[ self.root.tag ] # no calc req'd... just = qname
+        for parent in self.root.iter():
+            for child in parent:
+                self.parentD[child] = parent
+
+        # The remaining indexes are only needed by tools like SetRep.
+        # They are built by build_indexes the first time one of them is used.
+        self.indexes_built = False
+
+    def build_indexes(self):
+        """
+        Build the Element bookkeeping indexes from the current tree.
+
+        Called automatically the first time any of depthD, max_depth,
+        original_posD, get_elem_from_orig_posD, short_pathD,
+        short_path_counterD or short_path_parent_counterD is used.
+        "original" positions are therefore the positions at that time.
+        """
+        self._depthD = depthD = {}  # index=Element object, value = depth in xml tree
+        self._original_posD = original_posD = {}  # index=Element object, value=tuple of child position (e.g. (0,3,1))
+        self._get_elem_from_orig_posD = {}  # reverse lookup of "original_posD"
         
-        self.original_posD[self.root] = (0,) # tuple of position
+        max_depth = 0
+        self._short_pathD = short_pathD = {} # index=Element, value = short name (like: "ns0:name1/ns1:xyz/ns3:abc")
+        self.indexes_built = True
+
+        qnameOD = self.qnameOD
+        depthD[self.root] = 0
+        short_pathD[self.root] = qnameOD[ self.root.tag ] # no calc req'd... just = qname
+        
+        original_posD[self.root] = (0,) # tuple of position
 
         temp_short_path_counterD = {} # just used here to help count occurances of short path
-        self.short_path_counterD = {} # index=Element, value=short path counter value
-        self.short_path_parent_counterD = {} #  index=Element, value=parent's short path counter value
-        self.short_path_counterD[self.root] = 1 # 1st (and only) occurance
-        self.short_path_parent_counterD[self.root] = 1 # 1st (and only) occurance
+        self._short_path_counterD = short_path_counterD = {} # index=Element, value=short path counter value
+        self._short_path_parent_counterD = short_path_parent_counterD = {} #  index=Element, value=parent's short path counter value
+        short_path_counterD[self.root] = 1 # 1st (and only) occurance
+        short_path_parent_counterD[self.root] = 1 # 1st (and only) occurance
 
         for parent in self.root.iter():
             try:
-                for ichild, child in enumerate(parent.getchildren()):
-                    self.parentD[child] = parent
-                    self.depthD[child] = self.depthD[parent] + 1
-                    self.max_depth = max(self.max_depth, self.depthD[child])
+                depth = depthD[parent] + 1
+                parent_pos = original_posD[parent]
+                parent_path = short_pathD[parent] + '/'
+                parent_counter = '%s'%short_path_counterD[parent]
+                if len(parent):
+                    max_depth = max(max_depth, depth)
+                for ichild, child in enumerate(list(parent)):
+                    depthD[child] = depth
                     
-                    L = list(self.original_posD[parent])
-                    L.append( ichild )
-                    self.original_posD[child] = tuple( L )
+                    original_posD[child] = parent_pos + (ichild,)
 
-                    short_path = self.get_short_path( child )
-                    self.short_pathD[child] = short_path
+                    # build short path from parent's short path (same as get_short_path)
+                    short_path = parent_path + qnameOD[ child.tag ]
+                    short_pathD[child] = short_path
 
-                    temp_short_path_counterD[(parent,short_path)] = temp_short_path_counterD.get((parent,short_path), 0) + 1
-                    self.short_path_counterD[child] = '%s,%s'%(self.short_path_counterD[parent],
-                                                       temp_short_path_counterD[(parent,short_path)])
-                    self.short_path_parent_counterD[child] = '%s'%self.short_path_counterD[parent]
+                    count = temp_short_path_counterD.get((parent,short_path), 0) + 1
+                    temp_short_path_counterD[(parent,short_path)] = count
+                    short_path_counterD[child] = '%s,%s'%(parent_counter, count)
+                    short_path_parent_counterD[child] = parent_counter
 
             except:
                 print( 'NOTICE: No children for:', parent )
-                
-        for key,item in self.original_posD.items():
-            self.get_elem_from_orig_posD[item] = key # get elem from original_posD
+        
+        self._max_depth = max_depth
+        self._get_elem_from_orig_posD = dict( (item, key) for key,item in original_posD.items() ) # get elem from original_posD
+
+    depthD = lazy_index('depthD')
+    max_depth = lazy_index('max_depth')
+    original_posD = lazy_index('original_posD')
+    get_elem_from_orig_posD = lazy_index('get_elem_from_orig_posD')
+    short_pathD = lazy_index('short_pathD')
+    short_path_counterD = lazy_index('short_path_counterD')
+    short_path_parent_counterD = lazy_index('short_path_parent_counterD')
+
+    def clone(self):
+        """
+        Return a copy of this TemplateXML_File without re-parsing the xml.
+
+        The Element tree is copied once and every Element index (parentD,
+        depthD, short_pathD, etc.) is remapped onto the copied Element
+        objects in a single pass through the tree.
+        """
+        new_obj = TemplateXML_File.__new__( TemplateXML_File )
+
+        new_obj.xml_file_name_or_src = self.xml_file_name_or_src
+        new_obj.xml_header = self.xml_header
+        new_obj.nsOD = OrderedDict( self.nsOD )
+        new_obj.rev_nsOD = NamespaceMap( self.rev_nsOD )
+        new_obj.qnameOD = OrderedDict( self.qnameOD )
+        new_obj.context = None
+
+        new_obj.root = deepcopy( self.root )
+
+        new_obj.parentD = {}
+        new_obj.spliceD = {}
+        new_obj.indexes_built = self.indexes_built
+
+        # values of these indexes do not refer to Element objects, so just copy them.
+        copy_indexL = [(self.spliceD, new_obj.spliceD)]
+
+        if self.indexes_built:
+            new_obj.max_depth = self.max_depth
+            new_obj.depthD = {}
+            new_obj.original_posD = {}
+            new_obj.get_elem_from_orig_posD = {}
+            new_obj.short_pathD = {}
+            new_obj.short_path_counterD = {}
+            new_obj.short_path_parent_counterD = {}
+
+            copy_indexL.extend( [(self.depthD, new_obj.depthD),
+                                 (self.original_posD, new_obj.original_posD),
+                                 (self.short_pathD, new_obj.short_pathD),
+                                 (self.short_path_counterD, new_obj.short_path_counterD),
+                                 (self.short_path_parent_counterD, new_obj.short_path_parent_counterD)] )
+            original_posD = self.original_posD
+        else:
+            original_posD = {}
+
+        new_elemD = {None:None} # index=Element in self, value=Element in new_obj
+        parentD = self.parentD
+        new_parentD = new_obj.parentD
+        new_orig_posD = new_obj.get_elem_from_orig_posD if self.indexes_built else {}
+
+        # both trees iterate in the same document order, so parents are always mapped before children
+        for elem, new_elem in zip( self.root.iter(), new_obj.root.iter() ):
+            new_elemD[elem] = new_elem
+
+            if elem in parentD:
+                new_parentD[new_elem] = new_elemD.get( parentD[elem], None )
+
+            for D, new_D in copy_indexL:
+                if elem in D:
+                    new_D[new_elem] = D[elem]
+
+            if elem in original_posD:
+                new_orig_posD[ original_posD[elem] ] = new_elem
+
+        return new_obj
 
     def get_short_path(self, elem):
 
@@ -171,25 +379,34 @@ class TemplateXML_File(object):
         for child in childrenL:
             self.add_child( child, parent )
 
-    def tostring(self):
+    def add_splice(self, placeholder, chunk_source):
+        """
+        Register a placeholder Comment Element that, when serialized, is replaced
+        by the text chunks from chunk_source().
+
+        chunk_source must be a callable returning an iterable of text chunks.
+        """
+        self.spliceD[placeholder] = chunk_source
+
+    def iter_chunks(self, spliceD=None):
+        """
+        Yield the serialized xml (including any header) as a series of text chunks.
+        spliceD replaces the registered splices (see add_splice) if it is given.
+        """
+        if spliceD is None:
+            spliceD = self.spliceD
 
-        class dummy:
-            pass
-        xml_dataL = []
         if self.xml_header:
-            xml_dataL = [self.xml_header + '\n']
+            yield self.xml_header + '\n'
 
-        dummy_file = dummy()
-        dummy_file.write = xml_dataL.append
+        short_empty_elements = True # use short format for empty elements
+        for chunk in iter_serialize_xml(self.root, self.qnameOD, self.nsOD,
+                                        short_empty_elements, spliceD=spliceD):
+            yield chunk
 
-        # There are differences between the python2 and python3 serialize routines
-        if sys.version_info < (3,):
-            ET._serialize_xml(dummy_file.write, self.root, "utf-8", self.qnameOD, self.nsOD)
-        else:
-            short_empty_elements = True # use short format for empty elements
-            ET._serialize_xml(dummy_file.write, self.root, self.qnameOD, self.nsOD, short_empty_elements)
+    def tostring(self):
 
-        return "".join(xml_dataL)
+        return "".join( self.iter_chunks() )
 
     def write(self, out_file_name):
         #fOut = open(out_file_name, "w")
@@ -219,14 +436,7 @@ class TemplateXML_File(object):
 
     def NS(self, path_or_tag ):
         """force into tag format like: '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}table' """
-        if path_or_tag.startswith('{'):
-            return path_or_tag
-
-        sL = path_or_tag.split(':')
-        if len(sL)!=2:
-            return path_or_tag
-
-        return '{%s}%s'%( self.rev_nsOD[sL[0]], sL[1] )
+        return self.rev_nsOD.resolve( path_or_tag )
 
     def NS_attrib(self, attD ):
         D = OrderedDict()
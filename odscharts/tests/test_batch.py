@@ -0,0 +1,109 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.batch import generate_many, build_spreadsheet
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [10000, 10.11, 483.0, 268.3333],
+            [30000,  4.36, 411.8, 228.7778],
+            [60000,  1.04, 390.0, 216.6667]]
+
+def make_spec( i ):
+    return {'filename': 'customer_%i'%i,
+            'sheets': [{'name':'Alt_Data', 'rows':ALT_DATA}],
+            'plots': [{'name':'Alt_Plot', 'data_sheet':'Alt_Data', 'ycolL':[2],
+                       'title':'Customer %i'%i, 'yrange':(0, 15),
+                       'curves':[{'data_sheet':'Alt_Data', 'ycolL':[3]}]}],
+            'sheet_order': ['Alt_Data', 'Alt_Plot']}
+
+def iter_failing_rows():
+    for row in ALT_DATA[:4]:
+        yield row
+    raise IOError('data source went away')
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def test_build_spreadsheet(self):
+        """Check that a spec makes the sheets, curves and axis range"""
+        mySprSht = build_spreadsheet( make_spec(1) )
+        self.assertEqual( mySprSht.get_sheet_order(), ['Alt_Data', 'Alt_Plot'] )
+        self.assertEqual( mySprSht.plot_yMinMaxD['Alt_Plot'], (0, 15) )
+        self.assertEqual( len(mySprSht.plot_sheet_objD['Alt_Plot'].ycolL), 2 )
+
+    def test_serial_with_failure(self):
+        """Check that a failed workbook is reported and the others are written"""
+        specL = [make_spec(1), {'filename':'bad', 'plots':[{'name':'P', 'data_sheet':'Missing'}]}, make_spec(3)]
+        report = generate_many( specL, output_dir=self.tmp_dir )
+
+        self.assertEqual( [result.ok for result in report.resultL], [True, False, True] )
+        self.assertIn( 'MySheetNameError', report.failureL[0].error )
+        self.assertIn( 'FAILED 1', report.summary() )
+
+        fname = os.path.join( self.tmp_dir, 'customer_3.ods' )
+        self.assertEqual( report.resultL[2].filename, fname )
+        self.assertEqual( report.resultL[2].num_bytes, os.path.getsize(fname) )
+        chart = zipfile.ZipFile( fname ).read('Object 1/content.xml').decode('utf-8')
+        self.assertIn( 'Customer 3', chart )
+
+    def test_failed_save(self):
+        """Check that a workbook that fails while it is saved leaves no partial file"""
+        fname = os.path.join( self.tmp_dir, 'bad.ods' )
+        with open( fname, 'wb' ) as f:
+            f.write( b'older file' )
+        specL = [make_spec(1), {'filename':'bad', 'sheets':[{'name':'D', 'rows':iter_failing_rows(), 'stream':True}]}]
+        report = generate_many( specL, output_dir=self.tmp_dir )
+
+        self.assertEqual( [result.ok for result in report.resultL], [True, False] )
+        self.assertIn( 'data source went away', report.failureL[0].error )
+        self.assertEqual( sorted( os.listdir(self.tmp_dir) ), ['bad.ods', 'customer_1.ods'] )
+        with open( fname, 'rb' ) as f:
+            self.assertEqual( f.read(), b'older file' )
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'worker processes need python 3.7+')
+    def test_workers(self):
+        """Check that worker processes write the same workbooks"""
+        specL = [make_spec(i) for i in range(6)]
+        report = generate_many( specL, workers=2, output_dir=self.tmp_dir )
+
+        self.assertEqual( report.num_ok, 6 )
+        self.assertEqual( report.workers, 2 )
+        for i, result in enumerate( report.resultL ):
+            self.assertEqual( result.index, i )
+            self.assertIsNone( zipfile.ZipFile( result.filename ).testzip() )
+
+    @unittest.skipIf(sys.version_info >= (3, 7), 'worker processes are available')
+    def test_workers_fallback(self):
+        """Check that workers are ignored before python 3.7"""
+        report = generate_many( [make_spec(i) for i in range(2)], workers=2, output_dir=self.tmp_dir )
+
+        self.assertEqual( report.num_ok, 2 )
+        self.assertIsNone( report.workers )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import shutil
+import tempfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.benchmarks.run_benchmarks import iter_benchmarks, run_benchmarks, save_results, \
+    load_results, get_latest_results_file, compare_results
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def test_quick_params(self):
+        """Check that quick mode keeps the smallest size but every option"""
+        nameL = [name for name, cls, method_name, params in iter_benchmarks( quick=True )]
+        self.assertIn( 'AddSheet.time_add_sheet(1000, False)', nameL )
+        self.assertIn( 'AddSheet.time_add_sheet(1000, True)', nameL )
+        self.assertNotIn( 'AddSheet.time_add_sheet(100000, False)', nameL )
+        self.assertIn( 'SpreadSheetInit.time_init', nameL )
+
+    def test_save_and_compare(self):
+        """Check that results are saved and compared with the previous run"""
+        resultOD = run_benchmarks( pattern='SavePlots', quick=True, repeat=1 )
+        self.assertEqual( list(resultOD.keys()), ['SavePlots.time_save(1)'] )
+        self.assertTrue( resultOD['SavePlots.time_save(1)']['time'] > 0.0 )
+
+        fname = save_results( resultOD, results_dir=self.tmp_dir )
+        self.assertEqual( get_latest_results_file( results_dir=self.tmp_dir ), fname )
+        self.assertIsNone( get_latest_results_file( results_dir=self.tmp_dir, exclude=fname ) )
+
+        old_resultD = load_results( fname )['results']
+        slowD = {'SavePlots.time_save(1)': dict( old_resultD['SavePlots.time_save(1)'] )}
+        slowD['SavePlots.time_save(1)']['time'] *= 2.0
+        lineL, regressionL = compare_results( old_resultD, slowD )
+        self.assertEqual( regressionL, ['SavePlots.time_save(1)'] )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
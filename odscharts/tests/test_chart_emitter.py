@@ -0,0 +1,92 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import io
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet, get_chart_emitter
+from odscharts.template_xml_file import TemplateXML_File
+
+# expected "Object 1/content.xml" of each checked plot, one tag per line.
+# Set ODSCHARTS_WRITE_GOLDEN=1 to rewrite them after an intended change (and check the diff).
+GOLDEN_DIR = os.path.join( here, 'golden' )
+
+NCOLS = 9
+DATA = [['c%i'%i for i in range(NCOLS)], ['u%i'%i for i in range(NCOLS)]] + \
+       [[float(1 + irow*icol) for icol in range(NCOLS)] for irow in range(30)]
+
+# add_scatter keywords of each checked plot, index=golden file name
+PLOT_OPTION_D = {'plain': dict( ycolL=[2] ),
+                 'log_title': dict( ycolL=[2,3,4], logx=True, logy=True, title='Log & <Log>' ),
+                 'y2_labels': dict( ycolL=[2,3], ycol2L=[4,5,6], log2y=True, xlabel='Time', ylabel='Y',
+                                    y2label='Y2' ),
+                 'styles': dict( ycolL=[2,3], ycol2L=[4,5,6], showLineL=[False, True], showMarkerL=[True, False],
+                                 lineStyleL=[0, 3], lineThkL=[None, 3], colorL=['r', '#123456'],
+                                 showMarker2L=[True, False, True], showLine2L=[False, True, False],
+                                 lineStyle2L=[2, 0, 4], color2L=['g', 'b'] ),
+                 'decimated': dict( ycolL=[2,3,4], ycol2L=[5,6], decimate='minmax', max_points=10 )}
+
+def split_tags( xml_str ):
+    return xml_str.replace( '><', '>\n<' ).split( '\n' )
+
+def canonical_lines( xml_str ):
+    """Return one line per Element of xml_str with its attributes sorted (their order differs on python 2)"""
+    lineL = []
+    def add_elem( elem, indent ):
+        attribL = ['%s="%s"'%(k, v) for k, v in sorted( elem.attrib.items() )]
+        lineL.append( '%s%s %s %r'%(indent, elem.tag, ' '.join(attribL), elem.text) )
+        for child in elem:
+            add_elem( child, indent + '  ' )
+        lineL.append( '%s%r'%(indent, elem.tail) )
+    add_elem( TemplateXML_File( xml_str ).root, '' )
+    return lineL
+
+class MyTest(unittest.TestCase):
+
+    def check_golden(self, mySprSht, plot_sheetname, golden_name):
+        styles_xml, content_xml = mySprSht.build_chart_xml( plot_sheetname )
+        fname = os.path.join( GOLDEN_DIR, golden_name + '.xml' )
+        if os.environ.get( 'ODSCHARTS_WRITE_GOLDEN' ):
+            with io.open( fname, 'w', encoding='utf-8', newline='\n' ) as f:
+                f.write( '\n'.join( split_tags(content_xml) ) + '\n' )
+        with io.open( fname, 'r', encoding='utf-8', newline='\n' ) as f:
+            expect_xml = ''.join( f.read().splitlines() )
+        self.assertEqual( canonical_lines(content_xml), canonical_lines(expect_xml) )
+
+    def test_golden(self):
+        """Check that the emitter writes the expected xml for each set of plot options"""
+        for golden_name, options in sorted( PLOT_OPTION_D.items() ):
+            mySprSht = SpreadSheet()
+            mySprSht.add_sheet( 'Data', DATA )
+            mySprSht.add_scatter( 'Plot', 'Data', **options )
+            self.check_golden( mySprSht, 'Plot', golden_name )
+
+    def test_curves_and_ranges(self):
+        """Check curves added from two data sheets and all axis ranges"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet( 'Data', DATA )
+        mySprSht.add_sheet( 'More', DATA[:12] )
+        mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2], ycol2L=[3], logy=True )
+        mySprSht.add_curve( 'Plot', 'More', xcol=2, ycolL=[4,5], ycol2L=[6] )
+        mySprSht.setXrange( 1, 100 )
+        mySprSht.setYrange( ymax=1000 )
+        mySprSht.setY2range( -5.5, 5.5 )
+        self.check_golden( mySprSht, 'Plot', 'curves_and_ranges' )
+
+    def test_compiled_once(self):
+        """Check that each chart template is compiled once"""
+        self.assertIs( get_chart_emitter('alt_chart.ods'), get_chart_emitter('alt_chart.ods') )
+        self.assertIsNot( get_chart_emitter('alt_chart.ods'), get_chart_emitter('alt_chart_y2.ods') )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.template_xml_file import TemplateXML_File
+from odscharts.object_content import ChartStyleIndex
+from odscharts.namespaces import STYLE_STYLE, STYLE_NAME, CHART_SERIES, CHART_STYLE_NAME
+
+NCOLS = 9
+DATA = [['c%i'%i for i in range(NCOLS)], ['u%i'%i for i in range(NCOLS)]] + \
+       [[float(irow*icol) for icol in range(NCOLS)] for irow in range(5)]
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.mySprSht = SpreadSheet()
+        self.mySprSht.add_sheet('Data', DATA)
+        self.mySprSht.add_scatter( 'Plot', 'Data', xcol=1, ycolL=[2,3,4,5,6], ycol2L=[7,8,9], logy=True)
+        chart_obj = TemplateXML_File( self.mySprSht.build_chart_xml( 'Plot' )[1] )
+        self.chart_index = ChartStyleIndex( chart_obj )
+
+    def test_series_order(self):
+        """Check that the emitted series and their styles are in order"""
+        chart_index = self.chart_index
+        nameL = [series.get(CHART_STYLE_NAME) for series in chart_index.plot_area
+                 if series.tag == CHART_SERIES]
+        self.assertEqual( nameL, ['G0S0','G0S1','G0S2','G0S3','G0S4','G1S0','G1S1','G1S2'] )
+
+        styleL = [style.get(STYLE_NAME) for style in chart_index.auto_styles if style.tag == STYLE_STYLE]
+        for name in ['G0S1','G0S2','G0S3','G0S4','G1S1','G1S2']:
+            self.assertEqual( styleL.count(name), 1 )
+        self.assertEqual( styleL.index('G0S4') - styleL.index('G0S1'), 3 )
+
+    def test_index_is_current(self):
+        """Check that every style and series of an emitted chart is in the index"""
+        chart_index = self.chart_index
+        for style in chart_index.auto_styles:
+            if style.tag == STYLE_STYLE:
+                self.assertIs( chart_index.get_style(style.get(STYLE_NAME)), style )
+        for series in chart_index.plot_area:
+            if series.tag == CHART_SERIES:
+                self.assertIs( chart_index.seriesD[series.get(CHART_STYLE_NAME)], series )
+        self.assertIsNotNone( chart_index.get_style('GMi1') )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
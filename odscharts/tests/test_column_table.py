@@ -0,0 +1,94 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.column_table import ColumnTable, format_column, np
+
+LABELS = ['Altitude','Pressure','Temp R','Note']
+UNITS = ['feet','psia','degR','']
+ALT_COLS = [[1, 5000, 10000, 30000, 60000],
+            [14.7, 12.23, 10.11, 4.36, 1.04],
+            [518.7, 500.8, 483.0, 411.8, 390.0],
+            ['sea level', '', 'a&b', '7', None]]
+
+def rows_from_columns( labelL, unitsL, colL ):
+    """Build the equivalent list_of_rows for a list of columns"""
+    rowL = [list(labelL), list(unitsL)]
+    for i in range( len(colL[0]) ):
+        rowL.append( [col[i] for col in colL] )
+    return rowL
+
+class MyTest(unittest.TestCase):
+
+    def test_format_column(self):
+        """Check formatting of numeric and mixed columns"""
+        value_type, office_valueL, textL = format_column( [1, 2.5, 1.0e20] )
+        self.assertEqual( value_type, 'float' )
+        self.assertEqual( office_valueL, ['1.0', '2.5', '1e+20'] )
+        self.assertEqual( textL, ['1', '2.5', '1e+20'] )
+
+        value_type, office_valueL, textL = format_column( [1, 'abc'] )
+        self.assertEqual( value_type, ['float', 'string'] )
+        self.assertEqual( textL, ['1', 'abc'] )
+
+        # NaN, None and '' are empty cells
+        value_type, office_valueL, textL = format_column( [1, float('nan'), None, ''] )
+        self.assertEqual( value_type, ['float', None, None, None] )
+        self.assertEqual( textL, ['1', None, None, None] )
+
+    def test_column_table_rows(self):
+        """Check that a ColumnTable behaves like a list of rows"""
+        table = ColumnTable( LABELS, UNITS, [[1, 2, 3], [4.5]] )
+        self.assertEqual( len(table), 5 )
+        self.assertEqual( table[0], LABELS )
+        self.assertEqual( table[3], [2, ''] )
+        self.assertEqual( list(table)[-1], [3, ''] )
+
+    def test_columns_match_rows(self):
+        """Check that list columns give the same sheet as list_of_rows"""
+        rowSprSht = SpreadSheet()
+        rowSprSht.add_sheet('Alt_Data', rows_from_columns(LABELS, UNITS, ALT_COLS))
+
+        colSprSht = SpreadSheet()
+        colSprSht.add_sheet_columns('Alt_Data', LABELS, UNITS, ALT_COLS)
+
+        rowSprSht.assemble_sheets()
+        colSprSht.assemble_sheets()
+        self.assertEqual( rowSprSht.content_xml_obj.tostring(),
+                          colSprSht.content_xml_obj.tostring() )
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_numpy_columns_match_rows(self):
+        """Check that NumPy columns give the same sheet as list_of_rows"""
+        colL = [np.array(ALT_COLS[0]), np.array(ALT_COLS[1], dtype=np.float32),
+                np.array(ALT_COLS[2]), np.array(ALT_COLS[3], dtype=object)]
+
+        rowSprSht = SpreadSheet()
+        rowSprSht.add_sheet('Alt_Data', rows_from_columns(LABELS, UNITS, colL))
+
+        colSprSht = SpreadSheet()
+        colSprSht.add_sheet_columns('Alt_Data', LABELS, UNITS, colL)
+
+        rowSprSht.assemble_sheets()
+        colSprSht.assemble_sheets()
+        self.assertEqual( rowSprSht.content_xml_obj.tostring(),
+                          colSprSht.content_xml_obj.tostring() )
+
+        dataTableObj = colSprSht.data_table_objD['Alt_Data']
+        self.assertEqual( dataTableObj.nrows, 7 )
+        self.assertEqual( dataTableObj.ncols, 4 )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts import zip_utils
+from odscharts.zip_utils import zipfile_stream_insert, zipfile_insert, zipfile_insert_raw, read_raw_members
+
+LIST_OF_ROWS = [['Angle','Value'], ['deg','']] + [[i, i*0.25] for i in range(2000)]
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def save(self, fname, **kwargs):
+        """Save a small workbook with a compression policy and return its ZipFile"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Data', LIST_OF_ROWS)
+        mySprSht.add_scatter( 'Plot', 'Data', xcol=1, ycolL=[2])
+
+        fname = os.path.join(self.tmp_dir, fname)
+        mySprSht.save( filename=fname, **kwargs )
+        return zipfile.ZipFile( fname )
+
+    def test_stored(self):
+        """Check that compression="stored" stores every file"""
+        zipfileobj = self.save( 'stored.ods', compression='stored' )
+        for info in zipfileobj.infolist():
+            self.assertEqual( info.compress_type, zipfile.ZIP_STORED )
+            self.assertEqual( info.file_size, info.compress_size )
+
+        default_zip = self.save( 'default.ods' )
+        for name in default_zip.namelist():
+            if name != 'meta.xml': # holds the save time
+                self.assertEqual( zipfileobj.read(name), default_zip.read(name) )
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'compresslevel needs python 3.7+')
+    def test_compresslevel(self):
+        """Check that a higher compresslevel gives a smaller content.xml"""
+        fast_info = self.save( 'fast.ods', compresslevel=1 ).getinfo('content.xml')
+        small_info = self.save( 'small.ods', compresslevel=9 ).getinfo('content.xml')
+        self.assertEqual( fast_info.file_size, small_info.file_size )
+        self.assertLess( small_info.compress_size, fast_info.compress_size )
+
+    @unittest.skipIf(sys.version_info >= (3, 7), 'compresslevel is supported')
+    def test_compresslevel_unsupported(self):
+        """Check that compresslevel is rejected before python 3.7"""
+        mySprSht = SpreadSheet()
+        self.assertRaises( ValueError, mySprSht.save,
+                           filename=os.path.join(self.tmp_dir, 'level.ods'), compresslevel=9 )
+
+    def test_store_below(self):
+        """Check that only files smaller than store_below are stored"""
+        zipfileobj = self.save( 'store_below.ods', store_below=1000 )
+        for info in zipfileobj.infolist():
+            if info.file_size < 1000:
+                self.assertEqual( info.compress_type, zipfile.ZIP_STORED )
+            else:
+                self.assertEqual( info.compress_type, zipfile.ZIP_DEFLATED )
+        self.assertEqual( zipfileobj.getinfo('mimetype').compress_type, zipfile.ZIP_STORED )
+
+    def test_stream_store_below(self):
+        """Check store_below for chunks that end before and after the threshold"""
+        fname = os.path.join(self.tmp_dir, 'chunks.zip')
+        zipfileobj = zipfile.ZipFile(fname, "w")
+        zipfile_stream_insert( zipfileobj, 'small.xml', iter(['<a>', u'\u00b0', '</a>']), store_below=10)
+        zipfile_stream_insert( zipfileobj, 'big.xml', iter(['<a>']*100), store_below=10)
+        zipfileobj.close()
+
+        zipfileobj = zipfile.ZipFile(fname)
+        self.assertEqual( zipfileobj.getinfo('small.xml').compress_type, zipfile.ZIP_STORED )
+        self.assertEqual( zipfileobj.read('small.xml').decode('utf-8'), u'<a>\u00b0</a>' )
+        self.assertEqual( zipfileobj.getinfo('big.xml').compress_type, zipfile.ZIP_DEFLATED )
+        self.assertEqual( zipfileobj.read('big.xml'), b'<a>'*100 )
+        zipfileobj.close()
+
+    def test_insert_raw_fallback(self):
+        """Check that raw members are copied by decompressing them when ZipFile internals are missing"""
+        fname = os.path.join(self.tmp_dir, 'source.zip')
+        zipfileobj = zipfile.ZipFile(fname, "w")
+        zipfile_insert( zipfileobj, 'big.xml', '<a>'*1000 )
+        zipfile_insert( zipfileobj, 'small.xml', '<a/>', compress_type=zipfile.ZIP_STORED )
+        zipfileobj.close()
+        zipfileobj = zipfile.ZipFile(fname)
+        rawOD = read_raw_members( zipfileobj )
+        zipfileobj.close()
+
+        decompressL = []
+        def counted_decompress_raw( info, raw_data ):
+            decompressL.append( info.filename )
+            return decompress_raw( info, raw_data )
+        decompress_raw = zip_utils.decompress_raw
+        zip_utils.decompress_raw = counted_decompress_raw
+        zip_utils.ZIPFILE_RAW_ATTR_L.append( '_no_such_attribute' )
+        try:
+            fname = os.path.join(self.tmp_dir, 'copy.zip')
+            zipfileobj = zipfile.ZipFile(fname, "w")
+            for info, raw_data in rawOD.values():
+                zipfile_insert_raw( zipfileobj, info, raw_data )
+            zipfileobj.close()
+        finally:
+            zip_utils.ZIPFILE_RAW_ATTR_L.remove( '_no_such_attribute' )
+            zip_utils.decompress_raw = decompress_raw
+        self.assertEqual( decompressL, ['big.xml', 'small.xml'] )
+
+        zipfileobj = zipfile.ZipFile(fname)
+        self.assertIsNone( zipfileobj.testzip() )
+        self.assertEqual( zipfileobj.read('big.xml'), b'<a>'*1000 )
+        self.assertEqual( zipfileobj.getinfo('small.xml').compress_type, zipfile.ZIP_STORED )
+        self.assertEqual( zipfileobj.read('small.xml'), b'<a/>' )
+        zipfileobj.close()
+
+    def test_bad_compression(self):
+        """Check that an unknown compression name is rejected"""
+        mySprSht = SpreadSheet()
+        self.assertRaises( ValueError, mySprSht.save,
+                           filename=os.path.join(self.tmp_dir, 'bad.ods'), compression='lzma' )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import io
+import math
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts import decimate
+from odscharts.decimate import decimate_xy, lttb_indices, minmax_indices
+from odscharts.spreadsheet import SpreadSheet
+
+def make_wave( n ):
+    xL = [i * 0.01 for i in range(n)]
+    yL = [math.sin( x ) for x in xL]
+    yL[n//3] = 50.0 # a single spike
+    return xL, yL
+
+def make_rows( n ):
+    xL, yL = make_wave( n )
+    return [['Time','Signal'], ['sec','volt']] + [[x, y] for x, y in zip(xL, yL)]
+
+class MyTest(unittest.TestCase):
+
+    def test_lttb(self):
+        """Check that lttb keeps max_points points including the first, last and the spike"""
+        xL, yL = make_wave( 10000 )
+        x, y = decimate_xy( xL, yL, max_points=200, method='lttb' )
+        self.assertEqual( len(x), 200 )
+        self.assertEqual( (x[0], x[-1]), (xL[0], xL[-1]) )
+        self.assertIn( 50.0, list(y) )
+
+    def test_minmax(self):
+        """Check that minmax stays within max_points and keeps the spike"""
+        xL, yL = make_wave( 10001 )
+        x, y = decimate_xy( xL, yL, max_points=101, method='minmax' )
+        self.assertTrue( len(x) <= 101 )
+        self.assertEqual( (x[0], x[-1]), (xL[0], xL[-1]) )
+        self.assertEqual( max(y), 50.0 )
+        self.assertEqual( list(x), sorted(x) )
+
+    def test_smallest_max_points(self):
+        """Check that the smallest max_points of each method is not exceeded"""
+        xL, yL = make_wave( 1001 )
+        for method, min_points in [('lttb', 3), ('minmax', 4)]:
+            for max_points in range( 0, 8 ):
+                x, y = decimate_xy( xL, yL, max_points=max_points, method=method )
+                self.assertTrue( len(x) <= max(min_points, max_points) )
+                self.assertEqual( (x[0], x[-1]), (xL[0], xL[-1]) )
+        self.assertEqual( len( minmax_indices( yL, 4 ) ), 4 )
+
+    def test_short_and_missing(self):
+        """Check that a short series only loses the points that are not numbers"""
+        x, y = decimate_xy( [1, 2, 3, None, 5], [1.0, float('nan'), 3, 4, '5'], max_points=10 )
+        self.assertEqual( list(x), [1.0, 3.0, 5.0] )
+        self.assertEqual( list(y), [1.0, 3.0, 5.0] )
+
+    def test_bad_method(self):
+        self.assertRaises( ValueError, decimate_xy, [1, 2], [1, 2], method='every_other' )
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet( 'Data', make_rows(10) )
+        self.assertRaises( ValueError, mySprSht.add_scatter, 'Plot', 'Data', ycolL=[2], decimate='every_other' )
+        self.assertNotIn( 'Plot', mySprSht.get_sheet_order() )
+
+    @unittest.skipUnless( decimate.np is not None, 'requires numpy' )
+    def test_numpy_matches_python(self):
+        """Check that the NumPy and pure python versions choose the same points"""
+        xL, yL = make_wave( 5003 )
+        np = decimate.np
+        x, y = np.array( xL ), np.array( yL )
+        self.assertEqual( list(decimate.lttb_indices_np( x, y, 300 )), lttb_indices( xL, yL, 300 ) )
+        self.assertEqual( list(decimate.minmax_indices_np( y, 300 )), minmax_indices( yL, 300 ) )
+
+    def test_chart_ranges(self):
+        """Check that decimated curves are charted from a hidden helper sheet"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet( 'Data', make_rows(20000) )
+        mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2], decimate='lttb', max_points=500 )
+        mySprSht.add_curve( 'Plot', 'Data', ycolL=[2], decimate='minmax', max_points=400 )
+        self.assertEqual( mySprSht.get_sheet_order(), ['Plot', 'Data', 'Plot_decimated'] )
+
+        fOut = io.BytesIO()
+        mySprSht.save_to( fOut )
+        zf = zipfile.ZipFile( fOut )
+        chart = zf.read('Object 1/content.xml').decode('utf-8')
+        self.assertIn( 'values-cell-range-address="Plot_decimated.$B$3:.$B$502"', chart )
+        self.assertIn( '<chart:domain table:cell-range-address="Plot_decimated.$C$3:', chart )
+        self.assertIn( 'chart:label-cell-address="Data.$B$1"', chart )
+        self.assertNotIn( 'Data.$B$3', chart )
+
+        content = zf.read('content.xml').decode('utf-8')
+        self.assertIn( 'table:name="Plot_decimated" table:style-name="ta2"', content )
+        self.assertIn( 'table:display="false"', content )
+
+    def test_add_curve_rollback(self):
+        """Check that add_curve leaves the helper sheet alone when decimating ycol2L fails"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet( 'Data', make_rows(1000) )
+        mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2], decimate='lttb', max_points=50 )
+        mySprSht.add_scatter( 'Plain', 'Data', ycolL=[2] )
+        P = mySprSht.plot_sheet_objD['Plot']
+        table_obj = mySprSht.data_table_objD['Plot_decimated']
+
+        self.assertRaises( TypeError, mySprSht.add_curve, 'Plot', 'Data', ycolL=[2], ycol2L=[None],
+                           decimate='lttb', max_points=50 )
+        self.assertEqual( len(P.decimated_table.arrayL), 2 )
+        self.assertIs( mySprSht.data_table_objD['Plot_decimated'], table_obj )
+        self.assertEqual( len(table_obj.list_of_rows.arrayL), 2 )
+
+        self.assertRaises( TypeError, mySprSht.add_curve, 'Plain', 'Data', ycolL=[2], ycol2L=[None],
+                           decimate='lttb', max_points=50 )
+        self.assertIsNone( mySprSht.plot_sheet_objD['Plain'].decimated_table )
+        self.assertEqual( mySprSht.get_sheet_order(), ['Plain', 'Plot', 'Data', 'Plot_decimated'] )
+
+        fOut = io.BytesIO()
+        mySprSht.save_to( fOut )
+        content = zipfile.ZipFile( fOut ).read('content.xml').decode('utf-8')
+        self.assertEqual( content.count('table:name="Plot_decimated"'), 1 )
+        self.assertNotIn( 'Plain_decimated', content )
+
+    def test_decimate_after_save(self):
+        """Check that decimating again after a save leaves no stale helper sheet in content.xml"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet( 'Data', make_rows(1000) )
+        mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2], decimate='lttb', max_points=50 )
+        mySprSht.save_to( io.BytesIO() )
+        mySprSht.add_curve( 'Plot', 'Data', ycolL=[2], decimate='lttb', max_points=40 )
+
+        fOut = io.BytesIO()
+        mySprSht.save_to( fOut )
+        content = zipfile.ZipFile( fOut ).read('content.xml').decode('utf-8')
+        self.assertNotIn( '<!--ODSCharts data sheet', content )
+        self.assertEqual( content.count('table:name="Plot_decimated"'), 1 )
+
+    def test_one_shot_iterator(self):
+        """Check that a streamed one-shot data sheet can not be decimated"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet( 'Data', iter(make_rows(100)), stream=True )
+        self.assertRaises( Exception, mySprSht.add_scatter, 'Plot', 'Data', ycolL=[2], decimate='lttb' )
+        self.assertNotIn( 'Plot', mySprSht.get_sheet_order() )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
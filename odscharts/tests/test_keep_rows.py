@@ -0,0 +1,71 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import gc
+import weakref
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.data_table_desc import StreamConsumedError
+
+class Rows(list):
+    """A list of rows that can be weakly referenced."""
+
+def make_rows():
+    return Rows( [['Time', 'Name', 'Value', 'Empty'], ['sec', '', 'ft', ''],
+                  [0.0, 'a', 1.5, None], [1.0, 2.0, 2.5, None], [2.0, 'c', 3.5, ''],
+                  [3.0, 'd', 4.5, None]] )
+
+class MyTest(unittest.TestCase):
+
+    def test_rows_released(self):
+        """Check that keep_rows=False frees the rows and keeps size, labels, units and types"""
+        mySprSht = SpreadSheet( keep_rows=False )
+        list_of_rows = make_rows()
+        rows_ref = weakref.ref( list_of_rows )
+        mySprSht.add_sheet( 'Data', list_of_rows )
+        del list_of_rows
+        gc.collect()
+        self.assertIsNone( rows_ref() )
+
+        dataTableObj = mySprSht.data_table_objD['Data']
+        self.assertEqual( (dataTableObj.nrows, dataTableObj.ncols), (6, 4) )
+        self.assertEqual( dataTableObj.labelL, ['Time', 'Name', 'Value', 'Empty'] )
+        self.assertEqual( dataTableObj.unitsL, ['sec', '', 'ft', ''] )
+        self.assertEqual( dataTableObj.get_column_types(), ['float', 'string', 'float', None] )
+        self.assertRaises( StreamConsumedError, dataTableObj.get_column, 1 )
+
+        # charts only need the size and units
+        mySprSht.add_scatter( 'Plot', 'Data', xcol=1, ycolL=[3] )
+        content_xml = mySprSht.build_chart_xml( 'Plot' )[1]
+        self.assertIn( '> (ft)</text:p>', content_xml )
+        self.assertIn( 'chart:values-cell-range-address="Data.$C$3:.$C$6"', content_xml )
+        self.assertRaises( StreamConsumedError, mySprSht.add_scatter, 'Dec_Plot', 'Data',
+                           xcol=1, ycolL=[3], decimate='minmax', max_points=2 )
+
+    def test_same_content(self):
+        """Check that releasing the rows does not change the saved xml"""
+        contentL = []
+        for keep_rows in (True, False):
+            mySprSht = SpreadSheet( keep_rows=keep_rows )
+            mySprSht.add_sheet( 'Data', make_rows() )
+            mySprSht.add_sheet( 'Stream', make_rows(), stream=True )
+            mySprSht.add_scatter( 'Plot', 'Data', xcol=1, ycolL=[3] )
+            contentL.append( mySprSht.content_xml_obj.tostring() )
+            self.assertEqual( mySprSht.data_table_objD['Data'].get_column_types(),
+                              ['float', 'string', 'float', None] )
+            self.assertEqual( mySprSht.data_table_objD['Stream'].get_column(3), [1.5, 2.5, 3.5, 4.5] )
+        self.assertEqual( contentL[0], contentL[1] )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.find_obj import NS
+from odscharts.namespaces import NamespaceMap, ODF_NSOD, qname, TABLE_TABLE_CELL, CHART_SYMBOL_TYPE
+
+TABLE_URI = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+
+class MyTest(unittest.TestCase):
+
+    def test_find_obj_NS(self):
+        """Check NS with a plain dict, including each step of a path"""
+        nsD = dict( ODF_NSOD )
+        self.assertEqual( NS('table:table', nsD), '{%s}table'%TABLE_URI )
+        self.assertEqual( NS('office:body/table:table', nsD),
+                          '{%s}body/{%s}table'%(ODF_NSOD['office'], TABLE_URI) )
+        self.assertEqual( NS('{%s}table'%TABLE_URI, nsD), '{%s}table'%TABLE_URI )
+        self.assertEqual( NS('.', nsD), '.' )
+
+    def test_namespace_map_cache(self):
+        """Check that NamespaceMap forgets resolved names when a prefix changes"""
+        nsOD = NamespaceMap( ODF_NSOD )
+        self.assertEqual( NS('table:table-cell', nsOD), TABLE_TABLE_CELL )
+        self.assertIn( 'table:table-cell', nsOD.qname_cacheD )
+
+        nsOD['table'] = 'urn:example:table'
+        self.assertEqual( nsOD.resolve('table:table-cell'), '{urn:example:table}table-cell' )
+
+    def test_constants_match_templates(self):
+        """Check that the constants match the names resolved from the template files"""
+        mySprSht = SpreadSheet()
+        self.assertEqual( mySprSht.content_xml_obj.NS('table:table-cell'), TABLE_TABLE_CELL )
+        self.assertEqual( mySprSht.template_ObjectN_styles_xml_obj.NS('chart:symbol-type'), CHART_SYMBOL_TYPE )
+        self.assertEqual( qname('chart:symbol-type'), CHART_SYMBOL_TYPE )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import re
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet, MySheetNameError
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [10000, 10.11, 483.0, 268.3333],
+            [30000,  4.36, 411.8, 228.7778],
+            [60000,  1.04, 390.0, 216.6667]]
+
+DAY2_DATA = [['Hour','Load'], ['hr','kW'], [1, 5.5], [2, 5.5], [3, None], [4, 7.25]]
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+        self.fname = os.path.join(self.tmp_dir, 'report.ods')
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Alt_Data', ALT_DATA)
+        mySprSht.add_sheet('Day_1', DAY2_DATA[:3], stream=True)
+        mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2,3], ycol2L=[4])
+        mySprSht.add_scatter( 'Day_1_Plot', 'Day_1', xcol=1, ycolL=[2], lineStyleL=[3])
+        mySprSht.save( filename=self.fname )
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def test_open_registries(self):
+        """Check that data sheets and plots are found in an opened file"""
+        mySprSht = SpreadSheet.open( self.fname )
+
+        self.assertEqual( mySprSht.ordered_dataL, ['Alt_Data', 'Day_1'] )
+        self.assertEqual( mySprSht.ordered_plotL, ['Alt_Plot', 'Day_1_Plot'] )
+
+        dataTableObj = mySprSht.data_table_objD['Alt_Data']
+        self.assertEqual( dataTableObj.nrows, 7 )
+        self.assertEqual( dataTableObj.ncols, 4 )
+        self.assertEqual( dataTableObj.labelL, ALT_DATA[0] )
+        self.assertEqual( dataTableObj.unitsL, ALT_DATA[1] )
+        self.assertEqual( mySprSht.data_table_objD['Day_1'].nrows, 3 )
+
+        self.assertEqual( mySprSht.plot_sheet_objD['Day_1_Plot'].num_chart, 2 )
+        self.assertRaises( MySheetNameError, mySprSht.add_curve, 'Alt_Plot', 'Alt_Data', ycolL=[4] )
+        self.assertRaises( MySheetNameError, mySprSht.add_sheet, 'Alt_Plot', ALT_DATA )
+
+    def test_latest_data_sheet(self):
+        """Check that ordered_dataL holds sheet names for opened and added sheets"""
+        mySprSht = SpreadSheet.open( self.fname )
+        mySprSht.add_sheet('Day_2', DAY2_DATA)
+        self.assertEqual( mySprSht.ordered_dataL, ['Alt_Data', 'Day_1', 'Day_2'] )
+
+        # data_sheetname=None uses the latest data sheet
+        mySprSht.add_scatter( 'Day_2_Plot', 'Day_2', xcol=1, ycolL=[2])
+        mySprSht.add_curve( 'Day_2_Plot', None, xcol=1, ycolL=[2], lineStyleL=[2])
+        self.assertEqual( mySprSht.plot_sheet_objD['Day_2_Plot'].ycolDataSheetNameL, ['Day_2']*2 )
+
+    def test_resave_unchanged(self):
+        """Check that saving an opened file again gives the same files"""
+        fname2 = os.path.join(self.tmp_dir, 'report2.ods')
+        SpreadSheet.open( self.fname ).save( filename=fname2 )
+
+        zip1 = zipfile.ZipFile( self.fname )
+        zip2 = zipfile.ZipFile( fname2 )
+        self.assertEqual( zip1.namelist(), zip2.namelist() )
+        for name in zip1.namelist():
+            if name != 'meta.xml': # holds the save time
+                self.assertEqual( zip1.read(name), zip2.read(name) )
+                self.assertEqual( zip1.getinfo(name).compress_size, zip2.getinfo(name).compress_size )
+
+    def test_keep_meta(self):
+        """Check that an opened file keeps its creation date and keep_rows is passed on"""
+        # give the file an old creation date
+        zip1 = zipfile.ZipFile( self.fname )
+        memberL = [(info, zip1.read(info)) for info in zip1.infolist()]
+        zip1.close()
+        old_fname = os.path.join(self.tmp_dir, 'old.ods')
+        zip2 = zipfile.ZipFile( old_fname, 'w' )
+        for info, data in memberL:
+            if info.filename == 'meta.xml':
+                data = re.sub( b'<meta:creation-date>[^<]*<', b'<meta:creation-date>2001-02-03T04:05:06<', data )
+                data = data.replace( b'>ODSCharts</meta:initial-creator>', b'>Someone</meta:initial-creator>' )
+            zip2.writestr( info, data )
+        zip2.close()
+
+        mySprSht = SpreadSheet.open( old_fname, keep_rows=False )
+        self.assertFalse( mySprSht.keep_rows )
+        mySprSht.add_sheet('Day_2', DAY2_DATA)
+        fname2 = os.path.join(self.tmp_dir, 'report2.ods')
+        mySprSht.save( filename=fname2 )
+
+        meta = zipfile.ZipFile( fname2 ).read('meta.xml').decode('utf-8')
+        self.assertIn( '<meta:creation-date>2001-02-03T04:05:06</meta:creation-date>', meta )
+        self.assertIn( '<meta:initial-creator>Someone</meta:initial-creator>', meta )
+        self.assertIn( '<dc:creator>ODSCharts</dc:creator>', meta )
+        self.assertNotIn( '<dc:date>2001', meta )
+
+    def test_append_sheet_and_plot(self):
+        """Check that a new day's sheet and plot are added to an opened file"""
+        mySprSht = SpreadSheet.open( self.fname )
+        mySprSht.add_sheet('Day_2', DAY2_DATA)
+        mySprSht.add_scatter( 'Day_2_Plot', 'Day_2', xcol=1, ycolL=[2])
+        mySprSht.setXrange( 0, 70000, plot_sheetname='Alt_Plot' )
+        mySprSht.save( filename=self.fname ) # same file that was opened
+
+        zipfileobj = zipfile.ZipFile( self.fname )
+        self.assertIsNone( zipfileobj.testzip() )
+        self.assertIn( 'Object 3/content.xml', zipfileobj.namelist() )
+
+        chart = zipfileobj.read('Object 3/content.xml').decode('utf-8')
+        self.assertIn( 'Day_2.$B$3:.$B$6', chart )
+        chart = zipfileobj.read('Object 1/content.xml').decode('utf-8')
+        self.assertIn( 'chart:maximum="70000"', chart )
+
+        manifest = zipfileobj.read('META-INF/manifest.xml').decode('utf-8')
+        self.assertIn( 'manifest:full-path="Object 3/content.xml"', manifest )
+
+        mySprSht = SpreadSheet.open( self.fname )
+        self.assertEqual( mySprSht.ordered_dataL, ['Alt_Data', 'Day_1', 'Day_2'] )
+        self.assertEqual( mySprSht.ordered_plotL, ['Alt_Plot', 'Day_1_Plot', 'Day_2_Plot'] )
+        self.assertEqual( mySprSht.data_table_objD['Day_2'].nrows, 6 )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [10000, 10.11, 483.0, 268.3333],
+            [30000,  4.36, 411.8, 228.7778],
+            [60000,  1.04, 390.0, 216.6667]]
+
+def make_spreadsheet():
+    """Build a SpreadSheet with a variety of charts"""
+    mySprSht = SpreadSheet()
+    mySprSht.add_sheet('Alt_Data', ALT_DATA)
+    mySprSht.add_sheet('Alt_Stream', ALT_DATA, stream=True)
+
+    mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2,3,4])
+    mySprSht.setXrange( 0, 70000 )
+
+    mySprSht.add_scatter( 'Alt_Y2', 'Alt_Stream', xcol=1, ycolL=[2], ycol2L=[3,4],
+                          lineStyleL=[2], lineStyle2L=[3,4], logy=True)
+    mySprSht.setY2range( 200, 600 )
+
+    mySprSht.add_scatter( 'Alt_Curve', 'Alt_Data', xcol=1, ycolL=[3])
+    mySprSht.add_curve( 'Alt_Curve', 'Alt_Stream', xcol=1, ycolL=[4], lineStyleL=[5])
+    return mySprSht
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def test_parallel_save_matches_serial(self):
+        """Check that save(workers=2) writes the same files as a serial save"""
+        serial_fname = os.path.join(self.tmp_dir, 'serial.ods')
+        make_spreadsheet().save( filename=serial_fname )
+
+        parallel_fname = os.path.join(self.tmp_dir, 'parallel.ods')
+        make_spreadsheet().save( filename=parallel_fname, workers=2 )
+
+        serial_zip = zipfile.ZipFile( serial_fname )
+        parallel_zip = zipfile.ZipFile( parallel_fname )
+        self.assertEqual( serial_zip.namelist(), parallel_zip.namelist() )
+
+        for name in serial_zip.namelist():
+            if name != 'meta.xml': # holds the save time
+                self.assertEqual( serial_zip.read(name), parallel_zip.read(name) )
+
+        # all files share one time stamp
+        self.assertEqual( len(set(info.date_time for info in parallel_zip.infolist())), 1 )
+
+    def test_chart_doc_is_slim(self):
+        """Check that the worker copy holds no sheet data"""
+        mySprSht = make_spreadsheet()
+        chart_doc = mySprSht.get_chart_doc()
+
+        dataTableObj = chart_doc.data_table_objD['Alt_Data']
+        self.assertEqual( dataTableObj.nrows, 7 )
+        self.assertEqual( dataTableObj.unitsL, ['feet','psia','degR','degK'] )
+        self.assertFalse( hasattr(dataTableObj, 'list_of_rows') )
+
+        plotSheetObj = chart_doc.plot_sheet_objD['Alt_Plot']
+        self.assertIs( plotSheetObj.document, chart_doc )
+        self.assertIsNone( plotSheetObj.xmlSheetObj )
+        self.assertIsNot( plotSheetObj, mySprSht.plot_sheet_objD['Alt_Plot'] )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import re
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.plot_table_desc import fill_values
+
+DATA = [['c%i'%i for i in range(8)], ['u%i'%i for i in range(8)]] + \
+       [[float(1 + irow*icol) for icol in range(8)] for irow in range(10)]
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mySprSht = SpreadSheet()
+        self.mySprSht.add_sheet( 'Data', DATA )
+
+    def test_fill_values(self):
+        """Check the defaults of missing per-curve values"""
+        self.assertEqual( fill_values( None, 3, True, True ), [True, True, True] )
+        self.assertEqual( fill_values( [1, None], 4, 0, True ), [1, None, None, None] )
+        self.assertEqual( fill_values( [1, 2, 3], 2, 0 ), [1, 2] )
+        self.assertEqual( fill_values( ['r'], 3, None ), ['r', None, None] )
+
+    def test_both_axes(self):
+        """Check that values of the curves of both y axes are filled the same way"""
+        self.mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2,3,4], ycol2L=[5,6,7],
+                                   showMarkerL=[False], showMarker2L=[False],
+                                   lineThkL=[2], lineThk2L=[2], lineStyleL=[0, 3], lineStyle2L=[0, 4] )
+        P = self.mySprSht.plot_sheet_objD['Plot']
+        self.assertEqual( len(P.series), 3 )
+        self.assertEqual( P.ycol2L, [5,6,7] )
+        self.assertEqual( P.ycol2_DataSheetNameL, ['Data']*3 )
+        for showMarkerL, lineThkL, markerHtWdL in [(P.showMarkerL, P.lineThkL, P.markerHtWdL),
+                                                   (P.showMarker2L, P.lineThk2L, P.markerHtWd2L)]:
+            self.assertEqual( showMarkerL, [False]*3 )
+            self.assertEqual( lineThkL, ['2mm']*3 )
+            self.assertEqual( markerHtWdL, ['6mm']*3 )
+        self.assertEqual( P.lineStyleL, [0, 3, 3] )
+        self.assertEqual( P.set_of_line_styles, set([3, 4]) )
+        self.assertEqual( len( set(P.colorL + P.color2L) ), 6 )
+
+    def test_add_curve(self):
+        """Check that add_curve repeats the last values and leaves the input lists alone"""
+        ycolL = [2]
+        self.mySprSht.add_scatter( 'Plot', 'Data', ycolL=ycolL, lineThkL=[1.5], showLineL=[False] )
+        self.mySprSht.add_curve( 'Plot', 'Data', xcol=2, ycolL=[3,4] )
+        P = self.mySprSht.plot_sheet_objD['Plot']
+        self.assertEqual( ycolL, [2] )
+        self.assertEqual( P.ycolL, [2,3,4] )
+        self.assertEqual( P.xcolL, [1,2,2] )
+        self.assertEqual( P.lineThkL, ['1.5mm']*3 )
+        self.assertEqual( P.showLineL, [False]*3 )
+        self.assertEqual( P.ycol2L, [] )
+
+    def test_missing_line_thickness(self):
+        """Check that a missing line thickness gives the baseline 0.8mm lines and 2.4mm markers"""
+        self.mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2,3,4], lineThkL=[None], showLineL=[False] )
+        P = self.mySprSht.plot_sheet_objD['Plot']
+        self.assertEqual( P.lineThkL, ['0.8mm']*3 )
+        self.assertEqual( P.markerHtWdL, ['2.4mm']*3 )
+
+        content_xml = self.mySprSht.build_chart_xml( 'Plot' )[1]
+        self.assertEqual( re.findall( r'chart:symbol-width="([^"]*)"', content_xml ), ['2.4mm']*3 )
+        self.assertEqual( re.findall( r'svg:stroke-width="([^"]*mm)"', content_xml ), ['0.8mm']*3 )
+
+    def test_bad_line_thickness(self):
+        """Check that a bad line thickness is 0.8mm and later missing ones repeat it"""
+        self.mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2,3,4], lineThkL=[2, 'thick'] )
+        P = self.mySprSht.plot_sheet_objD['Plot']
+        self.assertEqual( P.lineThkL, ['2mm', '0.8mm', '0.8mm'] )
+        self.assertEqual( P.markerHtWdL, ['6mm', '2.4mm', '2.4mm'] )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import io
+import zipfile
+import xml.etree.ElementTree as StdET
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.data_table_desc import MAX_COLS, MAX_ROWS, format_cell, get_cell_runs, EMPTY_CELL
+
+TABLE = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+TEXT = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+
+SPARSE_DATA = [['Time','Temp','Press','Note'],
+               ['sec','degF','',''],
+               [0, 70.1, None, ''],
+               [1, float('nan'), 14.7, ''],
+               [2, 2, 2, 2],
+               [2, 2, 2, 2],
+               [2, 2, 2, 2],
+               ['', None, '', float('nan')],
+               ['', None, '', float('nan')],
+               [5, 'a', 'a', None]]
+
+def read_sheet( ods_bytes, sheetname ):
+    """Return (rows, total rows, list of total columns in each row) of sheetname.
+       Repeated rows and cells are expanded and trailing empty cells dropped."""
+    root = StdET.fromstring( zipfile.ZipFile( io.BytesIO(ods_bytes) ).read('content.xml') )
+    for table in root.iter( TABLE + 'table' ):
+        if table.get( TABLE + 'name' ) == sheetname:
+            break
+
+    rowL = []
+    row_countL = []
+    for row in table.iter( TABLE + 'table-row' ):
+        valL = []
+        ncols = 0
+        for cell in row.iter( TABLE + 'table-cell' ):
+            nrep = int( cell.get(TABLE + 'number-columns-repeated', '1') )
+            text_p = cell.find( TEXT + 'p' )
+            val = None if text_p is None else (text_p.text or '')
+            valL.extend( [val] * nrep )
+            ncols += nrep
+        while valL and valL[-1] is None:
+            valL.pop()
+        row_countL.append( ncols )
+
+        nrep = int( row.get(TABLE + 'number-rows-repeated', '1') )
+        if valL:
+            rowL.extend( [valL] * nrep )
+        else:
+            rowL.extend( [[]] * min(nrep, 10) ) # do not expand the final filler row
+    total_rows = sum( int(row.get(TABLE + 'number-rows-repeated', '1'))
+                      for row in table.iter( TABLE + 'table-row' ) )
+    return rowL, total_rows, row_countL
+
+class MyTest(unittest.TestCase):
+
+    def test_format_empty_cells(self):
+        """Check that None, NaN and '' are empty cells"""
+        for value in [None, float('nan'), '', u'']:
+            self.assertEqual( format_cell(value), EMPTY_CELL )
+        self.assertEqual( format_cell(' '), ("string", None, ' ') )
+        self.assertEqual( format_cell(u'\u00b0F'), ("string", None, u'\u00b0F') )
+        self.assertEqual( format_cell(0), ("float", '0.0', '0') )
+
+    def test_cell_runs(self):
+        """Check runs of identical cells and that trailing empty cells are dropped"""
+        cellL = [format_cell(v) for v in [1, 1, '', None, 'a', 1, None, '']]
+        self.assertEqual( get_cell_runs(cellL), [("float", '1.0', '1', 2), EMPTY_CELL + (2,),
+                                                 ("string", None, 'a', 1), ("float", '1.0', '1', 1)] )
+        self.assertEqual( get_cell_runs([EMPTY_CELL, EMPTY_CELL]), [] )
+
+    def test_stream_matches_element_sheet(self):
+        """Check that repeated cells and rows are the same in stream and Element sheets"""
+        elemSprSht = SpreadSheet()
+        elemSprSht.add_sheet('Sparse', SPARSE_DATA)
+
+        streamSprSht = SpreadSheet()
+        streamSprSht.add_sheet('Sparse', SPARSE_DATA, stream=True)
+
+        elemSprSht.assemble_sheets()
+        streamSprSht.assemble_sheets()
+        self.assertEqual( elemSprSht.content_xml_obj.tostring(),
+                          streamSprSht.content_xml_obj.tostring() )
+
+    def test_repeated_cells_read_back(self):
+        """Check that an expanded sheet holds all the values in their places"""
+        for stream in [False, True]:
+            mySprSht = SpreadSheet()
+            mySprSht.add_sheet('Sparse', SPARSE_DATA, stream=stream)
+            rowL, total_rows, row_countL = read_sheet( mySprSht.to_bytes(), 'Sparse' )
+
+            self.assertEqual( total_rows, MAX_ROWS )
+            self.assertEqual( set(row_countL), set([MAX_COLS]) )
+
+            for row, expected in zip(rowL, SPARSE_DATA):
+                expected = [format_cell(v)[2] for v in expected]
+                while expected and expected[-1] is None:
+                    expected.pop()
+                self.assertEqual( row, expected )
+
+    def test_repeats_in_xml(self):
+        """Check that runs are written once with a repeat count"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Sparse', SPARSE_DATA)
+        mySprSht.assemble_sheets()
+        content = mySprSht.content_xml_obj.tostring()
+
+        self.assertIn( 'office:value="2.0" table:number-columns-repeated="4"><text:p>2</text:p>', content )
+        self.assertIn( '<table:table-row table:style-name="ro1" table:number-rows-repeated="3">', content )
+        self.assertIn( '<table:table-row table:style-name="ro1" table:number-rows-repeated="2">'
+                       '<table:table-cell table:number-columns-repeated="%i" />'%MAX_COLS, content )
+        self.assertNotIn( '<text:p />', content )
+
+    def test_trailing_empty_rows(self):
+        """Check that empty rows at the end join the final filler row"""
+        for stream in [False, True]:
+            mySprSht = SpreadSheet()
+            mySprSht.add_sheet('Sparse', SPARSE_DATA[:5] + [[None, ''], []], stream=stream)
+            mySprSht.assemble_sheets()
+            content = mySprSht.content_xml_obj.tostring()
+            self.assertIn( 'table:number-rows-repeated="%i"'%(MAX_ROWS - 5), content )
+            self.assertEqual( mySprSht.data_table_objD['Sparse'].nrows, 7 )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
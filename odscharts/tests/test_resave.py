@@ -0,0 +1,131 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet, read_raw_members
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [10000, 10.11, 483.0, 268.3333],
+            [30000,  4.36, 411.8, 228.7778],
+            [60000,  1.04, 390.0, 216.6667]]
+
+def read_raw( fname ):
+    """Return dict of raw compressed bytes in fname, index=member name"""
+    with zipfile.ZipFile( fname ) as odsfile:
+        return dict( (name, raw) for name, (info, raw) in read_raw_members( odsfile ).items() )
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+        self.mySprSht = SpreadSheet()
+        self.mySprSht.add_sheet('Alt_Data', ALT_DATA)
+        self.mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2])
+        self.mySprSht.add_scatter( 'Temp_Plot', 'Alt_Data', xcol=1, ycolL=[3])
+
+        # count the charts that are built
+        self.builtL = []
+        build_chart_xml = self.mySprSht.build_chart_xml
+        def counted_build( plot_sheetname, **kwargs ):
+            self.builtL.append( plot_sheetname )
+            return build_chart_xml( plot_sheetname, **kwargs )
+        self.mySprSht.build_chart_xml = counted_build
+
+        self.fname1 = self.save( 'first.ods' )
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def save(self, name, **kwargs):
+        fname = os.path.join(self.tmp_dir, name)
+        self.mySprSht.save( filename=fname, **kwargs )
+        return fname
+
+    def changed_members(self, fname1, fname2):
+        raw1 = read_raw( fname1 )
+        raw2 = read_raw( fname2 )
+        self.assertEqual( sorted(raw1), sorted(raw2) )
+        return sorted( name for name in raw1 if raw1[name] != raw2[name] )
+
+    def test_unchanged_resave(self):
+        """Check that saving again copies every member except meta.xml"""
+        self.assertEqual( self.builtL, ['Alt_Plot', 'Temp_Plot'] )
+
+        fname2 = self.save( 'second.ods' )
+        self.assertEqual( self.builtL, ['Alt_Plot', 'Temp_Plot'] )
+
+        changedL = self.changed_members( self.fname1, fname2 )
+        self.assertTrue( set(changedL) <= set(['meta.xml']) )
+
+        with zipfile.ZipFile( fname2 ) as odsfile:
+            self.assertIsNone( odsfile.testzip() )
+
+    def test_changed_plot(self):
+        """Check that only the changed chart is built again"""
+        self.mySprSht.setYrange( 0, 20, plot_sheetname='Alt_Plot' )
+        fname2 = self.save( 'second.ods' )
+
+        self.assertEqual( self.builtL, ['Alt_Plot', 'Temp_Plot', 'Alt_Plot'] )
+        changedL = self.changed_members( self.fname1, fname2 )
+        self.assertIn( 'Object 1/content.xml', changedL )
+        self.assertNotIn( 'Object 2/content.xml', changedL )
+        self.assertNotIn( 'content.xml', changedL )
+
+    def test_new_sheet(self):
+        """Check that a new sheet writes content.xml and manifest again"""
+        self.mySprSht.add_sheet('More_Data', ALT_DATA)
+        self.mySprSht.add_scatter( 'More_Plot', 'More_Data', xcol=1, ycolL=[4])
+        fname2 = self.save( 'second.ods' )
+
+        self.assertEqual( self.builtL, ['Alt_Plot', 'Temp_Plot', 'More_Plot'] )
+        with zipfile.ZipFile( fname2 ) as odsfile:
+            content = odsfile.read('content.xml').decode('utf-8')
+            manifest = odsfile.read('META-INF/manifest.xml').decode('utf-8')
+        self.assertIn( 'table:name="More_Data"', content )
+        self.assertIn( 'Object 3/', manifest )
+
+    def test_new_compression(self):
+        """Check that a different compression policy writes every member again"""
+        fname2 = self.save( 'second.ods', compression='stored' )
+
+        self.assertEqual( self.builtL, ['Alt_Plot', 'Temp_Plot'] * 2 )
+        with zipfile.ZipFile( fname2 ) as odsfile:
+            for info in odsfile.infolist():
+                self.assertEqual( info.compress_type, zipfile.ZIP_STORED )
+
+    def test_stream_not_cached(self):
+        """Check that iter_bytes does not replace members cached by save"""
+        self.mySprSht.setXrange( 0, 50000, plot_sheetname='Temp_Plot' )
+        data = b"".join( self.mySprSht.iter_bytes() )
+        self.assertTrue( data.startswith(b'PK') )
+
+        # the chart from iter_bytes could not be read back, so it is built again
+        fname2 = self.save( 'second.ods' )
+        self.assertEqual( self.builtL, ['Alt_Plot', 'Temp_Plot', 'Temp_Plot', 'Temp_Plot'] )
+
+        with zipfile.ZipFile( fname2 ) as odsfile:
+            chart = odsfile.read('Object 2/content.xml').decode('utf-8')
+        self.assertIn( 'chart:maximum="50000"', chart )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
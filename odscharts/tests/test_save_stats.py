@@ -0,0 +1,91 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import zipfile
+import io
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet, warm_template_cache
+from odscharts.template_xml_file import TemplateXML_File
+from odscharts.save_stats import NULL_STATS
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [10000, 10.11, 483.0, 268.3333],
+            [30000,  4.36, 411.8, 228.7778],
+            [60000,  1.04, 390.0, 216.6667]]
+
+class MyTest(unittest.TestCase):
+
+    def test_stats_off_by_default(self):
+        """Check that no stats are collected unless asked for"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Alt_Data', ALT_DATA)
+        mySprSht.to_bytes()
+        self.assertIsNone( mySprSht.stats )
+        self.assertIs( mySprSht.next_stats, NULL_STATS )
+
+    def test_save_stats(self):
+        """Check phase times, member sizes and element counts of a save"""
+        warm_template_cache() # charts are written by an emitter compiled once per process
+        statsL = []
+        mySprSht = SpreadSheet( stats_callback=statsL.append )
+        mySprSht.add_sheet('Alt_Data', ALT_DATA)
+        mySprSht.add_sheet('Alt_Stream', ALT_DATA, stream=True)
+        mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2,3,4])
+        data = mySprSht.to_bytes()
+
+        stats = mySprSht.stats
+        self.assertEqual( statsL, [stats] )
+        for phase in ('template load', 'data cells', 'chart build', 'serialize', 'zip write'):
+            self.assertIn( phase, stats.phase_timeD )
+        self.assertTrue( stats.save_time > 0.0 )
+        self.assertEqual( stats.template_loads, 5 ) # all in SpreadSheet()
+
+        zipfileobj = zipfile.ZipFile( io.BytesIO(data) )
+        self.assertEqual( list(stats.member_sizeD.keys()), zipfileobj.namelist() )
+        info = zipfileobj.getinfo('content.xml')
+        self.assertEqual( stats.member_sizeD['content.xml'], (info.file_size, info.compress_size) )
+        self.assertEqual( stats.raw_memberL, [] )
+
+        self.assertIsNone( stats.sheet_elem_countD['Alt_Stream'] )
+        self.assertEqual( stats.sheet_nrowsD['Alt_Stream'], 7 )
+        self.assertTrue( stats.sheet_elem_countD['Alt_Data'] > 7 )
+
+        # a second save copies unchanged members and starts new counters
+        mySprSht.to_bytes()
+        self.assertEqual( len(statsL), 2 )
+        self.assertIn( 'content.xml', mySprSht.stats.raw_memberL )
+        self.assertEqual( mySprSht.stats.template_loads, 0 )
+        self.assertNotIn( 'data cells', mySprSht.stats.phase_timeD )
+
+        # the count of the emitted chart is the count of the Elements that were written
+        chart_obj = TemplateXML_File( zipfileobj.read('Object 1/content.xml').decode('utf-8') )
+        self.assertEqual( stats.chart_elem_countD['Alt_Plot'], sum( 1 for _ in chart_obj.root.iter() ) )
+
+    def test_disable_stats(self):
+        """Check that disable_stats stops collection"""
+        mySprSht = SpreadSheet( collect_stats=True )
+        mySprSht.add_sheet('Alt_Data', ALT_DATA)
+        mySprSht.to_bytes()
+        stats = mySprSht.stats
+
+        mySprSht.disable_stats()
+        mySprSht.to_bytes()
+        self.assertIs( mySprSht.stats, stats )
+        self.assertIn( 'Alt_Data', stats.summary() )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
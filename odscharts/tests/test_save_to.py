@@ -0,0 +1,105 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import io
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [10000, 10.11, 483.0, 268.3333],
+            [30000,  4.36, 411.8, 228.7778],
+            [60000,  1.04, 390.0, 216.6667]]
+
+def make_spreadsheet():
+    mySprSht = SpreadSheet()
+    mySprSht.add_sheet('Alt_Data', ALT_DATA)
+    mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2,3,4])
+    return mySprSht
+
+class UnseekableWriter(object):
+    """File-like object that can only write (like a socket or WSGI output)"""
+    def __init__(self):
+        self.chunkL = []
+    def write(self, data):
+        self.chunkL.append( bytes(data) )
+        return len(data)
+    def flush(self):
+        pass
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def assertSameMembers(self, zip1, zip2):
+        self.assertEqual( zip1.namelist(), zip2.namelist() )
+        for name in zip1.namelist():
+            if name != 'meta.xml': # holds the save time
+                self.assertEqual( zip1.read(name), zip2.read(name) )
+
+    def test_to_bytes_matches_save(self):
+        """Check that to_bytes gives the same ods as save"""
+        fname = os.path.join(self.tmp_dir, 'alt.ods')
+        make_spreadsheet().save( filename=fname )
+
+        mySprSht = make_spreadsheet()
+        data = mySprSht.to_bytes()
+        self.assertIsNone( mySprSht.filename )
+
+        self.assertSameMembers( zipfile.ZipFile(fname), zipfile.ZipFile(io.BytesIO(data)) )
+
+    def test_save_to_unseekable(self):
+        """Check that save_to can write a stream that can not seek"""
+        writer = UnseekableWriter()
+        make_spreadsheet().save_to( writer )
+
+        data = b"".join( writer.chunkL )
+        self.assertSameMembers( zipfile.ZipFile(io.BytesIO(make_spreadsheet().to_bytes())),
+                                zipfile.ZipFile(io.BytesIO(data)) )
+
+    def test_iter_bytes(self):
+        """Check that iter_bytes yields a big streamed sheet in several chunks"""
+        def gen_rows():
+            yield ['Index', 'Value']
+            yield ['', '']
+            for i in range(20000):
+                yield [i, i*0.123456789]
+
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Data', gen_rows())
+        mySprSht.add_scatter( 'Plot', 'Data', xcol=1, ycolL=[2])
+
+        chunkL = list( mySprSht.iter_bytes() )
+        self.assertGreater( len(chunkL), 2 )
+
+        zipfileobj = zipfile.ZipFile( io.BytesIO(b"".join(chunkL)) )
+        self.assertIsNone( zipfileobj.testzip() )
+        content = zipfileobj.read('content.xml').decode('utf-8')
+        self.assertIn( '<text:p>19999</text:p>', content )
+        chart = zipfileobj.read('Object 1/content.xml').decode('utf-8')
+        self.assertIn( 'Data.$B$3:.$B$20002', chart )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import io
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.xml_set_rep import SetRep
+from odscharts.ods_diff import diff_ods, main
+
+def make_spreadsheet( temp_r=518.7 ):
+    mySprSht = SpreadSheet()
+    mySprSht.add_sheet('Alt_Data', [['Altitude','Pressure','Temp R'],
+                                    ['feet','psia','degR'],
+                                    [1,      14.7, temp_r],
+                                    [5000,  12.23, 500.8],
+                                    [60000,  1.04, 390.0]])
+    mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2,3])
+    return mySprSht
+
+def content_setrep( mySprSht ):
+    odsfile = zipfile.ZipFile( io.BytesIO( mySprSht.to_bytes() ) )
+    return SetRep( odsfile.read('content.xml').decode('utf-8') )
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def save(self, mySprSht, name):
+        fname = os.path.join(self.tmp_dir, name)
+        mySprSht.save( filename=fname )
+        return fname
+
+    def test_find_diff(self):
+        """Check find_diff of equal and of changed content.xml"""
+        setrep1 = content_setrep( make_spreadsheet() )
+        setrep2 = content_setrep( make_spreadsheet() )
+        diff = setrep1.find_diff( setrep2 )
+        self.assertTrue( diff.is_equal )
+        self.assertEqual( diff.total_diff, 0 )
+
+        setrep3 = content_setrep( make_spreadsheet( temp_r=519.0 ) )
+        diff = setrep1.find_diff( setrep3 )
+        self.assertFalse( diff.is_equal )
+        self.assertEqual( (diff.total_nf1, diff.total_nf2), (2, 2) )
+
+        pathL = [short_path.split('/')[-1] for n, i, short_path, elem in diff.iter_differences()]
+        self.assertEqual( pathL, ['table:table-cell','table:table-cell','text:p','text:p'] )
+
+    def test_changes_to_make_equal(self):
+        """Check that a changed cell is a partial match and everything else matches"""
+        setrep1 = content_setrep( make_spreadsheet() )
+        setrep2 = content_setrep( make_spreadsheet( temp_r=519.0 ) )
+        setrep1.find_changes_to_make_equal( setrep2 )
+
+        self.assertEqual( sum(len(L) for L in setrep1.unmatched_elemLL), 0 )
+        self.assertEqual( sum(len(L) for L in setrep1.unmatched_elemLL2), 0 )
+        self.assertEqual( sum(len(L) for L in setrep1.partial_match_elemLL), 2 )
+
+        commandL = setrep1.create_ET_commands_to_make_equal()
+        self.assertTrue( [cmd for cmd in commandL if '519.0' in cmd] )
+
+    def test_inserted_row_scaling(self):
+        """Check that cells moved by an inserted row are matched by hash, not by scoring"""
+        def data_setrep( rowL ):
+            mySprSht = SpreadSheet()
+            mySprSht.add_sheet('Data', [['Time','Value'], ['sec','volt']] + rowL)
+            return content_setrep( mySprSht )
+
+        num_scoredL = []
+        for nrows in (50, 400):
+            rowL = [[i, i*0.5] for i in range(nrows)]
+            setrep1 = data_setrep( rowL )
+            setrep2 = data_setrep( [[-1, -0.5]] + rowL )
+
+            # count the candidates scored by find_best_setrep_match
+            scoredL = []
+            find_best_setrep_match = setrep1.find_best_setrep_match
+            def count_scored( elem, e_sr, candOD ):
+                scoredL.append( len(candOD) )
+                return find_best_setrep_match( elem, e_sr, candOD )
+            setrep1.find_best_setrep_match = count_scored
+
+            setrep1.find_changes_to_make_equal( setrep2 )
+            self.assertEqual( sum(len(L) for L in setrep1.unmatched_elemLL), 0 )
+            # each moved cell is matched to the cell with its value
+            for partialL in setrep1.partial_match_elemLL:
+                for elem, e2 in partialL:
+                    if elem.tag != setrep1.NS('table:table-row'): # the filler row count changes
+                        self.assertEqual( elem.attrib, e2.attrib )
+                        self.assertEqual( elem.text, e2.text )
+            num_scoredL.append( sum(scoredL) )
+
+        # the work of scoring does not grow with the number of moved cells
+        self.assertEqual( num_scoredL[0], num_scoredL[1] )
+
+    def test_ods_diff(self):
+        """Check diff_ods and the command line exit status"""
+        fname1 = self.save( make_spreadsheet(), 'first.ods' )
+        fname2 = self.save( make_spreadsheet(), 'second.ods' )
+        fname3 = self.save( make_spreadsheet( temp_r=519.0 ), 'third.ods' )
+
+        self.assertTrue( diff_ods( fname1, fname2 ).is_equal )
+
+        ods_diff = diff_ods( fname1, fname3 )
+        self.assertEqual( ods_diff.changed_xmlL, ['content.xml'] )
+        self.assertIn( 'table:table-cell', ods_diff.summary() )
+
+        self.assertEqual( main( ['-q', fname1, fname2] ), 0 )
+        self.assertEqual( main( ['-q', fname1, fname3] ), 1 )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
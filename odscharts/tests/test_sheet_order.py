@@ -0,0 +1,85 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import io
+import re
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet, MySheetNameError
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [60000,  1.04, 390.0, 216.6667]]
+
+def saved_sheet_names( mySprSht ):
+    """Return list of table names in content.xml of the saved mySprSht"""
+    odsfile = zipfile.ZipFile( io.BytesIO( mySprSht.to_bytes() ) )
+    content = odsfile.read('content.xml').decode('utf-8')
+    return re.findall( r'<table:table table:name="([^"]*)"', content )
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.mySprSht = SpreadSheet()
+        self.mySprSht.add_sheet('Data_1', ALT_DATA)
+        self.mySprSht.add_scatter( 'Plot_1', 'Data_1', xcol=1, ycolL=[2])
+        self.mySprSht.add_sheet('Data_2', ALT_DATA, stream=True)
+
+    def test_default_order(self):
+        """Check that the newest sheet is first by default"""
+        self.assertEqual( self.mySprSht.get_sheet_order(), ['Data_2', 'Plot_1', 'Data_1'] )
+        self.assertEqual( saved_sheet_names( self.mySprSht ), ['Data_2', 'Plot_1', 'Data_1'] )
+
+    def test_set_sheet_order(self):
+        """Check that set_sheet_order sets the sheet order in content.xml"""
+        self.mySprSht.set_sheet_order( ['Data_1', 'Plot_1'] )
+        self.mySprSht.add_scatter( 'Plot_2', 'Data_2', xcol=1, ycolL=[3])
+
+        orderL = ['Data_1', 'Plot_1', 'Data_2', 'Plot_2']
+        self.assertEqual( self.mySprSht.get_sheet_order(), orderL )
+        self.assertEqual( saved_sheet_names( self.mySprSht ), orderL )
+
+    def test_helper_sheets_last(self):
+        """Check that hidden helper sheets of decimated curves follow all other sheets"""
+        self.mySprSht.add_scatter( 'Plot_2', 'Data_1', xcol=1, ycolL=[2], decimate='lttb', max_points=3 )
+        self.mySprSht.add_scatter( 'Plot_3', 'Data_1', xcol=1, ycolL=[3], decimate='lttb', max_points=3 )
+        self.assertEqual( self.mySprSht.get_sheet_order(),
+                          ['Plot_3', 'Plot_2', 'Data_2', 'Plot_1', 'Data_1', 'Plot_2_decimated', 'Plot_3_decimated'] )
+
+        self.mySprSht.set_sheet_order( ['Data_1', 'Plot_3'] )
+        orderL = ['Data_1', 'Plot_3', 'Plot_1', 'Data_2', 'Plot_2', 'Plot_2_decimated', 'Plot_3_decimated']
+        self.assertEqual( self.mySprSht.get_sheet_order(), orderL )
+        self.assertEqual( saved_sheet_names( self.mySprSht ), orderL )
+
+    def test_bad_sheet_order(self):
+        """Check that unknown and duplicate names raise MySheetNameError"""
+        self.assertRaises( MySheetNameError, self.mySprSht.set_sheet_order, ['Data_1', 'Nope'] )
+        self.assertRaises( MySheetNameError, self.mySprSht.set_sheet_order, ['Data_1', 'Data_1'] )
+
+    def test_manifest_entries(self):
+        """Check that manifest.xml lists each chart object once"""
+        self.mySprSht.add_scatter( 'Plot_2', 'Data_2', xcol=1, ycolL=[3])
+        for _ in range(2):
+            odsfile = zipfile.ZipFile( io.BytesIO( self.mySprSht.to_bytes() ) )
+            manifest = odsfile.read('META-INF/manifest.xml').decode('utf-8')
+            pathL = re.findall( r'manifest:full-path="(Object [^"]*)"', manifest )
+            self.assertEqual( pathL, ['Object 1/', 'Object 2/',
+                                      'Object 1/styles.xml', 'Object 1/content.xml',
+                                      'Object 2/styles.xml', 'Object 2/content.xml'] )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
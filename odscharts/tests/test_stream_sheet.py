@@ -0,0 +1,142 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import shutil
+import tempfile
+import zipfile
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts.spreadsheet import SpreadSheet, zipfile_insert, zipfile_stream_insert
+from odscharts.data_table_desc import StreamConsumedError
+
+ALT_DATA = [['Altitude','Pressure','Temp R','Temp K'],
+            ['feet','psia','degR','degK'],
+            [1,      14.7, 518.7, 288.1667],
+            [5000,  12.23, 500.8, 278.2222],
+            [10000, 10.11, 483.0, 268.3333],
+            [30000,  4.36, 411.8, 228.7778],
+            [60000,  1.04, 390.0, 216.6667]]
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree( self.tmp_dir )
+
+    def test_stream_matches_element_sheet(self):
+        """Check that a streamed sheet serializes exactly like an Element sheet"""
+        list_of_rows = ALT_DATA + [['a&b<c', '', None, True]]
+
+        elemSprSht = SpreadSheet()
+        elemSprSht.add_sheet('Alt & Data', list_of_rows)
+
+        streamSprSht = SpreadSheet()
+        streamSprSht.add_sheet('Alt & Data', list_of_rows, stream=True)
+
+        elemSprSht.assemble_sheets()
+        streamSprSht.assemble_sheets()
+        self.assertEqual( elemSprSht.content_xml_obj.tostring(),
+                          streamSprSht.content_xml_obj.tostring() )
+
+    def test_stream_builds_no_cell_elements(self):
+        """Check that a streamed sheet holds only a placeholder in content.xml"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Alt_Data', ALT_DATA, stream=True)
+
+        dataTableObj = mySprSht.data_table_objD['Alt_Data']
+        self.assertEqual( len(dataTableObj.xmlSheetObj), 0 )
+        self.assertEqual( dataTableObj.nrows, 7 )
+        self.assertEqual( dataTableObj.unitsL, ['feet','psia','degR','degK'] )
+
+    def test_stream_save(self):
+        """Check that save operates cleanly with a streamed sheet"""
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Alt_Data', ALT_DATA, stream=True)
+        mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2,3,4])
+
+        fname = os.path.join(self.tmp_dir, 'alt_stream.ods')
+        mySprSht.save( filename=fname )
+
+        content = zipfile.ZipFile( fname ).read('content.xml').decode('utf-8')
+        self.assertIn( '<table:table table:name="Alt_Data"', content )
+        self.assertIn( '<text:p>518.7</text:p>', content )
+        self.assertNotIn( '<!--', content )
+
+    def test_generator_rows(self):
+        """Check that a generator of rows is read lazily and sets nrows at save"""
+        def gen_rows():
+            for row in ALT_DATA:
+                yield row
+
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Alt_Data', gen_rows())
+        mySprSht.add_scatter( 'Alt_Plot', 'Alt_Data', xcol=1, ycolL=[2,3])
+
+        dataTableObj = mySprSht.data_table_objD['Alt_Data']
+        self.assertTrue( dataTableObj.stream )
+        self.assertIsNone( dataTableObj.nrows )
+        self.assertEqual( dataTableObj.unitsL, ['feet','psia','degR','degK'] )
+
+        fname = os.path.join(self.tmp_dir, 'alt_gen.ods')
+        mySprSht.save( filename=fname )
+        self.assertEqual( dataTableObj.nrows, 7 )
+
+        chart = zipfile.ZipFile( fname ).read('Object 1/content.xml').decode('utf-8')
+        self.assertIn( 'Alt_Data.$B$3:.$B$7', chart )
+        self.assertIn( 'Alt_Data.$C$3:.$C$7', chart )
+
+        # an unchanged content.xml is copied from the last save
+        mySprSht.save( filename=os.path.join(self.tmp_dir, 'alt_gen2.ods') )
+
+        # the generator can only be used once
+        mySprSht.add_sheet('More_Data', ALT_DATA)
+        self.assertRaises( StreamConsumedError, mySprSht.save,
+                           filename=os.path.join(self.tmp_dir, 'alt_gen3.ods') )
+
+    def test_csv_reader_rows(self):
+        """Check that a csv.reader can be used as rows"""
+        import csv
+        lineL = [','.join(['%s'%v for v in row]) for row in ALT_DATA]
+
+        mySprSht = SpreadSheet()
+        mySprSht.add_sheet('Alt_Data', csv.reader( lineL ))
+        mySprSht.save( filename=os.path.join(self.tmp_dir, 'alt_csv.ods') )
+
+        dataTableObj = mySprSht.data_table_objD['Alt_Data']
+        self.assertEqual( dataTableObj.nrows, 7 )
+        self.assertEqual( dataTableObj.ncols, 4 )
+
+    def test_zip_stream_matches_writestr(self):
+        """Check that writing a zip member in chunks gives the same zip file"""
+        chunkL = ['<a>%i &amp; \u00b0F</a>'%i for i in range(20000)]
+        date_time = (2015, 1, 1, 0, 0, 0)
+
+        fname1 = os.path.join(self.tmp_dir, 'whole.zip')
+        zipfileobj = zipfile.ZipFile(fname1, "w")
+        zipfile_insert( zipfileobj, 'content.xml', "".join(chunkL), date_time=date_time)
+        zipfileobj.close()
+
+        fname2 = os.path.join(self.tmp_dir, 'chunks.zip')
+        zipfileobj = zipfile.ZipFile(fname2, "w")
+        zipfile_stream_insert( zipfileobj, 'content.xml', iter(chunkL), date_time=date_time)
+        zipfileobj.close()
+
+        with open(fname1, 'rb') as f1, open(fname2, 'rb') as f2:
+            self.assertEqual( f1.read(), f2.read() )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+import odscharts.spreadsheet as spreadsheet
+from odscharts.spreadsheet import load_template_xml_from_ods, clear_template_cache
+
+class MyTest(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        clear_template_cache()
+
+    def test_template_parsed_once(self):
+        """Check that a template is only parsed once per process"""
+        obj1 = load_template_xml_from_ods('alt_chart.ods', 'content.xml', subdir='Object 1')
+        self.assertEqual( len(spreadsheet._template_cacheD), 1 )
+
+        obj2 = load_template_xml_from_ods('alt_chart.ods', 'content.xml', subdir='Object 1')
+        self.assertEqual( len(spreadsheet._template_cacheD), 1 )
+
+        self.assertEqual( obj1.tostring(), obj2.tostring() )
+
+    def test_template_copies_are_independent(self):
+        """Check that changes to one loaded template do not affect the next"""
+        obj1 = load_template_xml_from_ods('alt_chart.ods', 'content.xml')
+        original_xml = obj1.tostring()
+
+        spreadsheet_obj = obj1.find('office:body/office:spreadsheet')
+        for table in obj1.findall('table:table', spreadsheet_obj):
+            obj1.remove_child( table, spreadsheet_obj )
+        self.assertNotEqual( obj1.tostring(), original_xml )
+
+        obj2 = load_template_xml_from_ods('alt_chart.ods', 'content.xml')
+        self.assertEqual( obj2.tostring(), original_xml )
+        self.assertIs( obj2.getparent( obj2.find('office:body') ), obj2.getroot() )
+
+    def test_clone_remaps_indexes(self):
+        """Check that a clone has its own tree with matching indexes"""
+        obj = load_template_xml_from_ods('alt_chart.ods', 'content.xml', subdir='Object 1')
+        obj.build_indexes()
+        new_obj = obj.clone()
+        self.assertTrue( new_obj.indexes_built )
+
+        self.assertEqual( obj.tostring(), new_obj.tostring() )
+        self.assertEqual( new_obj.max_depth, obj.max_depth )
+
+        for elem, new_elem in zip( obj.root.iter(), new_obj.root.iter() ):
+            self.assertIsNot( elem, new_elem )
+            self.assertEqual( new_obj.short_pathD[new_elem], obj.short_pathD[elem] )
+            self.assertEqual( new_obj.short_pathD[new_elem], new_obj.get_short_path(new_elem) )
+            self.assertEqual( new_obj.depthD[new_elem], obj.depthD[elem] )
+            pos = obj.get_elements_orig_pos( elem )
+            self.assertIs( new_obj.get_elem_at_original_pos(pos), new_elem )
+
+            parent = new_obj.getparent( new_elem )
+            if parent is not None:
+                self.assertIn( new_elem, list(parent) )
+
+    def test_indexes_are_lazy(self):
+        """Check that bookkeeping indexes are only built when first used"""
+        obj = load_template_xml_from_ods('alt_chart.ods', 'content.xml', subdir='Object 1')
+        self.assertFalse( obj.indexes_built )
+
+        new_obj = obj.clone()
+        self.assertFalse( new_obj.indexes_built )
+        new_obj.tostring()
+        self.assertFalse( new_obj.indexes_built )
+
+        elem = new_obj.find('office:body')
+        self.assertEqual( new_obj.short_pathD[elem], 'office:document-content/office:body' )
+        self.assertTrue( new_obj.indexes_built )
+        self.assertEqual( new_obj.depthD[elem], 1 )
+        self.assertIs( new_obj.get_elem_at_original_pos( new_obj.get_elements_orig_pos(elem) ), elem )
+        self.assertFalse( obj.indexes_built )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+# import unittest2 as unittest # for versions of python < 2.7
+
+import sys, os
+import subprocess
+
+here = os.path.abspath(os.path.dirname(__file__)) # Needed for py.test
+up_one = os.path.split( here )[0]  # Needed to find odscharts development version
+if here not in sys.path[:2]:
+    sys.path.insert(0, here)
+if up_one not in sys.path[:2]:
+    sys.path.insert(0, up_one)
+
+from odscharts import xml_backend
+from odscharts.xml_backend import load_backend, get_available_backends, ENV_VAR_NAME
+
+# saves a small workbook and prints the md5 of each member
+SAVE_SCRIPT = '''
+import io, zipfile, hashlib
+from odscharts.spreadsheet import SpreadSheet
+from odscharts.xml_backend import BACKEND_NAME
+mySprSht = SpreadSheet()
+mySprSht.add_sheet( 'Data', [['X','Y','Z'], ['s','m','m']] + [[i, i*2.5, -i] for i in range(20)] )
+mySprSht.add_scatter( 'Plot', 'Data', ycolL=[2], ycol2L=[3], logx=True, title='Backend & <check>' )
+fOut = io.BytesIO()
+mySprSht.save_to( fOut )
+zf = zipfile.ZipFile( fOut )
+print( BACKEND_NAME )
+for name in zf.namelist():
+    if name != 'meta.xml':
+        print( name, hashlib.md5( zf.read(name) ).hexdigest() )
+'''
+
+def save_with_backend( name ):
+    env = dict( os.environ )
+    env[ENV_VAR_NAME] = name
+    env['PYTHONPATH'] = os.pathsep.join( [up_one] + [p for p in [env.get('PYTHONPATH')] if p] )
+    out = subprocess.check_output( [sys.executable, '-c', SAVE_SCRIPT], env=env )
+    return out.decode('utf-8').splitlines()
+
+class MyTest(unittest.TestCase):
+
+    def test_default(self):
+        """Check that the standard library ElementTree is the default on python 3.7+"""
+        if sys.version_info >= (3, 7):
+            import xml.etree.ElementTree as std_ET
+            self.assertIs( load_backend('c'), std_ET )
+        self.assertIs( xml_backend.ET, load_backend( xml_backend.BACKEND_NAME ) )
+        self.assertIn( 'fork', get_available_backends() )
+        self.assertRaises( ValueError, load_backend, 'expat' )
+
+    def test_same_output(self):
+        """Check that every available backend saves the same bytes"""
+        linesD = dict( (name, save_with_backend( name )) for name in get_available_backends() )
+        fork_lineL = linesD.pop( 'fork' )
+        self.assertEqual( fork_lineL[0], 'fork' )
+        for name, lineL in linesD.items():
+            self.assertEqual( lineL[0], name )
+            self.assertEqual( lineL[1:], fork_lineL[1:] )
+
+
+if __name__ == '__main__':
+    # Can test just this file from command prompt
+    #  or it can be part of test discovery from nose, unittest, pytest, etc.
+    unittest.main()
@@ -0,0 +1,131 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Choose the ElementTree implementation that parses the templates and builds Elements.
+
+Backends::
+    * c: the standard library xml.etree.ElementTree (uses the C accelerator _elementtree)
+    * lxml: lxml.etree (only if lxml is installed)
+    * fork: the pure python copies ElementTree_34OD/ElementTree_27OD that keep
+      attribute order with OrderedDict
+
+Since python 3.7, dict keeps insertion order, so the standard library keeps
+attribute order without the fork. The default is "c" on python 3.7+ and "fork"
+otherwise. Set the environment variable ODSCHARTS_XML_BACKEND to choose another
+backend before odscharts is imported.
+
+Every backend is written by the same serializer (template_xml_file.iter_serialize_xml),
+so all of them save the same bytes. On python 3 the fork already imports Element
+and XMLParser from _elementtree, so "c" and "fork" run at the same speed. lxml is
+slower because the serializer walks its Elements in python
+(see benchmarks/bench_xml_backend.py).
+
+Usage::
+
+    from odscharts.xml_backend import ET, escape_cdata, escape_attrib
+"""
+
+import os
+import io
+import sys
+
+XML_BACKEND_L = ['c', 'lxml', 'fork']
+
+ENV_VAR_NAME = 'ODSCHARTS_XML_BACKEND'
+
+_lxml_ETL = [] # holds the one LxmlET made by load_backend
+
+
+class LxmlET(object):
+    """
+    The parts of the ElementTree module used by ODSCharts, taken from lxml.etree.
+    The escape functions and QName come from the standard library (used only by the serializer).
+    """
+
+    def __init__(self):
+        from lxml import etree
+        import xml.etree.ElementTree as std_ET
+
+        self.etree = etree
+        self.Element = etree.Element
+        self.SubElement = etree.SubElement
+        self.Comment = etree.Comment
+        self.ProcessingInstruction = etree.ProcessingInstruction
+        self.QName = std_ET.QName
+        self._escape_cdata = std_ET._escape_cdata
+        self._escape_attrib = std_ET._escape_attrib
+
+    def iterparse(self, source, events=None):
+        """lxml only reads bytes, so text sources are encoded first."""
+        if isinstance(source, io.TextIOBase):
+            source = io.BytesIO( source.read().encode('utf-8') )
+        return self.etree.iterparse( source, events=events )
+
+
+def get_default_backend():
+    """Return name of the backend to use if ODSCHARTS_XML_BACKEND is not set."""
+    if sys.version_info >= (3, 7):
+        return 'c'
+    return 'fork'
+
+
+def is_available( name ):
+    """Return True if backend name can be loaded."""
+    try:
+        load_backend( name )
+        return True
+    except ImportError:
+        return False
+
+
+def get_available_backends():
+    """Return list of the backends in XML_BACKEND_L that can be loaded."""
+    return [name for name in XML_BACKEND_L if is_available( name )]
+
+
+def load_backend( name ):
+    """
+    Return the ElementTree module (or work-alike) of backend name.
+
+    Raise ValueError if name is not in XML_BACKEND_L and ImportError if it is not installed.
+    """
+    if name == 'fork':
+        if sys.version_info < (3,):
+            import odscharts.ElementTree_27OD as fork_ET
+        else:
+            import odscharts.ElementTree_34OD as fork_ET
+        return fork_ET
+
+    if name == 'c':
+        if sys.version_info < (3, 7):
+            raise ImportError('The "c" xml backend needs python 3.7+ (to keep attribute order)')
+        import xml.etree.ElementTree as std_ET
+        return std_ET
+
+    if name == 'lxml':
+        if not _lxml_ETL:
+            _lxml_ETL.append( LxmlET() )
+        return _lxml_ETL[0]
+
+    raise ValueError('xml backend must be one of %s, not "%s"'%(XML_BACKEND_L, name))
+
+
+BACKEND_NAME = os.environ.get( ENV_VAR_NAME, '' ) or get_default_backend()
+ET = load_backend( BACKEND_NAME )
+
+
+# The serializers build text, so the escape functions must return text.
+# On python 2 they take an encoding and return bytes.
+if sys.version_info < (3,):
+    def escape_cdata( text ):
+        """Return text escaped for xml character data."""
+        return ET._escape_cdata( text, 'utf-8' ).decode( 'utf-8' )
+
+    def escape_attrib( text ):
+        """Return text escaped for an xml attribute value."""
+        return ET._escape_attrib( text, 'utf-8' ).decode( 'utf-8' )
+else:
+    escape_cdata = ET._escape_cdata
+    escape_attrib = ET._escape_attrib
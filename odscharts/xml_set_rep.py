@@ -6,7 +6,7 @@ from __future__ import print_function
 """
 Represents an xml file as a tree of set objects
 """
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from odscharts.template_xml_file import TemplateXML_File
 from copy import copy, deepcopy
 
@@ -35,6 +35,16 @@ def get_set_member( setrep, startswith='COUNT' ):
             returnL.append( s )
     return returnL
 
+def get_path_and_parent( setrep ):
+    """Return the PATH and PARENT members of setrep"""
+    path = parent = None
+    for s in setrep:
+        if s.startswith( 'PATH|' ):
+            path = s
+        elif s.startswith( 'PARENT|' ):
+            parent = s
+    return path, parent
+
 def strip_short_path( short_path, num_beg=0, num_end=0):
     """
     Strip number of positions from short_path as indicated by num_beg and num_end
@@ -45,6 +55,68 @@ def strip_short_path( short_path, num_beg=0, num_end=0):
     
     
 
+class SetRepDiff(object):
+    """
+    The result of SetRep.find_diff.
+
+    Holds, for each depth of the xml tree, the Element objects whose set
+    representation is not found at the same depth of the other tree.
+    """
+
+    def __init__(self, setrep1, setrep2):
+        self.setrep1 = setrep1
+        self.setrep2 = setrep2
+
+        self.root_equal = setrep1.e_setrepOD[setrep1.root] == setrep2.e_setrepOD[setrep2.root]
+        self.max_depth1 = setrep1.max_depth
+        self.max_depth2 = setrep2.max_depth
+
+        self.not_found_in1LL = []  # List of Lists, 1st index is depth, gives list of Element objects
+        self.not_found_in2LL = []  #   in setrep1 (or setrep2) not found in the other at that depth
+
+    @property
+    def total_nf1(self):
+        return sum( len(nfL1) for nfL1 in self.not_found_in1LL )
+
+    @property
+    def total_nf2(self):
+        return sum( len(nfL2) for nfL2 in self.not_found_in2LL )
+
+    @property
+    def total_diff(self):
+        return self.total_nf1 + self.total_nf2
+
+    @property
+    def is_equal(self):
+        return self.max_depth1 == self.max_depth2 and self.total_diff == 0
+
+    def iter_differences(self):
+        """Yield (depth, 1 or 2, short path, Element) for each Element not found in the other tree"""
+        for n, (nfL1, nfL2) in enumerate( zip(self.not_found_in1LL, self.not_found_in2LL) ):
+            for elem in nfL1:
+                yield n, 1, self.setrep1.short_pathD[elem], elem
+            for e2 in nfL2:
+                yield n, 2, self.setrep2.short_pathD[e2], e2
+
+    def summary(self, max_paths=10):
+        """Return a text report of the differences (at most max_paths paths per depth)"""
+        sL = []
+        if self.max_depth1 != self.max_depth2:
+            sL.append( 'WARNING... Different Depths: 1=%i,  2=%i'%(self.max_depth1, self.max_depth2) )
+
+        for n, (nfL1, nfL2) in enumerate( zip(self.not_found_in1LL, self.not_found_in2LL) ):
+            if nfL1 or nfL2:
+                sL.append( 'at depth=%i, not found 1=%i, not found 2=%i'%(n, len(nfL1), len(nfL2)) )
+                for i, nfL, setrep in ((1, nfL1, self.setrep1), (2, nfL2, self.setrep2)):
+                    for elem in nfL[:max_paths]:
+                        sL.append( '    %i: %s'%(i, setrep.short_pathD[elem]) )
+                    if len(nfL) > max_paths:
+                        sL.append( '    %i: ... %i more'%(i, len(nfL) - max_paths) )
+
+        sL.append( 'Not Found 1 = %i, Not Found 2 = %i'%(self.total_nf1, self.total_nf2) )
+        return '\n'.join( sL )
+
+
 class SetRep( TemplateXML_File ):
     
     def __init__(self, xml_file_name_or_src ):
@@ -60,7 +132,7 @@ class SetRep( TemplateXML_File ):
         
         TemplateXML_File.__init__(self, xml_file_name_or_src)
         
-        self.e_setrepOD = OrderedDict()  # index=Element object, value=set representation
+        self.e_setrepOD = OrderedDict()  # index=Element object, value=frozenset representation
         self.elem_from_idD = {} # index=id(e_setrep), value=Element object from which it's made
         
         # The lists within depth_elemD maintain the order from original file
@@ -68,101 +140,78 @@ class SetRep( TemplateXML_File ):
         for n in range(self.max_depth +1):
             self.depth_elemD[n] = [] # init the depth lists
         
+        # built by get_depth_index when first needed
+        self.depth_indexD = {} # index=n depth, value=dict (index=e_setrep, value=list of Element objects)
+        
+        short_pathD = self.short_pathD
+        short_path_parent_counterD = self.short_path_parent_counterD
+        qnameOD = self.qnameOD
+        
         def build_elem_setrep( elem ):
-            descL = [ "PATH|"+self.short_pathD[elem] ]
+            descL = [ "PATH|"+short_pathD[elem] ]
             
             # COUNT is only used to help put nodes in correct tree limb
             #descL.append(  'COUNT|'+'%s'%self.short_path_counterD[elem] )
-            descL.append(  'PARENT|'+'%s'%self.short_path_parent_counterD[elem] )
+            descL.append(  'PARENT|'+'%s'%short_path_parent_counterD[elem] )
             
             descL.append( 'TEXT|'+'%s'%elem.text )
             descL.append( 'TAIL|'+'%s'%elem.tail )
             
             for qname,v in elem.attrib.items():
-                short_name = self.qnameOD[qname]
-                descL.append( 'ATTR|'+short_name+'|'+v )
+                descL.append( 'ATTR|'+qnameOD[qname]+'|'+v )
             
-            for child in elem.getchildren():
-                descL.append( 'CHILD|'+self.short_pathD[child] )
+            for child in elem:
+                descL.append( 'CHILD|'+short_pathD[child] )
             
-            s = set( descL )
+            # frozenset is hashable, so equal set representations can be found by dict lookup
+            s = frozenset( descL )
             self.elem_from_idD[ id(s) ] = elem # use python object id of set to get Element
             return s
 
         self.e_setrepOD[self.root] = build_elem_setrep( self.root )
         self.depth_elemD[0].append( self.root )
         
+        depthD = self.depthD
         for parent in self.root.iter():
-            for child in parent.getchildren():
+            for child in parent:
                 self.e_setrepOD[child] = build_elem_setrep( child )
-                self.depth_elemD[ self.depthD[child] ].append( child )
+                self.depth_elemD[ depthD[child] ].append( child )
 
-    
+    def get_depth_elemL(self, n):
+        """Return list of Element objects at depth n (empty list if tree is not that deep)"""
+        return self.depth_elemD.get(n, [])
+
+    def get_depth_index(self, n):
+        """
+        Return dict of the set representations at depth n.
+        index=e_setrep, value=list of Element objects with that e_setrep (in file order)
+        """
+        if n not in self.depth_indexD:
+            indexD = {}
+            for elem in self.get_depth_elemL(n):
+                indexD.setdefault( self.e_setrepOD[elem], [] ).append( elem )
+            self.depth_indexD[n] = indexD
+        return self.depth_indexD[n]
 
     def find_diff(self, setrep2):
-        """Find the differences between SetRep objects self and setrep2"""
-        
-        print( self.e_setrepOD[self.root] == setrep2.e_setrepOD[setrep2.root], self.short_pathD[self.root])
+        """
+        Find the differences between SetRep objects self and setrep2
         
-        if self.max_depth == setrep2.max_depth:
-            print( 'Both SetRep Objects have the Same Depth')
-        else:
-            print( 'WARNING... Different Depths: self=%i,  setrep2=%i'%(self.max_depth, setrep2.max_depth))
-
-        not_found_in1LL = []  # List of Lists, 1st index is depth, gives list of not found
-        not_found_in2LL = []  #   at that depth
-        total_nf1 = 0
-        total_nf2 = 0
+        Returns a SetRepDiff object (see SetRepDiff.summary for a printable report)
+        """
+        diff = SetRepDiff( self, setrep2 )
 
-        for n in range(self.max_depth +1):
-            nfL1 = [] # list of not-found at this depth
-            nfL2 = [] # list of not-found at this depth
-            
-            
-            print()
-            print( '='*20,'Depth =%i'%n,'='*20)
-            try:
-                eL1 = self.depth_elemD[n]
-                eL2 = setrep2.depth_elemD[n]
-            except:
-                break
+        for n in range( max(self.max_depth, setrep2.max_depth) +1 ):
+            index1 = self.get_depth_index( n )
+            index2 = setrep2.get_depth_index( n )
             
-            e_srL1 = [self.e_setrepOD[e] for e in eL1]
-            e_srL2 = [setrep2.e_setrepOD[e] for e in eL2]
-            
-            # Look for non-found elements in self
-            for i1,e_sr1 in enumerate(e_srL1):
-                if e_sr1 in e_srL2:
-                    print( '.', end='')
-                else:
-                    print( '?', end='')
-                    #print( 'NOT FOUND',eL1[i1])
-                    nfL1.append( eL1[i1] )
-                    total_nf1 += 1
-            print()
-            # Look for non-found elements in setrep2
-            for i2,e_sr2 in enumerate(e_srL2):
-                if e_sr2 in e_srL1:
-                    print( '.', end='')
-                else:
-                    print( '?', end='')
-                    #print( '2 NOT FOUND',eL2[i2])
-                    nfL2.append( eL2[i2] )
-                    total_nf2 += 1
-                    
-            not_found_in1LL.append(nfL1)
-            not_found_in2LL.append(nfL2)
-            
-            if nfL1 or nfL2:
-                print()
-                print( 'at depth=%i, not found 1=%i, not found 2=%i, #element diff=%i'%\
-                       (n, len(nfL1), len(nfL2), len(e_srL1)-len(e_srL2)) )
-        
-        print()
-        print( '='*20,'Not Found 1 = %i'%total_nf1,'='*5,'Not Found 2 = %i'%total_nf2,'='*20)
+            # Look for non-found elements in self and then in setrep2
+            diff.not_found_in1LL.append( [e for e in self.get_depth_elemL(n) 
+                                          if self.e_setrepOD[e] not in index2] )
+            diff.not_found_in2LL.append( [e2 for e2 in setrep2.get_depth_elemL(n) 
+                                          if setrep2.e_setrepOD[e2] not in index1] )
         
-        total_diff = total_nf1 + total_nf2
-        return total_diff
+        return diff
         
 
     def find_changes_to_make_equal(self, setrep2):
@@ -194,109 +243,108 @@ class SetRep( TemplateXML_File ):
         
         # partial match holds tuples of (elem, elem2)
         self.partial_match_elemLL = [] # list of lists by depth of partially matching Element Objects
-        
-        #multi_match_elemLL = [] # list of lists of multiple matches
 
         for n in range(self.max_depth +1): # iterate over depth values
-            print( '='*40 + '> Working Depth = %i'%n)
             elemL = self.depth_elemD[n]
 
             self.match_elemLL.append( [] )
             self.unmatched_elemLL.append( [] )
             self.unmatched_elemLL2.append( [] )
             self.partial_match_elemLL.append( [] )
-            #multi_match_elemLL.append( [] )
 
-            try:
-                eL2  = setrep2.depth_elemD[n]
-            except:
-                break
-                
-            e_srL2 = [setrep2.e_setrepOD[e2] for e2 in eL2] # build list of SetRep objects in setrep2 at depth
+            eL2 = setrep2.get_depth_elemL(n)
             for e2 in eL2:
                 self.rev_matching_elemD[e2] = None # init to None
             
+            # copy of the lists in the setrep2 index, matched Element objects are taken from the front
+            availD = dict( (e_sr2, deque(e2L)) for e_sr2, e2L in setrep2.get_depth_index(n).items() )
+            
             for elem in elemL:
                 self.matching_elemD[elem] = None # initialize to None (perhaps reset later)
                 e_sr = self.e_setrepOD[elem]
                 
-                # Count the number of EXACT MATCHES for Element self setreps in setrep2
-                match_count = e_srL2.count( e_sr )
                 # These are complete and TOTAL matches at EVERY location
-                if match_count == 0:
-                    self.unmatched_elemLL[-1].append( (elem, e_sr) )
-                elif match_count >= 1: # look for first match
-                    i2 = e_srL2.index( e_sr )
-                    e_sr2 = e_srL2[i2]
-                    e_srL2.pop(i2)  # remove the matched Element from e_srL2
-                    
-                    e2 = setrep2.elem_from_idD[ id(e_sr2) ]
+                e2Q = availD.get( e_sr )
+                if e2Q:
+                    e2 = e2Q.popleft() # first remaining match in setrep2
                     self.matching_elemD[elem] = e2
                     self.rev_matching_elemD[e2] = elem
                     self.match_elemLL[-1].append( (elem, e2) )
-                #else:
-                #    multi_match_elemLL[-1].append( (elem, e_sr) )
+                else:
+                    self.unmatched_elemLL[-1].append( (elem, e_sr) )
             
             # =========== Now look at partial matches =====================
             # With complete and total matches handled, now look for partial matches
             #   (PATH must match)
-            # Find best match for members of unmatched_elemLL (at this depth)
-            if e_srL2:
-                attr_sL2 = make_attr_sets_from_setrepL( e_srL2 )
-                
-                unLL = copy( self.unmatched_elemLL[-1] )
-                for elem, e_sr in unLL:
-                    i2 = self.find_best_setrep_match( elem, e_sr, e_srL2, attr_sL2 )
-                    if i2>=0:
-                        e_sr2 = e_srL2.pop(i2) # removes e_sr2 from from list of sets of elements
-                        attr_sL2.pop(i2) # throw away attr set at i2
-                        
-                        e2 = setrep2.elem_from_idD[ id(e_sr2) ]
-                        
-                        self.partial_match_elemLL[-1].append( (elem, e2) )
-                        print( 'Found best partial match', e2)
-                        print( '     ',get_set_member( e_sr, startswith='PARENT' ),get_set_member( e_sr2, startswith='PARENT' ))
-                        
-                        # While not a perfect match, it is a partial match
-                        self.unmatched_elemLL[-1].remove( (elem, e_sr) )
-                
-            # save the unmatched elements from setrep2
-            e2L = [setrep2.elem_from_idD[ id(e_sr2) ] for e_sr2  in e_srL2]
-            self.unmatched_elemLL2[-1].extend( e2L )
+            # Candidates are grouped by PATH and by PATH+PARENT, so each unmatched
+            # Element is only scored against candidates that can match it.
+            pathD = {} # index=PATH member, value=OrderedDict(index=e2, value=e_sr2)
+            parentD = {} # index=(PATH member, PARENT member), value=OrderedDict(index=e2, value=e_sr2)
+            # An Element that only moved to another parent (e.g. every cell below an
+            # inserted row) equals its match except for PARENT, so it is found by hash.
+            movedD = {} # index=e_sr2 without PARENT member, value=deque of e2 (in file order)
+            for e2 in eL2:
+                if self.rev_matching_elemD[e2] is None:
+                    e_sr2 = setrep2.e_setrepOD[e2]
+                    path, parent = get_path_and_parent( e_sr2 )
+                    pathD.setdefault( path, OrderedDict() )[e2] = e_sr2
+                    parentD.setdefault( (path, parent), OrderedDict() )[e2] = e_sr2
+                    movedD.setdefault( e_sr2.difference( [parent] ), deque() ).append( e2 )
             
-            #for elem, e_sr in self.unmatched_elemLL[-1]:
-            #    print( '    UN:',elem)
-            #for e_sr2 in e_srL2:
-            #    e2 = setrep2.elem_from_idD[ id(e_sr2) ]
-            #    print( '   UN2:',elem)
+            def set_partial_match( elem, e2, path ):
+                e_sr2 = pathD[path].pop( e2 )
+                parentD[ (path, get_path_and_parent( e_sr2 )[1]) ].pop( e2 )
+                self.rev_matching_elemD[e2] = elem
                 
-            #print( '%2i) unmatch=%2i,  multi=%2i'%(n, len(self.unmatched_elemLL[-1]), len(multi_match_elemLL[-1])))
-            
+                # While not a perfect match, it is a partial match
+                self.partial_match_elemLL[-1].append( (elem, e2) )
             
-            print( '%2i) delete=%2i copy=%2i modify=%2i, exact=%2i'%(n, 
-                    len(self.unmatched_elemLL[-1]), 
-                    len(self.unmatched_elemLL2[-1]), 
-                    len(self.partial_match_elemLL[-1]), 
-                    len(self.match_elemLL[-1]) ) )
+            scoreL = [] # (elem, e_sr) not found by hash
+            for elem, e_sr in self.unmatched_elemLL[-1]:
+                path, parent = get_path_and_parent( e_sr )
+                e2Q = movedD.get( e_sr.difference( [parent] ) )
+                if e2Q:
+                    set_partial_match( elem, e2Q.popleft(), path )
+                else:
+                    scoreL.append( (elem, e_sr) )
             
-            if self.unmatched_elemLL[-1]:
-                print( '==>Delete These Element objects from self')
-                for elem, e_sr in self.unmatched_elemLL[-1]:
-                    print( '.....',elem)
-                    print( '.......',e_sr)  #self.short_pathD[elem]
-                    
-            if self.unmatched_elemLL2[-1]:
-                print( '==>Copy these Elements from setrep2')
-                for e2, e_sr2 in zip( e2L, e_srL2 ):
-                    print( '.....',e2)
-                    print( '.......',e_sr2) #setrep2.short_pathD[e2]
+            # only the candidates left over are scored
+            unL = []
+            for elem, e_sr in scoreL:
+                path, parent = get_path_and_parent( e_sr )
+                
+                # prefer candidates under the same parent, then any with the same PATH
+                e2 = None
+                for candOD in (parentD.get( (path, parent) ), pathD.get( path )):
+                    if candOD:
+                        e2 = self.find_best_setrep_match( elem, e_sr, candOD )
+                        break
+                
+                if e2 is None:
+                    unL.append( (elem, e_sr) )
+                else:
+                    set_partial_match( elem, e2, path )
+            self.unmatched_elemLL[-1] = unL
+                
+            # save the unmatched elements from setrep2
+            self.unmatched_elemLL2[-1].extend( [e2 for e2 in eL2 if self.rev_matching_elemD[e2] is None] )
+        
+        return self.get_changes_summary()
 
-                    
-            if self.partial_match_elemLL[-1]:
-                print( '==>Modify these elements in self to match setrep2')
-                for e, e2 in self.partial_match_elemLL[-1]:
-                    print( '...1...',self.short_pathD[e])
-                    print( '....2..',setrep2.short_pathD[e2])
+    def get_changes_summary(self):
+        """
+        Assume that "find_changes_to_make_equal" has already been called.
+        
+        Return a text report of the number of deletes, copies, modifies and exact matches at each depth.
+        """
+        sL = []
+        for n in range( len(self.match_elemLL) ):
+            sL.append( '%2i) delete=%2i copy=%2i modify=%2i, exact=%2i'%(n, 
+                    len(self.unmatched_elemLL[n]), 
+                    len(self.unmatched_elemLL2[n]), 
+                    len(self.partial_match_elemLL[n]), 
+                    len(self.match_elemLL[n]) ) )
+        return '\n'.join( sL )
 
     def get_attrib_assignment_commands(self, elem, e2):
         """
@@ -404,35 +452,21 @@ class SetRep( TemplateXML_File ):
         Assume that "find_changes_to_make_equal" has already been called.
         
         Now create ET commands that will create setrep2 from self.
+        Returns the list of command lines.
         """
-        print( '^'*77)
-        print( 'v'*77)
-        
         commandL = [] # list of commands that will make self equal to setrep2
         
         # 1) Unchanged Element objects in match_elemLL are left alone.
         # 2) Modify Elements in partial_match_elemLL
-        
-        for n in range(self.max_depth +1): # iterate over depth values
-            if self.partial_match_elemLL[n]:
-                print( len(self.partial_match_elemLL[n]),'Modifications self at depth =',n)
-            else:
-                print( 'No Modifications of self at depth =',n)
-                
-            for elem, e2 in self.partial_match_elemLL[n]:
+        for partialL in self.partial_match_elemLL:
+            for elem, e2 in partialL:
                 commandL.extend( self.get_attrib_assignment_commands(elem, e2) )
                 
         # 3) Copy Elements from setrep2 that are in unmatched_elemLL2
-        
         self.e2_object_nameD = {} # index=e2, value=name used for create command
         
-        for n in range(self.max_depth +1): # iterate over depth values
-            if self.unmatched_elemLL2[n]:
-                print( len(self.unmatched_elemLL2[n]),'Copies of e2 at depth =',n)
-            else:
-                print( 'No Copying of e2 at depth =',n)
-                
-            for e2 in self.unmatched_elemLL2[n]:
+        for e2L in self.unmatched_elemLL2:
+            for e2 in e2L:
                 commandL.extend( self.get_e2_copy_commands(e2) )
         
         # 4) Delete Any remaining self Elements in unmatched_elemLL
@@ -443,52 +477,40 @@ class SetRep( TemplateXML_File ):
                 for elem, e_sr in L:
                     commandL.extend( self.get_remove_command(elem) )
 
-        
-        print( '\n'.join(commandL))
-        
-        
+        return commandL
 
-    def find_best_setrep_match(self, elem, e_sr, e_srL2, attr_sL2 ):
+    def find_best_setrep_match(self, elem, e_sr, candOD ):
         """
-        Find the index of the first, best match of element setrep in the list.
-        Calc a score for each member of list, e_srL.
-        If all scores are zero, return -1 as index of best match.
+        Find the first, best match of element setrep in candOD.
+        candOD is an OrderedDict of candidates with the same PATH as elem (index=e2, value=e_sr2).
+        Calc a score for each candidate.
+        If all scores are zero, return None as best match.
         """
         attr_s = make_attr_sets_from_setrepL( [e_sr] )[0]
+        parent = get_set_member( e_sr, startswith='PARENT' )
         
-        path = "PATH|"+self.short_pathD[elem]
-        scoreL = []
+        best_e2 = None
         max_score = 0
-        for e_sr2, attr_s2 in zip(e_srL2, attr_sL2):
-            if path in e_sr2:
-                score = 0
-                
-                big_set = e_sr | e_sr2
-                size_big_set = float( len(big_set) ) + 1.0 # make sure no divide by zero
-                score += len( e_sr & e_sr2 ) / size_big_set
-                
-                big_set = attr_s | attr_s2
-                size_big_set = float( len(big_set) ) + 1.0 # make sure no divide by zero
-                score += len( attr_s & attr_s2 ) / size_big_set
-                #print( 'ATTR Score =',len( attr_s & attr_s2 ) / size_big_set)
-                
-                if get_set_member( e_sr, startswith='PARENT' ) == get_set_member( e_sr, startswith='PARENT' ):
-                    score += 1.0
-                
-                scoreL.append( score )
-                max_score = max(max_score, score)
-            else:
-                scoreL.append( 0 )
-                #print( 'PATH MISMATCH')
-                #print( path)
-        
-        #print( path,scoreL.index( max_score ), scoreL)
-        
-        if e_srL2 and max_score>0:
-            i = scoreL.index( max_score ) # index in e_srL2 of best match to elem
-            return i
-        else:
-            return -1
+        for e2, e_sr2 in candOD.items():
+            attr_s2 = make_attr_sets_from_setrepL( [e_sr2] )[0]
+            score = 0
+            
+            big_set = e_sr | e_sr2
+            size_big_set = float( len(big_set) ) + 1.0 # make sure no divide by zero
+            score += len( e_sr & e_sr2 ) / size_big_set
+            
+            big_set = attr_s | attr_s2
+            size_big_set = float( len(big_set) ) + 1.0 # make sure no divide by zero
+            score += len( attr_s & attr_s2 ) / size_big_set
+            
+            if parent == get_set_member( e_sr2, startswith='PARENT' ):
+                score += 1.0
+            
+            if score > max_score:
+                best_e2 = e2
+                max_score = score
+        
+        return best_e2
 
 if __name__ == "__main__":
     import sys
@@ -521,16 +543,16 @@ if __name__ == "__main__":
 
     print(  '+'*55)
     
-    srA.find_changes_to_make_equal( srB )
+    print( srA.find_changes_to_make_equal( srB ) )
     
-    srA.create_ET_commands_to_make_equal()
+    print( '\n'.join( srA.create_ET_commands_to_make_equal() ) )
     
     
     #sys.exit()
     print( '#'*75)
     print( ' '*10,'Following is Results from "find_diff" method.')
     print( '#'*75)
-    srA.find_diff( srB )
+    print( srA.find_diff( srB ).summary() )
     #print( srA.e_setrepOD[srA.root] - srB.e_setrepOD[srB.root])
     
     #for k,v in srA.e_setrepOD.items():
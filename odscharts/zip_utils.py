@@ -0,0 +1,313 @@
+# Python 2 and 3
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from __future__ import print_function
+"""
+Write the members of the ods zip archive.
+
+Members of an existing ods file, or of a previous save, can be copied as
+raw compressed bytes, without decompressing and compressing them again.
+
+The compression of each member is set by a compression policy::
+    * compression: "deflate" (default) or "stored"
+    * compresslevel: zlib level 0-9 for "deflate" (default==None, zlib default, needs python 3.7+)
+    * store_below: members smaller than this many bytes are stored (default==0)
+"""
+
+import sys
+import time
+import zlib
+import struct
+import zipfile
+from collections import OrderedDict
+
+ZIP_CHUNK_SIZE = 65536 # approximate number of characters encoded and written to the zip at one time
+
+COMPRESSION_TYPED = {'deflate':zipfile.ZIP_DEFLATED, 'stored':zipfile.ZIP_STORED}
+
+# ZipFile internals used by zipfile_insert_raw (not all are there before python 3.6)
+ZIPFILE_RAW_ATTR_L = ['_lock', '_writing', '_seekable', 'start_dir', '_writecheck', '_didModify']
+ZIPINFO_RAW_ATTR_L = ['FileHeader']
+
+
+def get_compress_type( compression ):
+    """Return the zipfile compression constant for the name "deflate" or "stored"."""
+    try:
+        return COMPRESSION_TYPED[ compression ]
+    except KeyError:
+        raise ValueError('compression must be one of %s, not "%s"'%(sorted(COMPRESSION_TYPED), compression))
+
+
+def check_compresslevel( compresslevel ):
+    """Raise ValueError if compresslevel can not be used with this python."""
+    if compresslevel is None:
+        return
+    # ZipFile only honors a per member compresslevel since python 3.7
+    # (named compress_level since python 3.13, which keeps _compresslevel as an alias)
+    if sys.version_info < (3, 7) or not hasattr(zipfile.ZipInfo('x'), '_compresslevel'):
+        raise ValueError('compresslevel needs python 3.7+')
+
+
+def make_zipinfo( filename, date_time, compress_type, compresslevel ):
+    """Return a ZipInfo for filename. (Not called by User)"""
+    check_compresslevel( compresslevel )
+    if date_time is None:
+        date_time = time.localtime(time.time())[:6]
+    info = zipfile.ZipInfo(filename)
+    info.date_time = date_time
+    info.compress_type = compress_type
+    if compresslevel is not None and compress_type == zipfile.ZIP_DEFLATED:
+        info._compresslevel = compresslevel
+    return info
+
+
+def zipfile_insert( zipfileobj, filename, data, date_time=None,
+                    compress_type=zipfile.ZIP_DEFLATED, compresslevel=None, store_below=0):
+    """Create a file named filename, in the zip archive.
+       "data" is the UTF-8 string that is placed into filename.
+       "date_time" is the time stamp tuple of the file (default is now).
+       Data smaller than store_below bytes is stored without compression.
+
+       (Not called by User)
+    """
+
+    # zip seems to struggle with non-ascii characters
+    #data = data.encode('utf-8')
+
+    if store_below:
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        if len(data) < store_below:
+            compress_type = zipfile.ZIP_STORED
+
+    info = make_zipinfo( filename, date_time, compress_type, compresslevel )
+    zipfileobj.writestr(info, data)
+
+
+def zipfile_stream_insert( zipfileobj, filename, chunk_iter, date_time=None,
+                           compress_type=zipfile.ZIP_DEFLATED, compresslevel=None, store_below=0):
+    """Create a file named filename, in the zip archive.
+       "chunk_iter" is an iterable of text chunks (e.g. TemplateXML_File.iter_chunks())
+       that are encoded as UTF-8 and written in blocks of about ZIP_CHUNK_SIZE characters,
+       so the whole file is never held in memory.
+       "date_time" is the time stamp tuple of the file (default is now).
+       If the file is smaller than store_below bytes, it is stored without compression.
+       (Up to store_below characters are read before the compression is chosen.)
+
+       (Not called by User)
+    """
+    for _ in iter_zipfile_stream_insert( zipfileobj, filename, chunk_iter, date_time=date_time,
+                                         compress_type=compress_type, compresslevel=compresslevel,
+                                         store_below=store_below ):
+        pass
+
+
+def iter_zipfile_stream_insert( zipfileobj, filename, chunk_iter, date_time=None,
+                                compress_type=zipfile.ZIP_DEFLATED, compresslevel=None, store_below=0):
+    """Same as zipfile_stream_insert, but yields None after each block is written to the zip.
+
+       (Not called by User)
+    """
+    if sys.version_info < (3, 6):
+        # ZipFile.open can not write before python 3.6
+        zipfile_insert( zipfileobj, filename, "".join( chunk_iter ), date_time=date_time,
+                        compress_type=compress_type, compresslevel=compresslevel, store_below=store_below)
+        return
+
+    chunk_iter = iter( chunk_iter )
+    chunkL = []
+    nchars = 0
+
+    if store_below and compress_type != zipfile.ZIP_STORED:
+        # read far enough to know if the file is smaller than store_below
+        for chunk in chunk_iter:
+            chunkL.append( chunk )
+            nchars += len( chunk )
+            if nchars >= store_below: # a character is at least one byte
+                break
+        else:
+            # the whole file has been read
+            zipfile_insert( zipfileobj, filename, "".join( chunkL ), date_time=date_time,
+                            compress_type=compress_type, compresslevel=compresslevel, store_below=store_below)
+            return
+
+    info = make_zipinfo( filename, date_time, compress_type, compresslevel )
+
+    with zipfileobj.open(info, 'w') as zip_member:
+        for chunk in chunk_iter:
+            chunkL.append( chunk )
+            nchars += len( chunk )
+            if nchars >= ZIP_CHUNK_SIZE:
+                zip_member.write( "".join( chunkL ).encode('utf-8') )
+                chunkL = []
+                nchars = 0
+                yield None
+        if chunkL:
+            zip_member.write( "".join( chunkL ).encode('utf-8') )
+
+
+def read_raw_members( zipfileobj, skip_nameL=() ):
+    """
+    Return OrderedDict of all members of zipfileobj (opened for reading), except those
+    in skip_nameL. index=member name, value=(ZipInfo, raw compressed bytes)
+
+       (Not called by User)
+    """
+    rawOD = OrderedDict()
+    fp = zipfileobj.fp
+    for info in zipfileobj.infolist():
+        if info.filename in skip_nameL:
+            continue
+        rawOD[info.filename] = (info, read_raw_member( fp, info ))
+    return rawOD
+
+
+def read_raw_member( fp, info ):
+    """Return the raw compressed bytes of the zip member described by info from fp. (Not called by User)"""
+    if info.flag_bits & 0x1:
+        raise ValueError('Can not copy encrypted zip member "%s"'%info.filename)
+
+    # skip the local file header (its extra field can differ from the central directory)
+    fp.seek( info.header_offset )
+    fheader = struct.unpack( zipfile.structFileHeader, fp.read(zipfile.sizeFileHeader) )
+    fp.seek( fheader[zipfile._FH_FILENAME_LENGTH] + fheader[zipfile._FH_EXTRA_FIELD_LENGTH], 1 )
+
+    return fp.read( info.compress_size )
+
+
+def read_written_member( zipfileobj, filename ):
+    """
+    Return (ZipInfo, raw compressed bytes) of the member filename just written to zipfileobj
+    (opened for writing), or None if the zip is written to a stream that can not be read back.
+
+       (Not called by User)
+    """
+    # (before python 3.5 ZipFile has no _seekable, reading back is tried)
+    if not getattr(zipfileobj, '_seekable', sys.version_info < (3, 5)):
+        return None
+    fp = zipfileobj.fp
+    try:
+        info = zipfileobj.getinfo( filename )
+        pos = fp.tell()
+        try:
+            return info, read_raw_member( fp, info )
+        finally:
+            # before python 3.5 ZipFile writes at the current position, not at start_dir
+            fp.seek( pos )
+    except (IOError, OSError, ValueError, AttributeError):
+        # e.g. a file-like object opened write-only
+        return None
+
+
+def decompress_raw( info, raw_data ):
+    """Return the uncompressed bytes of a member from read_raw_members. (Not called by User)"""
+    if info.compress_type == zipfile.ZIP_STORED:
+        return raw_data
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.decompress( raw_data, -15 )
+    raise ValueError('Unsupported compression type %s of zip member "%s"'%(info.compress_type, info.filename))
+
+
+def has_raw_internals( zipfileobj, info ):
+    """Return True if zipfileobj and info have the internals used by zipfile_insert_raw. (Not called by User)"""
+    return all( hasattr(zipfileobj, name) for name in ZIPFILE_RAW_ATTR_L ) and \
+           all( hasattr(info, name) for name in ZIPINFO_RAW_ATTR_L )
+
+
+def zipfile_insert_raw( zipfileobj, info, raw_data, date_time=None ):
+    """Copy a member from read_raw_members into the zip archive as raw compressed bytes.
+       "date_time" is the time stamp tuple of the file (default is now).
+
+       (Not called by User)
+    """
+    if date_time is None:
+        date_time = time.localtime(time.time())[:6]
+    new_info = zipfile.ZipInfo( info.filename, date_time=date_time )
+    new_info.compress_type = info.compress_type
+    new_info.CRC = info.CRC
+    new_info.compress_size = info.compress_size
+    new_info.file_size = info.file_size
+
+    if not has_raw_internals( zipfileobj, new_info ):
+        # no access to the zipfile internals used below
+        zipfileobj.writestr( new_info, decompress_raw(info, raw_data) )
+        return
+
+    zip64 = max(new_info.file_size, new_info.compress_size) > zipfile.ZIP64_LIMIT
+
+    # same steps as ZipFile.writestr, but the data is already compressed
+    with zipfileobj._lock:
+        if zipfileobj._writing:
+            raise ValueError("Can't write to ZIP archive while an open writing handle exists")
+        if zipfileobj._seekable:
+            zipfileobj.fp.seek( zipfileobj.start_dir )
+        new_info.header_offset = zipfileobj.fp.tell()
+
+        zipfileobj._writecheck( new_info )
+        zipfileobj._didModify = True
+
+        zipfileobj.fp.write( new_info.FileHeader(zip64) )
+        zipfileobj.fp.write( raw_data )
+        zipfileobj.filelist.append( new_info )
+        zipfileobj.NameToInfo[new_info.filename] = new_info
+        zipfileobj.start_dir = zipfileobj.fp.tell()
+
+
+def get_zip_fileobj( fileobj ):
+    """
+    Return fileobj for zipfile.ZipFile. Before python 3.5, ZipFile needs tell,
+    so a file-like object that can not tell is wrapped in a TellWriter.
+
+       (Not called by User)
+    """
+    if sys.version_info >= (3, 5) or not hasattr(fileobj, 'write'):
+        return fileobj # a file name, or ZipFile handles unseekable streams
+    try:
+        fileobj.tell()
+        return fileobj
+    except (AttributeError, IOError, OSError):
+        return TellWriter( fileobj )
+
+
+class TellWriter(object):
+    """Write-only wrapper of a file object that counts the bytes written, so that tell works."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.pos = 0
+
+    def write(self, data):
+        self.fileobj.write( data )
+        self.pos += len( data )
+
+    def tell(self):
+        return self.pos
+
+    def flush(self):
+        if hasattr(self.fileobj, 'flush'):
+            self.fileobj.flush()
+
+
+class ZipChunkSink(object):
+    """Write-only file object that holds the bytes written to it until pop_bytes is called.
+
+    It can not seek or tell, so ZipFile writes it like an unseekable stream
+    (i.e. sizes are put in a data descriptor after each file).
+    Before python 3.5 it is wrapped in a TellWriter (see get_zip_fileobj).
+    """
+
+    def __init__(self):
+        self.chunkL = []
+
+    def write(self, data):
+        self.chunkL.append( bytes(data) )
+        return len( data )
+
+    def flush(self):
+        pass
+
+    def pop_bytes(self):
+        """Return all bytes written since the last call and forget them."""
+        data = b"".join( self.chunkL )
+        self.chunkL = []
+        return data
@@ -99,6 +99,8 @@ setup(
     extras_require = {
         'dev': ['check-manifest'],
         'test': ['coverage'],
+        'numpy': ['numpy'],
+        'lxml': ['lxml'],
     },
 
     zip_safe= False,
@@ -107,9 +109,9 @@ setup(
     # "scripts" keyword. Entry points provide cross-platform support and allow
     # pip to create the appropriate form of executable for the target platform.
 
-    #entry_points = {
-    #    'console_scripts': [
-    #        'odscharts=odscharts.main:main',
-    #    ],
-    #},
+    entry_points = {
+        'console_scripts': [
+            'odscharts-diff=odscharts.ods_diff:main',
+        ],
+    },
 )
\ No newline at end of file